@@ -7,6 +7,38 @@ import os
 SEARCH_EMPTY_SHOWS_ALL = True  # When tag name is empty, show all elements
 # Search behavior
 SEARCH_PARTIAL_MATCH_ENABLED = True  # Enable partial tag matching by default
+TEXT_INDEX_ENABLED = True  # Build a trigram index over element text in the background after loading
+
+# Result cache
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Memory budget for cached search results
+FILE_IDENTITY_USE_HASH = False  # Identify files by size and content hash instead of modification time and size
+FILE_WATCH_ENABLED = True  # Reload the loaded file in the background when another program changes it
+FILE_WATCH_DEBOUNCE_MS = 500  # Quiet period after a change before the file is checked; saves often write in steps
+
+# Streaming loader
+LOAD_CHUNK_SIZE = 1024 * 1024  # Bytes parsed between progress reports and cancellation checks
+LOAD_MEMORY_CEILING_MB = 4096  # Abort loading when estimated memory use exceeds this (0 disables)
+LOAD_BYTES_PER_ELEMENT = 512  # Estimated memory per element (tree node, table row, index entries)
+STREAM_SEARCH_THRESHOLD_MB = 2048  # Files larger than this are searched by streaming instead of loaded
+LOW_MEMORY_MIN_MB = 512  # Files at least this large keep only offsets and read values from the mapped file
+LOW_MEMORY_BYTES_PER_ELEMENT = 64  # Estimated memory per element in low-memory mode
+PARALLEL_LOAD_ENABLED = False  # Parse and index large files across a process pool
+PARALLEL_LOAD_WORKERS = os.cpu_count() or 1  # Worker processes for parallel loading
+PARALLEL_LOAD_MIN_MB = 64  # Smaller files are loaded in a single process
+
+# Index cache
+INDEX_CACHE_ENABLED = True  # Keep node tables and search indexes on disk so reopening a file skips parsing
+INDEX_CACHE_DIR = os.path.join(os.getcwd(), "index_cache")
+INDEX_CACHE_MAX_MB = 4096  # Disk budget; the least recently opened files are evicted first
+INDEX_CACHE_MIN_MB = 16  # Smaller files parse quickly and are not cached
+
+# Directory search
+DIRECTORY_SEARCH_WORKERS = os.cpu_count() or 1  # Worker processes searching files in parallel
+DIRECTORY_SEARCH_DEFAULT_GLOB = "*.xml"  # Default file pattern; '**/*.xml' includes subfolders
+CANCEL_CHECK_INTERVAL = 4096  # Elements scanned between checks for a newer search
+TYPE_AHEAD_DEBOUNCE_MS = 150  # Typing pause before a type-ahead search starts
+SEARCH_FIRST_BATCH_SIZE = 200  # Results delivered in the first batch, enough for the first screen
+SEARCH_BATCH_SIZE = 10000  # Results per batch after the first one
 
 CHECKBOX_PARTIAL_SEARCH = "Partial search"
 
@@ -25,9 +57,26 @@ EDITOR_STATUS_LOADED = "XML content loaded successfully"
 EDITOR_STATUS_SAVED = "XML file saved successfully"
 EDITOR_STATUS_ERROR = "Error: {message}"
 EDITOR_MODIFIED_INDICATOR = "*"
+EDITOR_HIGHLIGHT_MAX_MB = 4  # Larger documents are shown without syntax highlighting
+EDITOR_PAGED_MIN_MB = 32  # Files at least this large open read-only, a window of the file at a time
+EDITOR_PAGE_KB = 64  # Size of the window of a file shown read-only
+EDITOR_READ_ONLY_INDICATOR = " (read-only)"
+EDITOR_GOTO_INDEXING = "Go to Line (indexing lines...)"
+EDITOR_FORMAT_INDENT = "  "
+EDITOR_FIND_DEBOUNCE_MS = 250  # Typing pause before the document is scanned for the find text again
+EDITOR_FIND_MAX_HIGHLIGHTS = 2000  # Matches highlighted at most on screen, e.g. on one very long line
+EDITOR_FIND_SEARCHING = "Searching..."
+EDITOR_FIND_COUNT = "{count} {plural}"
+EDITOR_FIND_POSITION = "{index} of {count}"
+EDITOR_FIND_NONE = "No matches"
+EDITOR_FIND_INVALID = "Invalid regular expression"
+EDITOR_FIND_FAILED = "Search failed"
+EDITOR_FORMAT_ON_OPEN = False  # Format files opened from Browse in the editor; the file itself is not rewritten
+EDITOR_FORMAT_ON_OPEN_MAX_MB = 4  # Larger files are never formatted on open
 
 # Status messages
 STATUS_FILE_LOADED = "XML file '{file}' loaded successfully"
+STATUS_LOADING_PROGRESS = "Loading '{file}': {read} of {total} MB ({percent}%), {elements} elements"
 
 HISTORY_FILE_PATH = f"{os.getcwd()}\\history_record.csv"
 
@@ -44,6 +93,7 @@ MENU_GO_TO_LINE = "Go to Line..."
 SHORTCUT_SAVE = "Ctrl+S"
 SHORTCUT_FIND = "Ctrl+F"
 SHORTCUT_FIND_NEXT = "F3"
+SHORTCUT_FIND_PREVIOUS = "Shift+F3"
 SHORTCUT_GO_TO_LINE = "Ctrl+G"
 
 # Menu items
@@ -63,6 +113,8 @@ WINDOW_TITLE = APP_NAME
 
 # Table settings
 RESULTS_COLUMNS = ["Element Name", "Attributes", "Value", "XPath"]
+COLUMN_FILE = "File"  # Extra results column for directory searches
+FILES_COLUMNS = ["File", "Matches", "Error"]
 HISTORY_COLUMNS = ["Date & Time", "Search value", "File Name", "P", "N", "A", "V", "Results"]
 
 # XPath settings
@@ -86,6 +138,15 @@ STATUS_HISTORY_CLEARED = "Search history cleared"
 STATUS_ERROR_PREFIX = "Error: "
 STATUS_SEARCHING_EMPTY = "Searching for all XML elements (empty tag)..."
 STATUS_EMPTY_TAG_RESULTS = "Showing all {count} elements in the XML file"
+STATUS_STREAM_SEARCHING = "Streaming search: {count} {plural} found so far..."
+STATUS_SEARCH_PROGRESS = "Searching: {count} {plural} found so far..."
+STATUS_STREAM_MODE = "'{file}' is too large to load; searches stream through the file"
+STATUS_FILE_CHANGED = "'{file}' changed on disk and was reloaded"
+STATUS_FILE_CHANGED_UNSAVED = "'{file}' changed on disk and was reloaded; the editor keeps your unsaved changes"
+STATUS_FILE_REMOVED = "'{file}' was removed or renamed on disk"
+STATUS_LOW_MEMORY_MODE = "'{file}' loaded in low-memory mode; values are read from the file as needed"
+STATUS_DIRECTORY_SEARCHING = "Searching '{directory}': {done} of {total} files, {count} {plural} found..."
+STATUS_DIRECTORY_RESULTS = "Found {count} {plural} in {matched} of {total} files"
 
 # Error messages
 ERROR_NO_FILE = "Please select an XML file."
@@ -96,6 +157,12 @@ ERROR_PARSING_XML = "XML parsing error: {error}"
 ERROR_LOADING_XML = "Error loading XML file: {error}"
 ERROR_SEARCHING = "Error searching for tag: {error}"
 ERROR_NO_XML_LOADED = "No XML file loaded"
+ERROR_LOW_MEMORY_PATH = "Path expressions are not available for files loaded in low-memory mode"
+ERROR_STREAMING_PATH = "Path expressions are not available for files searched without loading them or for folder searches"
+ERROR_LOAD_CANCELLED = "Loading cancelled"
+ERROR_LOAD_MEMORY_CEILING = "Loading aborted: estimated memory use exceeded the {limit} MB ceiling"
+ERROR_DIRECTORY_NOT_FOUND = "Folder not found: {directory}"
+ERROR_NO_FILES_MATCHED = "No files in '{directory}' match '{pattern}'"
 
 # Confirmation messages
 CONFIRM_CLEAR_HISTORY = "Are you sure you want to clear all search history?"
@@ -115,6 +182,8 @@ BUTTON_BROWSE = "Browse..."
 BUTTON_SEARCH = "Search"
 BUTTON_HISTORY = "History"
 BUTTON_CLEAR_ALL = "Clear All"
+BUTTON_CANCEL_LOAD = "Cancel"
+BUTTON_SEARCH_FOLDER = "Search Folder..."
 
 # Label texts
 LABEL_XML_FILE = "XML File:"
@@ -122,10 +191,12 @@ LABEL_NO_FILE_SELECTED = "No file selected"
 LABEL_ELEMENT_TAG = "Element Tag:"
 LABEL_SEARCH_HISTORY = "Search History:"
 LABEL_SEARCH_ON = "Search on:"
+LABEL_FILE_PATTERN = "Files:"
 
 # Tab labels
 TAB_RESULTS = "Results"
 TAB_HISTORY = "History"
+TAB_FILES = "Files"
 
 # CSV
 CSV_HEADER = ['timestamp','tag_name','file_path','partial_flag','name_flag','att_flag','value_flag','result_count']
\ No newline at end of file
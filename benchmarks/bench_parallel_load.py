@@ -0,0 +1,88 @@
+"""
+Benchmark: parallel load speedup by worker count.
+
+Times the single-process StreamLoader against ParallelLoader with an
+increasing number of worker processes on the same generated file, and checks
+that both produce the same node table.
+
+Usage:
+    python benchmarks/bench_parallel_load.py [element_count] [worker counts...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.parallel_loader import ParallelLoader
+from model.stream_loader import StreamLoader
+
+DEFAULT_ELEMENTS = 2000000
+DEFAULT_WORKERS = [1, 2, 4, 8, 16]
+REPEATS = 3  # Best of this many runs is reported
+
+
+def write_sample_file(path, element_count):
+    """Write an XML file with roughly element_count elements, three levels deep."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0"?>\n<catalog xmlns:x="urn:example">\n')
+        written = 1
+        group = 0
+        while written < element_count:
+            group += 1
+            f.write(f'  <group id="{group}" kind="{"ab"[group % 2]}">\n')
+            written += 1
+            for item in range(10):
+                if written >= element_count:
+                    break
+                f.write(f'    <item sku="{group}-{item}"><price>{item}.99</price>'
+                        f'<x:note>Note {group} {item}</x:note></item>\n')
+                written += 3
+            f.write('  </group>\n')
+        f.write('</catalog>\n')
+
+
+def best_time(load):
+    """Run a load REPEATS times and return its result and the best time."""
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = load()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def same_table(a, b):
+    """Check that two node tables describe the same document."""
+    return (len(a) == len(b)
+            and all(a.tag(row) == b.tag(row) for row in range(len(a)))
+            and a.parents == b.parents
+            and a.positions == b.positions
+            and a.texts == b.texts
+            and (a.starts, a.ends, a.lines, a.columns) == (b.starts, b.ends, b.lines, b.columns)
+            and (a.end_lines, a.end_columns) == (b.end_lines, b.end_columns))
+
+
+def main():
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ELEMENTS
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or DEFAULT_WORKERS
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "sample.xml")
+        write_sample_file(path, element_count)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"{element_count} elements, {size_mb:.1f} MB, {os.cpu_count()} CPUs")
+
+        (_, table, _, _), single = best_time(lambda: StreamLoader(path).load())
+        print(f"{'workers':>8} {'time (s)':>10} {'speedup':>9}")
+        print(f"{'single':>8} {single:>10.3f} {1:>8.2f}x")
+        for workers in worker_counts:
+            (_, parallel_table, _, _), elapsed = best_time(lambda: ParallelLoader(path, workers).load())
+            if not same_table(table, parallel_table):
+                raise RuntimeError(f"Parallel load with {workers} workers differs from the single-process load")
+            print(f"{workers:>8} {elapsed:>10.3f} {single / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: how "search all elements" time grows with element count.
+
+Compares the previous ancestor lookup (rescanning the whole tree for every
+parent) with the node table built by XMLModel.load_xml_file.
+
+Usage:
+    python benchmarks/bench_search_all.py [sizes...]
+"""
+import os
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.xml_model import XMLModel
+
+DEFAULT_SIZES = [1000, 2000, 4000, 8000, 50000]
+LEGACY_MAX_SIZE = 8000  # The old lookup is quadratic, skip it above this size
+
+
+def write_sample_file(path, element_count):
+    """Write an XML file with roughly element_count elements, three levels deep."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0"?>\n<catalog>\n')
+        written = 1
+        group = 0
+        while written < element_count:
+            group += 1
+            f.write(f'  <group id="{group}">\n')
+            written += 1
+            for item in range(10):
+                if written >= element_count:
+                    break
+                f.write(f'    <item sku="{group}-{item}"><price>{item}.99</price></item>\n')
+                written += 2
+            f.write('  </group>\n')
+        f.write('</catalog>\n')
+
+
+def legacy_search_all(root):
+    """Search all elements the way XMLModel did before the ancestry index."""
+
+    def find_parent(element):
+        # ElementTree has no parent pointers, so scan the whole tree
+        for p in root.iter():
+            if element in list(p):
+                return p
+        return None
+
+    def xpath(element):
+        parts = []
+        current = element
+        while current is not None:
+            parent = find_parent(current)
+            if parent is None:
+                parts.append(current.tag)
+                break
+            position = 1
+            for sibling in parent:
+                if sibling is current:
+                    break
+                if sibling.tag == current.tag:
+                    position += 1
+            parts.append(f"{current.tag}[{position}]")
+            current = parent
+        parts.reverse()
+        return '/' + '/'.join(parts)
+
+    return [xpath(element) for element in root.iter()]
+
+
+def time_legacy_search_all(path):
+    """Parse the file and time the previous search-all implementation."""
+    root = ET.parse(path).getroot()
+    start = time.perf_counter()
+    results = legacy_search_all(root)
+    return len(results), time.perf_counter() - start
+
+
+def time_search_all(path):
+    """Load the file into a fresh model and time a search-all with XPath generation."""
+    # Bypass the singleton so each run starts from a clean model
+    model = object.__new__(XMLModel)
+    model.__init__()
+    success, error = model.load_xml_file(path)
+    if not success:
+        raise RuntimeError(error)
+    start = time.perf_counter()
+    rows, error = model.find_all_elements()
+    if error:
+        raise RuntimeError(error)
+    results = [record['xpath'] for record in model.get_element_records(rows)]
+    return len(results), time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'elements':>10} {'before (s)':>12} {'after (s)':>10} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"sample_{size}.xml")
+            write_sample_file(path, size)
+            count, after = time_search_all(path)
+            if size <= LEGACY_MAX_SIZE:
+                _, before = time_legacy_search_all(path)
+                print(f"{count:>10} {before:>12.3f} {after:>10.3f} {before / after:>8.0f}x")
+            else:
+                print(f"{count:>10} {'skipped':>12} {after:>10.3f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
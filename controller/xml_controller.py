@@ -1,14 +1,59 @@
+import os
+import threading
+from array import array
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QThreadPool, QTimer, pyqtSignal
+
 from model.xml_model import XMLModel
 from model.history_model import HistoryModel
+from model.directory_search import DirectorySearch, find_files
+from model.stream_search import SearchCancelled, SearchCriteria
 from DefineConst import *
 
-class XMLController:
+class XMLController(QObject):
     """Controller class to handle application logic."""
     
+    # Signals emitted from the worker thread; Qt delivers them on the GUI thread
+    loadProgress = pyqtSignal(str, int, int, int)  # File path, bytes read, total bytes, elements
+    loadFinished = pyqtSignal(str, bool, object)  # File path, success, error message
+    searchBatch = pyqtSignal(int, object)  # Search id, next batch of results
+    searchFinished = pyqtSignal(int, bool, object, object)  # Search id, success, results, error message
+    directoryProgress = pyqtSignal(int, int, int)  # Search id, files searched, total files
+    directorySummary = pyqtSignal(int, object)  # Search id, list of (file, match count, error message)
+    fileChanged = pyqtSignal(str)  # File path; the loaded file changed on disk and its cached results were dropped
+    
     def __init__(self, view=None):
+        super().__init__()
         self.view = view
         self.xml_model = XMLModel()
         self.history_model = HistoryModel()
+        self._load_cancelled = threading.Event()
+        self._search_cancelled = threading.Event()
+        self._search_id = 0
+        
+        # Model work runs off the GUI thread. It is serialized on one worker,
+        # and stale work is cancelled cooperatively instead of run in parallel.
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(1)
+        
+        # Type-ahead searches wait for a pause in typing
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.timeout.connect(self._start_pending_search)
+        self._pending_search = None
+        
+        # Last completed partial search: (file identity, tag, flags, rows).
+        # A type-ahead query that extends it filters its rows instead of rescanning.
+        self._last_search = None
+        
+        # The loaded file is watched for changes made by other programs
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self._file_changed)
+        self._change_timer = QTimer(self)
+        self._change_timer.setSingleShot(True)
+        self._change_timer.setInterval(FILE_WATCH_DEBOUNCE_MS)
+        self._change_timer.timeout.connect(self._check_file_changed)
+        self.loadFinished.connect(self._watch_loaded_file)
 
     def get_current_file_path(self):
         """Get the path of the currently loaded XML file."""
@@ -30,54 +75,356 @@ class XMLController:
         """
         self.view = view
     
-    def load_xml_file(self, file_path):
+    def load_xml_file(self, file_path, progress=None, is_cancelled=None):
         """
         Load an XML file for processing.
         
         Args:
             file_path: Path to the XML file
+            progress: Optional callable(bytes_read, total_bytes, elements)
+            is_cancelled: Optional callable; loading stops when it returns True
             
         Returns:
             (bool, str): Success status and error message if any
         """
-        return self.xml_model.load_xml_file(file_path)
+        return self.xml_model.load_xml_file(file_path, progress=progress, is_cancelled=is_cancelled)
     
-    def search_tag(self, tag_name, flag_name, flag_att, flag_value, partial_flag=True):
+    def start_load(self, file_path):
         """
-        Search for elements with the specified tag name or all elements if tag is empty.
+        Load an XML file on the worker thread.
+        
+        Progress is reported through loadProgress and the outcome through
+        loadFinished. A load that is still running is cancelled.
+        
+        Args:
+            file_path: Path to the XML file
+        """
+        self._start_load_task(file_path, self.load_xml_file)
+    
+    def start_update(self, file_path, edit):
+        """
+        Bring the model up to date with a saved file on the worker thread.
+        
+        Only the edited element is parsed again when the edit allows it, see
+        XMLModel.apply_edit. The outcome is reported like a load, through
+        loadProgress and loadFinished.
+        
+        Args:
+            file_path: Path to the saved file
+            edit: Edit reported by the editor with the save, or None
+        """
+        def update(file_path, progress, is_cancelled):
+            return self.xml_model.apply_edit(file_path, edit, progress=progress, is_cancelled=is_cancelled)
+        
+        self._start_load_task(file_path, update)
+    
+    def _start_load_task(self, file_path, load):
+        """Run load(file_path, progress, is_cancelled) on the worker thread, cancelling a load still running."""
+        self._load_cancelled.set()
+        cancelled = self._load_cancelled = threading.Event()
+        
+        # A new file makes any queued search stale
+        self._search_cancelled.set()
+        
+        def progress(bytes_read, total_bytes, elements):
+            self.loadProgress.emit(file_path, bytes_read, total_bytes, elements)
+        
+        def task():
+            success, error = load(file_path, progress=progress, is_cancelled=cancelled.is_set)
+            # A load superseded by a newer one finishes silently
+            if cancelled is self._load_cancelled:
+                self.loadFinished.emit(file_path, success, error)
+        
+        self.thread_pool.start(task)
+    
+    def _watch_loaded_file(self, file_path, success, error):
+        """Watch the file the model holds after a load, instead of the one watched before."""
+        if not FILE_WATCH_ENABLED:
+            return
+        watched = self.file_watcher.files()
+        if watched:
+            self.file_watcher.removePaths(watched)
+        if self.xml_model.xml_file_path:
+            self.file_watcher.addPath(self.xml_model.xml_file_path)
+    
+    def _file_changed(self, file_path):
+        """Check the file once changes to it have settled."""
+        # Programs that save by replacing the file stop it from being watched
+        if file_path not in self.file_watcher.files() and os.path.exists(file_path):
+            self.file_watcher.addPath(file_path)
+        self._change_timer.start()
+    
+    def _check_file_changed(self):
+        """
+        Compare the loaded file with the file on disk on the worker thread.
+        
+        The check runs after any load or update already queued, so the
+        application's own saves are not taken for outside changes. If the file
+        changed, what was cached for it is dropped and fileChanged is emitted
+        for the view to load it again.
+        """
+        def task():
+            file_path = self.xml_model.xml_file_path
+            if file_path and self.xml_model.is_file_changed():
+                self.xml_model.invalidate_file()
+                self.fileChanged.emit(file_path)
+        
+        self.thread_pool.start(task)
+    
+    def is_streaming(self):
+        """Check if the current file is searched by streaming instead of loaded."""
+        return self.xml_model.is_streaming()
+    
+    def is_low_memory(self):
+        """Check if the current file is loaded in low-memory mode."""
+        return self.xml_model.is_low_memory()
+    
+    def stream_search_tag(self, tag_name, flag_name, flag_att, flag_value, partial_flag=True, is_cancelled=None):
+        """
+        Search the current file over parse events, for files too large to load.
         
         Args:
             tag_name: Tag name to search for
+            is_cancelled: Optional callable; the search stops when it returns True
             
         Returns:
-            (bool, list, str): Success status, results, and error message if any
+            (bool, iterator, str): Success status, iterator over batches of results,
+                                   and error message if any
         """
-        # Check if a file is loaded
         if not self.xml_model.xml_file_path:
             return False, None, ERROR_NO_FILE
         
-        # Check if tag name is empty and convert to wildcard search if appropriate
         if not tag_name:
             if SEARCH_EMPTY_SHOWS_ALL:
                 tag_name = SEARCH_ALL_ELEMENTS
             else:
                 return False, None, ERROR_NO_TAG
         
+        if not SearchCriteria.supports(tag_name, partial_flag):
+            return False, None, ERROR_STREAMING_PATH
+        
+        batches = self.xml_model.stream_search(tag_name, flag_name, flag_att, flag_value,
+                                               partial_flag, is_cancelled=is_cancelled)
+        return True, batches, None
+    
+    def cancel_load(self):
+        """Cancel the XML file load in progress, if any."""
+        self._load_cancelled.set()
+    
+    def start_search(self, tag_name, flag_name, flag_att, flag_value, partial_flag=True, type_ahead=False):
+        """
+        Search on the worker thread.
+        
+        Any search still in flight is cancelled. Results are delivered in
+        batches through searchBatch as they are found, then searchFinished
+        reports the outcome; both are tagged with the returned id so the view
+        can ignore stale searches.
+        
+        Args:
+            tag_name: Tag name to search for
+            type_ahead: If True, the search starts only after TYPE_AHEAD_DEBOUNCE_MS
+                        without a newer one, and may narrow the previous results
+            
+        Returns:
+            int: Id of the new search
+        """
+        cancelled, search_id = self._new_search()
+        
         # Update status in the view
         if self.view:
-            if tag_name == SEARCH_ALL_ELEMENTS:
+            if tag_name == SEARCH_ALL_ELEMENTS or not tag_name:
                 self.view.update_status(STATUS_SEARCHING_ALL)
             else:
                 self.view.update_status(STATUS_SEARCHING.format(tag=tag_name))
         
-        # Process search
-        if tag_name == SEARCH_ALL_ELEMENTS:
-            results, error = self.xml_model.find_all_elements()
+        def task():
+            if cancelled.is_set():
+                return
+            try:
+                if self.is_streaming():
+                    success, batches, error = self.stream_search_tag(
+                        tag_name, flag_name, flag_att, flag_value, partial_flag, is_cancelled=cancelled.is_set)
+                else:
+                    success, batches, error = self.iter_search_tag(
+                        tag_name, flag_name, flag_att, flag_value, partial_flag,
+                        is_cancelled=cancelled.is_set, narrow=type_ahead)
+                if success:
+                    for batch in batches:
+                        self.searchBatch.emit(search_id, batch)
+                results = None  # Already delivered in batches
+            except SearchCancelled:
+                return
+            except Exception as e:
+                success, results, error = False, None, ERROR_SEARCHING.format(error=str(e))
+            if not cancelled.is_set():
+                self.searchFinished.emit(search_id, success, results, error)
+        
+        if type_ahead:
+            self._pending_search = task
+            self._debounce_timer.start(TYPE_AHEAD_DEBOUNCE_MS)
         else:
-            results, error = self.xml_model.find_elements_by_tag(tag_name, flag_name, flag_att, flag_value, partial_flag)
+            self.thread_pool.start(task)
+        return search_id
+    
+    def start_directory_search(self, directory, pattern, tag_name, flag_name, flag_att, flag_value, partial_flag=True):
+        """
+        Search every file of a directory matching a glob pattern, on a process pool.
+        
+        The currently loaded file is not involved. Results carry their file
+        and are delivered through searchBatch file by file, as files finish;
+        directoryProgress reports the files searched so far, and
+        directorySummary the match count of every file, in file order,
+        before searchFinished.
+        
+        Args:
+            directory: Directory to search
+            pattern: Glob pattern for the files, e.g. '*.xml' or '**/*.xml'
+            tag_name: Tag name to search for
+            
+        Returns:
+            int: Id of the new search
+        """
+        cancelled, search_id = self._new_search()
+        if not tag_name:
+            tag_name = SEARCH_ALL_ELEMENTS
+        
+        def task():
+            if cancelled.is_set():
+                return
+            if not SearchCriteria.supports(tag_name, partial_flag):
+                self.searchFinished.emit(search_id, False, None, ERROR_STREAMING_PATH)
+                return
+            if not os.path.isdir(directory):
+                self.searchFinished.emit(search_id, False, None, ERROR_DIRECTORY_NOT_FOUND.format(directory=directory))
+                return
+            files = find_files(directory, pattern)
+            if not files:
+                self.searchFinished.emit(search_id, False, None,
+                                         ERROR_NO_FILES_MATCHED.format(directory=directory, pattern=pattern))
+                return
+            
+            search = DirectorySearch(files, tag_name, flag_name, flag_att, flag_value, partial_flag,
+                                     workers=DIRECTORY_SEARCH_WORKERS,
+                                     is_cancelled=cancelled.is_set,
+                                     chunk_size=LOAD_CHUNK_SIZE)
+            summary = []
+            try:
+                for file_path, records, error in search.results():
+                    summary.append((file_path, len(records), error))
+                    if records:
+                        self.searchBatch.emit(search_id, records)
+                    self.directoryProgress.emit(search_id, len(summary), len(files))
+            except SearchCancelled:
+                return
+            except Exception as e:
+                self.searchFinished.emit(search_id, False, None, ERROR_SEARCHING.format(error=str(e)))
+                return
+            if not cancelled.is_set():
+                summary.sort(key=lambda entry: entry[0])
+                self.directorySummary.emit(search_id, summary)
+                self.searchFinished.emit(search_id, True, None, None)
+        
+        self.thread_pool.start(task)
+        return search_id
+    
+    def _new_search(self):
+        """Cancel the search in flight and return the cancellation event and id of a new one."""
+        self._debounce_timer.stop()
+        self._pending_search = None
+        self._search_cancelled.set()
+        cancelled = self._search_cancelled = threading.Event()
+        self._search_id += 1
+        return cancelled, self._search_id
+    
+    def _start_pending_search(self):
+        """Start the type-ahead search once typing has paused."""
+        task, self._pending_search = self._pending_search, None
+        if task is not None:
+            self.thread_pool.start(task)
+    
+    def cancel_search(self):
+        """Cancel the search in flight, if any."""
+        self._debounce_timer.stop()
+        self._pending_search = None
+        self._search_cancelled.set()
+    
+    def search_tag(self, tag_name, flag_name, flag_att, flag_value, partial_flag=True, is_cancelled=None, narrow=False):
+        """
+        Search for elements with the specified tag name or all elements if tag is empty.
+        
+        Runs iter_search_tag to completion, for callers that want every result at once.
+        
+        Returns:
+            (bool, list, str): Success status, results, and error message if any
             
-        if error:
+        Raises:
+            SearchCancelled: If is_cancelled returned True
+        """
+        success, batches, error = self.iter_search_tag(tag_name, flag_name, flag_att, flag_value, partial_flag,
+                                                       is_cancelled=is_cancelled, narrow=narrow)
+        if not success:
             return False, None, error
+        try:
+            return True, [record for batch in batches for record in batch], None
+        except SearchCancelled:
+            raise
+        except Exception as e:
+            return False, None, ERROR_SEARCHING.format(error=str(e))
+    
+    def iter_search_tag(self, tag_name, flag_name, flag_att, flag_value, partial_flag=True,
+                        is_cancelled=None, narrow=False):
+        """
+        Search for elements with the specified tag name or all elements if tag is empty,
+        producing the results in batches as they are found.
         
-        return True, results, None
-    
\ No newline at end of file
+        Args:
+            tag_name: Tag name to search for
+            is_cancelled: Optional callable; the search stops when it returns True
+            narrow: If True and the query extends the last partial search with
+                    the same flags, filter its results instead of rescanning
+            
+        Returns:
+            (bool, iterator, str): Success status, iterator over batches of results,
+                                   and error message if any
+        """
+        if not self.xml_model.xml_file_path:
+            return False, None, ERROR_NO_FILE
+        
+        if not tag_name:
+            if SEARCH_EMPTY_SHOWS_ALL:
+                tag_name = SEARCH_ALL_ELEMENTS
+            else:
+                return False, None, ERROR_NO_TAG
+        
+        candidates = self._narrowable_rows(tag_name, flag_name, flag_att, flag_value, partial_flag) if narrow else None
+        batches = self._iter_search_batches(tag_name, flag_name, flag_att, flag_value, partial_flag,
+                                            is_cancelled, candidates)
+        return True, batches, None
+    
+    def _iter_search_batches(self, tag_name, flag_name, flag_att, flag_value, partial_flag,
+                             is_cancelled, candidates):
+        """Yield batches of result records and remember the rows once the search completes."""
+        remember = partial_flag and tag_name != SEARCH_ALL_ELEMENTS
+        rows = array('i')
+        for batch in self.xml_model.iter_elements_by_tag(tag_name, flag_name, flag_att, flag_value, partial_flag,
+                                                         is_cancelled=is_cancelled, candidates=candidates):
+            if remember:
+                rows.extend(batch)
+            yield self.xml_model.get_element_records(batch)
+        if remember:
+            self._remember_search(tag_name, flag_name, flag_att, flag_value, rows)
+    
+    def _narrowable_rows(self, tag_name, flag_name, flag_att, flag_value, partial_flag):
+        """Return the rows of the last partial search if tag_name extends it with the same flags, else None."""
+        last = self._last_search
+        if (not partial_flag or last is None or tag_name == SEARCH_ALL_ELEMENTS
+                or last[0] != self.xml_model.file_identity
+                or last[2] != (bool(flag_name), bool(flag_att), bool(flag_value))
+                or last[1].lower() not in tag_name.lower()):
+            return None
+        return last[3]
+    
+    def _remember_search(self, tag_name, flag_name, flag_att, flag_value, rows):
+        """Keep the rows of a completed partial search for narrowing the next type-ahead query."""
+        flags = (bool(flag_name), bool(flag_att), bool(flag_value))
+        self._last_search = (self.xml_model.file_identity, tag_name, flags, rows)
@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 from PyQt5.QtWidgets import QApplication
 from controller.xml_controller import XMLController
@@ -28,4 +29,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # Needed for the parallel loader's worker processes in frozen builds
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import glob
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from model.stream_search import SearchCancelled, SearchCriteria, StreamSearch
+
+# Tasks queued per worker; a cancelled search leaves no more than these to run
+TASKS_PER_WORKER = 2
+# Files searched by one task; a cancelled task runs until all of them are done
+MAX_FILES_PER_TASK = 16
+# Seconds between checks for cancellation while waiting for a file to finish
+CANCEL_POLL_INTERVAL = 0.1
+
+
+def find_files(directory, pattern):
+    """
+    List the files of a directory matching a glob pattern.
+
+    Args:
+        directory: Directory to search
+        pattern: Glob pattern relative to directory; '**' matches subdirectories
+
+    Returns:
+        list: Sorted file paths
+    """
+    paths = glob.glob(os.path.join(glob.escape(directory), pattern), recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def search_file(file_path, tag_name, flag_name, flag_att, flag_value, partial_match, chunk_size):
+    """
+    Search one file in a worker process.
+
+    Returns:
+        (str, list, str): The file path, its matches as DetachedRecords and an
+                          error message if the file could not be searched
+    """
+    criteria = SearchCriteria(tag_name, flag_name, flag_att, flag_value, partial_match)
+    records = []
+    try:
+        for batch in StreamSearch(file_path, criteria, chunk_size=chunk_size).batches():
+            records.extend(batch)
+    except Exception as e:
+        return file_path, records, str(e)
+    for record in records:
+        record.file = file_path
+    return file_path, records, None
+
+
+def search_files(file_paths, *search_args):
+    """Search several files in a worker process, see search_file."""
+    return [search_file(file_path, *search_args) for file_path in file_paths]
+
+
+class DirectorySearch:
+    """
+    Runs the same search over every matching file of a directory.
+
+    Files are searched tree-less with StreamSearch, on a process pool. Only a
+    few tasks are queued at a time, so cancelling stops the search once the
+    running ones finish, and results are produced as files finish, so a large
+    file does not hold back the files after it.
+    """
+
+    def __init__(self, files, tag_name, flag_name, flag_att, flag_value, partial_match,
+                 workers, is_cancelled=None, chunk_size=1024 * 1024):
+        """
+        Args:
+            files: Paths of the files to search
+            tag_name: The search string
+            workers: Number of worker processes
+            is_cancelled: Optional callable; the search stops when it returns True
+            chunk_size: Number of bytes parsed at a time
+        """
+        self.files = files
+        self.search_args = (tag_name, flag_name, flag_att, flag_value, partial_match, chunk_size)
+        self.workers = workers
+        self.is_cancelled = is_cancelled
+
+    def results(self):
+        """
+        Search the files.
+
+        Yields:
+            (str, list, str): For every file, in the order they finish, its
+                              path, matches and error message if any
+
+        Raises:
+            SearchCancelled: If is_cancelled returned True
+        """
+        if not self.files:
+            return
+        workers = min(self.workers, len(self.files))
+        # Batches of files per task keep the inter-process overhead low for many small files
+        files_per_task = min(max(1, len(self.files) // (workers * 8)), MAX_FILES_PER_TASK)
+        batches = (self.files[start:start + files_per_task]
+                   for start in range(0, len(self.files), files_per_task))
+
+        # Workers are spawned rather than forked: the GUI process runs threads
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+        pending = set()
+        try:
+            while True:
+                while len(pending) < workers * TASKS_PER_WORKER:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    pending.add(executor.submit(search_files, batch, *self.search_args))
+                if not pending:
+                    return
+                done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                if self.is_cancelled is not None and self.is_cancelled():
+                    raise SearchCancelled()
+                for future in done:
+                    yield from future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
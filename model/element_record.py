@@ -0,0 +1,203 @@
+def format_attributes(attributes):
+    """Format attributes as 'att1=value1;att2=value2;...'."""
+    return ";".join(f"{k}={v}" for k, v in attributes.items())
+
+
+class RecordMapping:
+    """Read-only, dict-style access to the fields of a result record."""
+    
+    __slots__ = ()
+    
+    KEYS = ('name', 'value', 'path', 'xpath', 'attributes', 'attributes_text', 'element', 'file',
+            'line', 'column', 'offset', 'end_offset', 'end_line', 'end_column')
+    
+    file = None  # Path of the file the element is in, for multi-file searches
+    
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key):
+        return key in self.KEYS
+    
+    def get(self, key, default=None):
+        """Return the field for key, or default if the key is unknown."""
+        if key not in self.KEYS:
+            return default
+        return getattr(self, key)
+    
+    def keys(self):
+        """Return the available field names."""
+        return self.KEYS
+
+
+class ElementRecord(RecordMapping):
+    """
+    Search result for a single element.
+    
+    Records are created for every match but only describe themselves when a
+    field is read: the path, XPath and attributes are computed on first access
+    and memoized. Fields are read with the same keys as the previous result
+    dicts (record['name'], record['xpath'], ...).
+    """
+    
+    __slots__ = ('table', 'row', '_path', '_xpath', '_attributes', '_attributes_text')
+    
+    def __init__(self, table, row):
+        self.table = table  # NodeTable the row belongs to
+        self.row = row
+        self._path = None
+        self._xpath = None
+        self._attributes = None
+        self._attributes_text = None
+    
+    @property
+    def name(self):
+        """Element tag name without namespace."""
+        return self.table.local_name(self.row)
+    
+    @property
+    def value(self):
+        """Element text, stripped."""
+        text = self.table.texts[self.row]
+        return text.strip() if text else ""
+    
+    @property
+    def path(self):
+        """Human-readable path to the element."""
+        if self._path is None:
+            self._path = self.table.element_path(self.row)
+        return self._path
+    
+    @property
+    def xpath(self):
+        """Standard XPath of the element."""
+        if self._xpath is None:
+            self._xpath = self.table.element_xpath(self.row)
+        return self._xpath
+    
+    @property
+    def attributes(self):
+        """Copy of the element attributes."""
+        if self._attributes is None:
+            self._attributes = dict(self.table.attributes[self.row] or {})
+        return self._attributes
+    
+    @property
+    def attributes_text(self):
+        """Attributes formatted as 'att1=value1;att2=value2;...'."""
+        if self._attributes_text is None:
+            self._attributes_text = format_attributes(self.attributes)
+        return self._attributes_text
+    
+    @property
+    def element(self):
+        """The live Element."""
+        return self.table.elements[self.row]
+    
+    @property
+    def line(self):
+        """1-based line of the element's start tag in the file."""
+        return self.table.lines[self.row]
+    
+    @property
+    def column(self):
+        """1-based column of the element's start tag, in characters."""
+        return self.table.columns[self.row]
+    
+    @property
+    def offset(self):
+        """Byte offset of the element's start tag in the file."""
+        return self.table.starts[self.row]
+    
+    @property
+    def end_offset(self):
+        """Byte offset just past the element's end tag."""
+        return self.table.ends[self.row]
+    
+    @property
+    def end_line(self):
+        """1-based line just past the element's end tag."""
+        return self.table.end_lines[self.row]
+    
+    @property
+    def end_column(self):
+        """1-based column just past the element's end tag, in characters."""
+        return self.table.end_columns[self.row]
+
+
+class DetachedRecord(RecordMapping):
+    """
+    Search result whose fields were captured when the match was found.
+    
+    Used where no document stays in memory (streaming and multi-file
+    searches), so the record cannot refer back to a node table.
+    """
+    
+    __slots__ = ('name', 'value', 'path', 'xpath', 'attributes', 'file',
+                 'line', 'column', 'offset', 'end_offset', 'end_line', 'end_column',
+                 '_attributes_text')
+    
+    def __init__(self, name, value, path, xpath, attributes, file=None,
+                 line=None, column=None, offset=None, end_offset=None, end_line=None,
+                 end_column=None):
+        self.name = name
+        self.value = value
+        self.path = path
+        self.xpath = xpath
+        self.attributes = attributes
+        self.file = file
+        self.line = line
+        self.column = column
+        self.offset = offset
+        self.end_offset = end_offset
+        self.end_line = end_line
+        self.end_column = end_column
+        self._attributes_text = None
+    
+    @property
+    def attributes_text(self):
+        """Attributes formatted as 'att1=value1;att2=value2;...'."""
+        if self._attributes_text is None:
+            self._attributes_text = format_attributes(self.attributes)
+        return self._attributes_text
+    
+    @property
+    def element(self):
+        """Detached records have no live Element."""
+        return None
+
+
+class ElementRecordList:
+    """
+    Read-only sequence of ElementRecords over node table rows.
+    
+    A record is only created when its index is read, so handing a large
+    result set to the view costs nothing until rows are displayed. Records
+    are kept once created, so their memoized fields are reused.
+    """
+    
+    __slots__ = ('table', 'rows', '_records')
+    
+    def __init__(self, table, rows):
+        self.table = table
+        self.rows = rows  # Sequence of node table rows
+        self._records = {}  # Index -> record, filled on access
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.rows)))]
+        if index < 0:
+            index += len(self.rows)
+        record = self._records.get(index)
+        if record is None:
+            record = self._records[index] = ElementRecord(self.table, self.rows[index])
+        return record
+    
+    def __iter__(self):
+        for index in range(len(self.rows)):
+            yield self[index]
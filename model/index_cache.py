@@ -0,0 +1,468 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from collections.abc import Mapping, Sequence
+
+from model.node_table import NodeTable
+from model.search_index import AttributeIndex, TermIndex, TextIndex
+from model.spliced_column import SplicedColumn
+
+FORMAT_MAGIC = b'XEIDX\x00\x00\x04'
+SECTION_ALIGNMENT = 8
+SECTION_TYPECODES = 'BiIq'
+
+
+def _padded(size):
+    """Round a byte count up to the section alignment."""
+    return -(-size // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+def _layout():
+    """Describe how arrays are laid out on this machine; entries from another layout are not read."""
+    return [sys.byteorder, [array(typecode).itemsize for typecode in SECTION_TYPECODES]]
+
+
+class PackedPostings(Sequence):
+    """
+    Read-only list of posting lists stored back to back in one buffer.
+
+    Item i is the slice of data between offsets[i] and offsets[i + 1], so a
+    posting list is only touched when it is used.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data        # Every posting list, concatenated
+        self.offsets = offsets  # Item -> start in data, plus the end of the last item
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        # Past the end, offsets[i + 1] raises the IndexError that ends iteration
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+
+class PackedMapping(Mapping):
+    """Read-only mapping from keys to posting lists stored in a PackedPostings."""
+
+    def __init__(self, positions, postings):
+        self.positions = positions  # Key -> item in postings
+        self.postings = postings
+
+    def __getitem__(self, key):
+        return self.postings[self.positions[key]]
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+
+class PackedStrings(Sequence):
+    """
+    Read-only list of strings stored back to back as UTF-8 in one buffer.
+
+    Item i is decoded from the bytes between offsets[i] and offsets[i + 1]
+    each time it is read, or is None if present[i] is 0.
+    """
+
+    def __init__(self, data, offsets, present):
+        self.data = data        # Every string, encoded and concatenated
+        self.offsets = offsets  # Item -> start in data, plus the end of the last item
+        self.present = present  # Item -> 1 for a string, 0 for None
+
+    def __len__(self):
+        return len(self.present)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not self.present[i]:
+            return None
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], 'utf-8', 'surrogatepass')
+
+
+class PackedAttributes(Sequence):
+    """
+    Read-only attribute column stored as key and value strings.
+
+    The attributes of row i are the keys and values between offsets[i] and
+    offsets[i + 1]; a dict is built each time they are read, None if there
+    are none.
+    """
+
+    def __init__(self, keys, values, offsets):
+        self.keys = keys        # PackedStrings of every key, in row order
+        self.values = values    # PackedStrings of the value of each key
+        self.offsets = offsets  # Row -> first key, plus the end of the last row
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        # Past the end, offsets[row + 1] raises the IndexError that ends iteration
+        start, stop = self.offsets[row], self.offsets[row + 1]
+        if start == stop:
+            return None
+        keys, values = self.keys, self.values
+        return {keys[i]: values[i] for i in range(start, stop)}
+
+
+class _Sections:
+    """Arrays queued for writing after the header of a cache entry."""
+
+    def __init__(self):
+        self.arrays = []
+        self.size = 0
+
+    def add(self, values):
+        """
+        Queue an array.
+
+        Returns:
+            (str, int, int): Type code, byte offset and length of the section
+        """
+        if isinstance(values, SplicedColumn):
+            values = values.copy()
+        offset = self.size
+        self.arrays.append(values)
+        self.size += _padded(len(values) * values.itemsize)
+        return values.typecode, offset, len(values)
+
+    def add_postings(self, posting_lists):
+        """Queue posting lists as one data section and one offsets section."""
+        data = array('i')
+        offsets = array('q', [0])
+        for rows in posting_lists:
+            data.extend(rows)
+            offsets.append(len(data))
+        return self.add(data), self.add(offsets)
+
+    def add_strings(self, strings):
+        """Queue strings (or None) as data, offsets and presence sections, see PackedStrings."""
+        data = array('B')
+        offsets = array('q', [0])
+        present = array('B')
+        for string in strings:
+            if string is not None:
+                data.frombytes(string.encode('utf-8', 'surrogatepass'))
+            offsets.append(len(data))
+            present.append(string is not None)
+        return self.add(data), self.add(offsets), self.add(present)
+
+    def add_attributes(self, attributes):
+        """Queue an attribute column as key, value and offsets sections, see PackedAttributes."""
+        keys = []
+        values = []
+        offsets = array('q', [0])
+        for attrib in attributes:
+            if attrib:
+                keys.extend(attrib)
+                values.extend(attrib.values())
+            offsets.append(len(keys))
+        return {
+            'keys': self.add_strings(keys),
+            'values': self.add_strings(values),
+            'offsets': self.add(offsets),
+        }
+
+
+class IndexCache:
+    """
+    On-disk cache of node tables and search indexes, one entry per file version.
+
+    Entries are keyed by file identity (path, modification time and size,
+    or content hash) so a changed file is never served stale data. Numeric
+    columns, posting lists, texts and attributes are memory-mapped straight
+    from the entry rather than read, so reopening a large file skips parsing
+    and costs little more than reading its tag names and index terms. The
+    header describing the sections is JSON and is checked before any
+    section is used, so a damaged or planted entry cannot run code. Entries
+    persist across runs; the least recently opened ones are deleted when the
+    cache grows past its size budget.
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        Args:
+            directory: Directory holding the cache entries, created on first store
+            max_bytes: Disk budget for all entries together
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def load(self, file_identity):
+        """
+        Read the entry of a file version.
+
+        Args:
+            file_identity: Identity of the file version, see XMLModel._get_file_identity
+
+        Returns:
+            (NodeTable, TermIndex, AttributeIndex, TextIndex): The cached table and
+                indexes (the text index may be None), or None if there is no
+                usable entry
+        """
+        path = self._entry_path(file_identity)
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            result = self._read(memoryview(buffer), file_identity)
+        except Exception:
+            result = None
+        if result is None:
+            # Corrupt or written by another version of the format
+            self._remove(path)
+            return None
+
+        # The modification time of an entry records when it was last used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def store(self, file_identity, table, tag_index, attribute_index, text_index=None):
+        """
+        Write the entry of a file version, replacing entries of older versions of the file.
+
+        Args:
+            file_identity: Identity of the file version
+            table: NodeTable of the file
+            tag_index: TermIndex of its tags
+            attribute_index: AttributeIndex of its attributes
+            text_index: Optional TextIndex of its element text
+
+        Returns:
+            bool: True if the entry was written
+        """
+        sections = _Sections()
+        meta = {
+            'identity': list(file_identity),
+            'layout': _layout(),
+            'table': {
+                'tag_names': table.tag_names,
+                'tag_ids': sections.add(table.tag_ids),
+                'parents': sections.add(table.parents),
+                'depths': sections.add(table.depths),
+                'positions': sections.add(table.positions),
+                'starts': sections.add(table.starts),
+                'ends': sections.add(table.ends),
+                'lines': sections.add(table.lines),
+                'columns': sections.add(table.columns),
+                'end_lines': sections.add(table.end_lines),
+                'end_columns': sections.add(table.end_columns),
+                'texts': sections.add_strings(table.texts),
+                'attributes': sections.add_attributes(table.attributes),
+            },
+            'tag_index': self._term_index_meta(tag_index, sections),
+            'attribute_keys': self._term_index_meta(attribute_index.keys, sections),
+            'attribute_values': self._term_index_meta(attribute_index.values, sections),
+            'text_index': (self._trigram_meta(text_index.trigrams, sections)
+                           if text_index is not None else None),
+        }
+        meta_bytes = json.dumps(meta, separators=(',', ':')).encode('ascii')
+        header_size = _padded(len(FORMAT_MAGIC) + 8 + len(meta_bytes))
+        if header_size + sections.size > self.max_bytes:
+            return False
+
+        path = self._entry_path(file_identity)
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(FORMAT_MAGIC)
+                f.write(len(meta_bytes).to_bytes(8, 'little'))
+                f.write(meta_bytes)
+                f.write(bytes(header_size - f.tell()))
+                for values in sections.arrays:
+                    f.write(values)
+                    f.write(bytes(_padded(f.tell()) - f.tell()))
+            for old_path in self._version_paths(file_identity):
+                self._remove(old_path)
+            os.replace(temp_path, path)
+        except OSError:
+            if temp_path is not None:
+                self._remove(temp_path)
+            return False
+
+        self._evict(keep=path)
+        return True
+
+    def remove(self, file_identity):
+        """Delete the entry of a file version, e.g. once the file changed."""
+        self._remove(self._entry_path(file_identity))
+
+    def clear(self):
+        """Delete every entry."""
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    @staticmethod
+    def _term_index_meta(index, sections):
+        return {
+            'terms': index.terms,
+            'rows': sections.add_postings(index.posting(term_id) for term_id in range(len(index))),
+            'trigrams': IndexCache._trigram_meta(index.trigrams, sections),
+        }
+
+    @staticmethod
+    def _trigram_meta(trigram_index, sections):
+        grams = list(trigram_index.postings)
+        return {
+            'positions': {gram: i for i, gram in enumerate(grams)},
+            'postings': sections.add_postings(trigram_index.posting(gram) for gram in grams),
+        }
+
+    def _read(self, view, file_identity):
+        """
+        Rebuild the table and indexes from a mapped entry, or return None if it does not match.
+
+        Raises:
+            ValueError: If the header is malformed or describes sections outside the entry
+        """
+        header_end = len(FORMAT_MAGIC) + 8
+        if view[:len(FORMAT_MAGIC)] != FORMAT_MAGIC:
+            return None
+        meta_size = int.from_bytes(view[len(FORMAT_MAGIC):header_end], 'little')
+        if header_end + meta_size > len(view):
+            raise ValueError("Truncated header")
+        meta = json.loads(str(view[header_end:header_end + meta_size], 'ascii'))
+        if not isinstance(meta, dict):
+            raise ValueError("Malformed header")
+        if meta.get('identity') != list(file_identity) or meta.get('layout') != _layout():
+            return None
+        data = view[_padded(header_end + meta_size):]
+
+        def section(descriptor, typecode, count=None):
+            if not (isinstance(descriptor, list) and len(descriptor) == 3 and descriptor[0] == typecode
+                    and all(type(value) is int and value >= 0 for value in descriptor[1:])):
+                raise ValueError(f"Malformed section {descriptor!r}")
+            _, offset, length = descriptor
+            size = length * array(typecode).itemsize
+            if offset % SECTION_ALIGNMENT or offset + size > len(data):
+                raise ValueError(f"Section {descriptor!r} is outside the entry")
+            if count is not None and length != count:
+                raise ValueError(f"Section {descriptor!r} does not have {count} items")
+            return data[offset:offset + size].cast(typecode)
+
+        def strings(value):
+            if not (isinstance(value, list) and all(isinstance(string, str) for string in value)):
+                raise ValueError("Malformed string list")
+            return value
+
+        def postings(descriptors, count):
+            data_section, offsets_section = descriptors
+            offsets = section(offsets_section, 'q', count + 1)
+            return PackedPostings(section(data_section, 'i'), offsets)
+
+        def packed_strings(descriptors, count):
+            data_section, offsets_section, present_section = descriptors
+            return PackedStrings(section(data_section, 'B'), section(offsets_section, 'q', count + 1),
+                                 section(present_section, 'B', count))
+
+        def trigrams(trigram_meta):
+            positions = trigram_meta['positions']
+            if not (isinstance(positions, dict) and all(type(item) is int for item in positions.values())):
+                raise ValueError("Malformed trigram positions")
+            return PackedMapping(positions, postings(trigram_meta['postings'], len(positions)))
+
+        def term_index(term_meta):
+            terms = strings(term_meta['terms'])
+            return TermIndex.from_postings(terms, postings(term_meta['rows'], len(terms)),
+                                           trigrams(term_meta['trigrams']))
+
+        columns = meta['table']
+        tag_ids = section(columns['tag_ids'], 'I')
+        count = len(tag_ids)
+
+        def column(name, typecode):
+            return section(columns[name], typecode, count)
+
+        attribute_meta = columns['attributes']
+        attribute_offsets = section(attribute_meta['offsets'], 'q', count + 1)
+        key_count = attribute_offsets[-1]
+        attributes = PackedAttributes(packed_strings(attribute_meta['keys'], key_count),
+                                      packed_strings(attribute_meta['values'], key_count),
+                                      attribute_offsets)
+        table = NodeTable.from_columns(strings(columns['tag_names']), tag_ids,
+                                       column('parents', 'i'), column('depths', 'I'),
+                                       column('positions', 'I'),
+                                       packed_strings(columns['texts'], count), attributes,
+                                       column('starts', 'q'), column('ends', 'q'),
+                                       column('lines', 'I'), column('columns', 'I'),
+                                       column('end_lines', 'I'), column('end_columns', 'I'))
+        attribute_index = AttributeIndex()
+        attribute_index.keys = term_index(meta['attribute_keys'])
+        attribute_index.values = term_index(meta['attribute_values'])
+        text_index = None
+        if meta['text_index'] is not None:
+            text_index = TextIndex.from_postings(trigrams(meta['text_index']), table.texts)
+        return table, term_index(meta['tag_index']), attribute_index, text_index
+
+    def _entry_path(self, file_identity):
+        """Entry file of a file version: '<path hash>-<identity hash>.idx'."""
+        identity_hash = hashlib.blake2b(repr(file_identity).encode('utf-8', 'surrogatepass'),
+                                        digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{self._path_hash(file_identity)}-{identity_hash}.idx")
+
+    def _version_paths(self, file_identity):
+        """Entry files of every cached version of the file."""
+        prefix = self._path_hash(file_identity) + '-'
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in names
+                if name.startswith(prefix) and name.endswith('.idx')]
+
+    @staticmethod
+    def _path_hash(file_identity):
+        return hashlib.blake2b(file_identity[0].encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+
+    def _entries(self):
+        """Return (path, size, last use) of every file in the cache directory."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries.append((entry.path, stat.st_size, stat.st_mtime))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self, keep):
+        """Delete the least recently used entries until the cache fits its budget."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        # Leftover temporary files of interrupted writes count and are evicted like entries
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            if path != keep and self._remove(path):
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        """Delete a file, ignoring failures (e.g. an entry still mapped on Windows)."""
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
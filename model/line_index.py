@@ -0,0 +1,163 @@
+import re
+import threading
+from array import array
+from bisect import bisect_right
+
+# A line break: CRLF, CR or LF, counted like expat counts lines
+LINE_BREAK = re.compile(rb'\r\n|\r|\n')
+
+
+def count_line_breaks(data):
+    """Count the line breaks in a run of bytes."""
+    return data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
+
+
+def read_blocks(f, block_size):
+    """
+    Read a file in blocks that never end between the CR and LF of a CRLF.
+
+    Yields:
+        bytes: The next block
+    """
+    carry = b''
+    while True:
+        block = f.read(block_size)
+        if not block:
+            if carry:
+                yield carry
+            return
+        data = carry + block
+        # A trailing CR may be the first half of a CRLF
+        if data.endswith(b'\r'):
+            data, carry = data[:-1], b'\r'
+        else:
+            carry = b''
+        if data:
+            yield data
+
+
+class LineIndex:
+    """
+    Sparse index of the lines of a file on disk.
+
+    Records the offset and number of one line per block of the file rather
+    than where every line starts, so it stays small for any file size.
+    Finding where a line starts, or which line an offset is on, reads the
+    file from the nearest recorded line only.
+    """
+
+    def __init__(self, file_path, block_size=1024 * 1024):
+        """
+        Args:
+            file_path: Path to the file
+            block_size: Bytes between recorded lines
+        """
+        self.file_path = file_path
+        self.block_size = block_size
+        self.offsets = array('q')  # Byte offset of each recorded line
+        self.lines = array('q')    # 1-based number of each recorded line
+        self.line_count = 1
+        self._ready = threading.Event()
+
+    def build(self, is_cancelled=None):
+        """
+        Scan the file once.
+
+        Args:
+            is_cancelled: Optional callable; the scan stops when it returns True
+
+        Returns:
+            bool: True if the index was built
+        """
+        offsets = array('q', [0])
+        lines = array('q', [1])
+        offset = 0
+        breaks = 0
+        with open(self.file_path, 'rb') as f:
+            for block in read_blocks(f, self.block_size):
+                if is_cancelled is not None and is_cancelled():
+                    return False
+                # Record the first line that starts in the block
+                match = LINE_BREAK.search(block)
+                if match is not None:
+                    offsets.append(offset + match.end())
+                    lines.append(breaks + 2)
+                breaks += count_line_breaks(block)
+                offset += len(block)
+
+        self.offsets = offsets
+        self.lines = lines
+        self.line_count = breaks + 1
+        self._ready.set()
+        return True
+
+    def build_in_background(self, is_cancelled=None, built=None):
+        """
+        Build the index on a daemon thread; is_ready tells when it is done.
+
+        Args:
+            is_cancelled: Optional callable; the scan stops when it returns True
+            built: Optional callable, called on the thread once the index is built
+        """
+        def build():
+            if self.build(is_cancelled) and built is not None:
+                built()
+
+        thread = threading.Thread(target=build, name="line-index", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self):
+        """Check if the index has been built."""
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Wait until the index has been built; returns False on timeout."""
+        return self._ready.wait(timeout)
+
+    def line_offset(self, line):
+        """
+        Find where a line starts.
+
+        Args:
+            line: 1-based line number, clamped to the lines of the file
+
+        Returns:
+            int: Byte offset of the first character of the line
+        """
+        line = max(1, min(line, self.line_count))
+        nearest = bisect_right(self.lines, line) - 1
+        offset = self.offsets[nearest]
+        remaining = line - self.lines[nearest]
+        if not remaining:
+            return offset
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            for block in read_blocks(f, self.block_size):
+                for match in LINE_BREAK.finditer(block):
+                    remaining -= 1
+                    if not remaining:
+                        return offset + match.end()
+                offset += len(block)
+        return offset
+
+    def line_of_offset(self, offset):
+        """
+        Find the line a byte offset is on.
+
+        Args:
+            offset: Byte offset in the file
+
+        Returns:
+            int: 1-based line number
+        """
+        nearest = max(bisect_right(self.offsets, offset) - 1, 0)
+        start = self.offsets[nearest]
+        size = max(offset - start, 0)
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(size + 1)
+        # An offset between the CR and LF of a CRLF is still on the line the CRLF ends
+        if data[size - 1:size + 1] == b'\r\n':
+            size -= 1
+        return self.lines[nearest] + count_line_breaks(data[:size])
@@ -0,0 +1,369 @@
+import mmap
+import re
+from array import array
+from collections.abc import Sequence
+from xml.parsers import expat
+
+from model.node_table import NodeTable, strip_namespace
+from model.search_index import TermIndex
+from model.stream_loader import LoadCancelled, MemoryLimitExceeded, element_end_location, parse_error
+
+# Start tag from just after its '<' up to and including its '>', skipping quoted attribute values
+_START_TAG_REST = re.compile(rb'''[^"'>]*(?:(?:"[^"]*"|'[^']*')[^"'>]*)*>''')
+
+# One attribute of a start tag: name, then a double- or single-quoted value
+_ATTRIBUTE = re.compile(rb'''([^\s=/>]+)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+
+# Encodings whose bytes can be decoded and re-parsed as UTF-8
+_UTF8_ENCODINGS = (None, 'utf-8', 'utf8', 'us-ascii', 'ascii')
+
+
+def start_tag_end(buffer, start):
+    """
+    Find the end of a start tag.
+
+    Args:
+        buffer: The document bytes (e.g. a memory map)
+        start: Offset of the tag's '<'
+
+    Returns:
+        int: Offset just past the tag's '>'
+    """
+    match = _START_TAG_REST.match(buffer, start + 1)
+    if match is None:
+        raise ValueError(f"unterminated start tag at offset {start}")
+    return match.end()
+
+
+def parse_start_tag(tag):
+    """
+    Read the attributes of a start tag.
+
+    Args:
+        tag: Bytes of a UTF-8 start tag, e.g. b'<item id="3">'
+
+    Returns:
+        dict: Attribute name -> value, without namespace declarations
+    """
+    # Values without references or whitespace to normalize are taken as they
+    # are; anything else is left to expat
+    attributes = {}
+    for name, double_quoted, single_quoted in _ATTRIBUTE.findall(tag):
+        value = double_quoted if double_quoted or not single_quoted else single_quoted
+        if b'&' in value or b'\t' in value or b'\n' in value or b'\r' in value:
+            break
+        attributes[str(name, 'utf-8')] = str(value, 'utf-8')
+    else:
+        return {key: value for key, value in attributes.items()
+                if key != 'xmlns' and not key.startswith('xmlns:')}
+
+    if not tag.endswith(b'/>'):
+        tag = tag[:-1] + b'/>'
+    attributes = {}
+    parser = expat.ParserCreate('utf-8')
+    parser.StartElementHandler = lambda name, attrs: attributes.update(attrs)
+    parser.Parse(tag, True)
+    return {key: value for key, value in attributes.items()
+            if key != 'xmlns' and not key.startswith('xmlns:')}
+
+
+class MappedTexts(Sequence):
+    """
+    Text column read from a memory-mapped file.
+
+    A text is stored as a byte span of the file and decoded each time it is
+    read. Texts whose source bytes differ from the parsed text (entity
+    references, CDATA sections, comments, line-end normalization, non-UTF-8
+    encodings) are kept as strings instead.
+    """
+
+    def __init__(self, buffer, starts, offsets, lengths, strings):
+        """
+        Args:
+            buffer: The mapped file
+            starts: Row -> offset of the element's start tag
+            offsets: Row -> offset of the text from the start tag
+            lengths: Row -> byte length of the text (0 if none, or kept as a string)
+            strings: Row -> text, for texts kept as strings
+        """
+        self.buffer = buffer
+        self.starts = starts
+        self.offsets = offsets
+        self.lengths = lengths
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, row):
+        length = self.lengths[row]
+        buffer = self.buffer
+        if not length or buffer is None:
+            return self.strings.get(row)
+        start = self.starts[row] + self.offsets[row]
+        try:
+            return str(buffer[start:start + length], 'utf-8')
+        except ValueError:
+            if self.buffer is not None:
+                raise
+            return None  # Closed while being read
+
+    def close(self):
+        """Unmap the file; texts read from it are None from then on."""
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+
+class MappedAttributes(Sequence):
+    """
+    Attribute column read from a memory-mapped file.
+
+    Attributes are parsed again from the element's start tag each time they
+    are read. Attributes that cannot be read back from the start tag alone
+    (namespaced names, DTD defaults and entities, non-UTF-8 encodings) are
+    kept as dicts instead.
+    """
+
+    def __init__(self, buffer, starts, mapped, dicts):
+        """
+        Args:
+            buffer: The mapped file
+            starts: Row -> offset of the element's start tag
+            mapped: Row -> 1 if the attributes are read from the start tag, else 0
+            dicts: Row -> attribute dict, for attributes kept as dicts
+        """
+        self.buffer = buffer
+        self.starts = starts
+        self.mapped = mapped
+        self.dicts = dicts
+
+    def __len__(self):
+        return len(self.mapped)
+
+    def __getitem__(self, row):
+        buffer = self.buffer
+        if not self.mapped[row] or buffer is None:
+            return self.dicts.get(row)
+        start = self.starts[row]
+        try:
+            return parse_start_tag(buffer[start:start_tag_end(buffer, start)])
+        except ValueError:
+            if self.buffer is not None:
+                raise
+            return None  # Closed while being read
+
+    def close(self):
+        """Unmap the file; attributes read from it are None from then on."""
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+
+class MappedLoader:
+    """
+    Loads an XML file in low-memory mode.
+
+    Builds the node table and tag index like StreamLoader, but no element
+    tree and no attribute index. Each row records the byte offsets of its
+    element and of its text, and the text and attribute columns decode
+    values from a memory map of the file when they are read, so resident
+    memory grows with the number of elements rather than the file size.
+    """
+
+    def __init__(self, file_path, progress=None, is_cancelled=None,
+                 memory_limit=None, chunk_size=1024 * 1024, bytes_per_element=64):
+        """
+        Args:
+            file_path: Path to the XML file
+            progress: Optional callable(bytes_read, total_bytes, elements)
+            is_cancelled: Optional callable; the load stops when it returns True
+            memory_limit: Optional ceiling in bytes for the estimated memory use
+            chunk_size: Number of bytes parsed between progress reports
+            bytes_per_element: Estimated fixed memory cost of one element
+                               (table row and index entry)
+        """
+        self.file_path = file_path
+        self.progress = progress
+        self.is_cancelled = is_cancelled
+        self.memory_limit = memory_limit
+        self.chunk_size = chunk_size
+        self.bytes_per_element = bytes_per_element
+
+        self.table = NodeTable()
+        self.tag_index = TermIndex()
+        self.estimated_bytes = 0
+
+        self._parser = None
+        self._buffer = None        # Map of the file while parsing
+        self._local_names = []     # Tag id -> namespace-stripped tag
+        self._stack = []           # Open elements: (row, {tag: child count})
+        self._names = {}           # Expat name -> ElementTree tag
+        self._utf8 = True          # Document bytes decode as UTF-8
+        self._internal_dtd = False  # Document has an internal DTD subset
+        self._text_row = None      # Row whose text is being read
+        self._text_start = None    # Offset of its first character data
+        self._text_parts = []
+        self._empty_row = None     # Row whose start tag was the last event
+
+        # Columns of the mapped text and attribute columns
+        self._text_offsets = array('I')
+        self._text_lengths = array('I')
+        self._text_strings = {}
+        self._attributes_mapped = array('B')
+        self._attribute_dicts = {}
+
+    def load(self):
+        """
+        Parse the whole file.
+
+        Returns:
+            (None, NodeTable, TermIndex, None): The node table and tag index;
+                there is no element tree or attribute index in low-memory mode
+
+        Raises:
+            LoadCancelled: If is_cancelled returned True
+            MemoryLimitExceeded: If the estimated memory use passed the ceiling
+            ET.ParseError: If the file is not well-formed
+        """
+        with open(self.file_path, 'rb') as f:
+            # Parsing uses a map of its own, unmapped afterwards, so the pages
+            # it touched are not left resident
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                self._buffer = buffer
+                try:
+                    self._parse(buffer)
+                finally:
+                    self._buffer = None
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        table = self.table
+        table.texts = MappedTexts(mapped, table.starts, self._text_offsets,
+                                  self._text_lengths, self._text_strings)
+        table.attributes = MappedAttributes(mapped, table.starts, self._attributes_mapped,
+                                            self._attribute_dicts)
+        return None, table, self.tag_index, None
+
+    def _parse(self, buffer):
+        """Feed the mapped file to expat in chunks."""
+        parser = self._parser = expat.ParserCreate(None, '}')
+        parser.XmlDeclHandler = self._declaration
+        parser.StartDoctypeDeclHandler = self._doctype
+        parser.StartElementHandler = self._start
+        parser.EndElementHandler = self._end
+        parser.CharacterDataHandler = self._data
+
+        total_bytes = len(buffer)
+        self._utf8 = buffer[:2] not in (b'\xff\xfe', b'\xfe\xff')
+        try:
+            for bytes_read in range(0, total_bytes, self.chunk_size):
+                if self.is_cancelled is not None and self.is_cancelled():
+                    raise LoadCancelled()
+                chunk = buffer[bytes_read:bytes_read + self.chunk_size]
+                parser.Parse(chunk, False)
+                if self.memory_limit and self.estimated_bytes > self.memory_limit:
+                    raise MemoryLimitExceeded()
+                if self.progress is not None:
+                    self.progress(bytes_read + len(chunk), total_bytes, len(self.table))
+            parser.Parse(b'', True)
+        except expat.ExpatError as e:
+            raise parse_error(e) from None
+
+    def _declaration(self, version, encoding, standalone):
+        if encoding is not None and encoding.lower() not in _UTF8_ENCODINGS:
+            self._utf8 = False
+
+    def _doctype(self, name, system_id, public_id, has_internal_subset):
+        # Entities and attribute defaults declared there are lost when a
+        # start tag is parsed on its own
+        if has_internal_subset:
+            self._internal_dtd = True
+
+    def _fixname(self, name):
+        # Expat reports namespaced names as 'uri}local'; ElementTree uses '{uri}local'
+        tag = self._names.get(name)
+        if tag is None:
+            tag = '{' + name if '}' in name else name
+            self._names[name] = tag
+        return tag
+
+    def _start(self, name, attrs):
+        parser = self._parser
+        offset = parser.CurrentByteIndex
+        self._end_text(offset)
+
+        table = self.table
+        tag = self._fixname(name)
+        stack = self._stack
+        if stack:
+            parent, tag_counts = stack[-1]
+            position = tag_counts.get(tag, 0) + 1
+            tag_counts[tag] = position
+        else:
+            parent, position = -1, 1
+        row = len(table.tag_ids)
+        tag_id = table.intern_tag(tag)
+        table.tag_ids.append(tag_id)
+        table.parents.append(parent)
+        table.depths.append(table.depths[parent] + 1 if parent >= 0 else 0)
+        table.positions.append(position)
+        table.append_location(offset, parser.CurrentLineNumber, parser.CurrentColumnNumber + 1)
+        self._text_offsets.append(0)
+        self._text_lengths.append(0)
+        stack.append((row, {}))
+
+        if not attrs:
+            self._attributes_mapped.append(0)
+        elif self._utf8 and not self._internal_dtd and not any('}' in key for key in attrs):
+            self._attributes_mapped.append(1)
+        else:
+            self._attributes_mapped.append(0)
+            attrib = {self._fixname(key): value for key, value in attrs.items()}
+            self._attribute_dicts[row] = attrib
+            self.estimated_bytes += sum(len(key) + len(value) for key, value in attrib.items())
+
+        if tag_id == len(self._local_names):
+            self._local_names.append(strip_namespace(tag))
+        self.tag_index.add(self._local_names[tag_id], row)
+        self.estimated_bytes += self.bytes_per_element
+
+        self._text_row = row
+        self._empty_row = row
+
+    def _end(self, name):
+        parser = self._parser
+        offset = parser.CurrentByteIndex
+        self._end_text(offset)
+        row, _ = self._stack.pop()
+        self.table.set_end(row, *element_end_location(self._buffer, offset, parser.CurrentLineNumber,
+                                                      parser.CurrentColumnNumber,
+                                                      self._empty_row == row))
+        self._empty_row = None
+
+    def _data(self, data):
+        # Character data after a child element is that child's tail, which is not kept
+        self._empty_row = None
+        if self._text_row is None:
+            return
+        if self._text_start is None:
+            self._text_start = self._parser.CurrentByteIndex
+        self._text_parts.append(data)
+
+    def _end_text(self, offset):
+        """Store the text read since the start tag of the current row, which ends at offset."""
+        row = self._text_row
+        self._text_row = None
+        if self._text_start is None:
+            return
+        text_start = self._text_start
+        text = ''.join(self._text_parts)
+        self._text_start = None
+        self._text_parts = []
+
+        encoded = text.encode('utf-8')
+        if self._utf8 and self._buffer[text_start:offset] == encoded:
+            self._text_offsets[row] = text_start - self.table.starts[row]
+            self._text_lengths[row] = len(encoded)
+        else:
+            self._text_strings[row] = text
+            self.estimated_bytes += len(text)
@@ -0,0 +1,269 @@
+from array import array
+
+from DefineConst import XPATH_DEFAULT_ROOT
+
+
+class NodeTable:
+    """
+    Compact, column-oriented table of every element in an XML document.
+
+    Rows are stored in document order and a node is identified by its row
+    index. Numeric columns are array-backed; text and attributes are kept as
+    references to the strings and dicts produced by the parser, never copies.
+    """
+
+    def __init__(self):
+        self.tag_names = []            # Interned tag id -> tag (with namespace)
+        self._tag_lookup = {}          # Tag -> interned tag id
+        self.tag_ids = array('I')      # Row -> interned tag id
+        self.parents = array('i')      # Row -> parent row (-1 for the root)
+        self.depths = array('I')       # Row -> depth (0 for the root)
+        self.positions = array('I')    # Row -> 1-based position among same-tag siblings
+        self.starts = array('q')       # Row -> byte offset of the start tag
+        self.ends = array('q')         # Row -> byte offset just past the end tag
+        self.lines = array('I')        # Row -> 1-based line of the start tag
+        self.columns = array('I')      # Row -> 1-based column of the start tag, in characters
+        self.end_lines = array('I')    # Row -> 1-based line just past the end tag
+        self.end_columns = array('I')  # Row -> 1-based column just past the end tag, in characters
+        self.texts = []                # Row -> element text reference (or None)
+        self.attributes = []           # Row -> element attribute dict reference (or None)
+        self.elements = []             # Row -> live Element reference
+
+    @classmethod
+    def from_columns(cls, tag_names, tag_ids, parents, depths, positions, texts, attributes,
+                     starts, ends, lines, columns, end_lines, end_columns):
+        """
+        Create a table from saved columns, without elements.
+
+        The element column stays empty; the numeric columns may be any
+        sequences, e.g. memory-mapped ones.
+
+        Returns:
+            NodeTable: The table
+        """
+        table = cls()
+        table.tag_names = tag_names
+        table._tag_lookup = {tag: tag_id for tag_id, tag in enumerate(tag_names)}
+        table.tag_ids = tag_ids
+        table.parents = parents
+        table.depths = depths
+        table.positions = positions
+        table.texts = texts
+        table.attributes = attributes
+        table.starts = starts
+        table.ends = ends
+        table.lines = lines
+        table.columns = columns
+        table.end_lines = end_lines
+        table.end_columns = end_columns
+        return table
+
+    def intern_tag(self, tag):
+        """Return the interned id of a tag, adding it if needed."""
+        tag_id = self._tag_lookup.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tag_names)
+            self._tag_lookup[tag] = tag_id
+            self.tag_names.append(tag)
+        return tag_id
+
+    def append(self, element, parent, position):
+        """
+        Append a row for an element.
+
+        Args:
+            element: The parsed Element
+            parent: Row index of the parent element (-1 for the root)
+            position: 1-based position among siblings with the same tag
+
+        Returns:
+            int: Row index of the new node
+        """
+        row = len(self.tag_ids)
+        self.tag_ids.append(self.intern_tag(element.tag))
+        self.parents.append(parent)
+        self.depths.append(self.depths[parent] + 1 if parent >= 0 else 0)
+        self.positions.append(position)
+        self.texts.append(element.text)
+        self.attributes.append(element.attrib or None)
+        self.elements.append(element)
+        return row
+
+    def append_location(self, offset, line, column):
+        """
+        Record where the element of the last appended row starts in the source.
+
+        Its end location is set to 0 until the element's end has been parsed,
+        see set_end.
+
+        Args:
+            offset: Byte offset of the start tag
+            line: 1-based line of the start tag
+            column: 1-based column of the start tag, in characters
+        """
+        self.starts.append(offset)
+        self.ends.append(0)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.end_lines.append(0)
+        self.end_columns.append(0)
+
+    def set_end(self, row, offset, line, column):
+        """
+        Record where the element of a row ends in the source.
+
+        Args:
+            row: Row index of the element
+            offset: Byte offset just past the end tag
+            line: 1-based line just past the end tag
+            column: 1-based column just past the end tag, in characters
+        """
+        self.ends[row] = offset
+        self.end_lines[row] = line
+        self.end_columns[row] = column
+
+    def extend(self, tag_ids, parents, depths, positions):
+        """
+        Append rows from ready-made columns.
+
+        The element, text and attribute columns of the new rows are left
+        empty until attach_elements is called.
+
+        Args:
+            tag_ids: Interned tag id of each row
+            parents: Parent row of each row
+            depths: Depth of each row
+            positions: 1-based position of each row among siblings with the same tag
+        """
+        self.tag_ids.extend(tag_ids)
+        self.parents.extend(parents)
+        self.depths.extend(depths)
+        self.positions.extend(positions)
+
+    def extend_locations(self, starts, ends, lines, columns, end_lines, end_columns):
+        """
+        Append the source locations of rows added with extend.
+
+        Args:
+            starts: Byte offset of the start tag of each row
+            ends: Byte offset just past the end of each row's element
+            lines: 1-based line of each start tag
+            columns: 1-based column of each start tag, in characters
+            end_lines: 1-based line just past each end tag
+            end_columns: 1-based column just past each end tag, in characters
+        """
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        self.lines.extend(lines)
+        self.columns.extend(columns)
+        self.end_lines.extend(end_lines)
+        self.end_columns.extend(end_columns)
+
+    def attach_elements(self, elements):
+        """
+        Fill the element, text and attribute columns.
+
+        Args:
+            elements: The Element of every row, in document order
+        """
+        if len(elements) != len(self.tag_ids):
+            raise ValueError(f"{len(elements)} elements for {len(self.tag_ids)} rows")
+        self.elements = elements
+        self.texts = [element.text for element in elements]
+        self.attributes = [element.attrib or None for element in elements]
+
+    def __len__(self):
+        return len(self.tag_ids)
+
+    def close(self):
+        """
+        Release the file the text and attribute columns read from, if they are
+        mapped (see MappedLoader). Other columns hold nothing open.
+        """
+        for column in (self.texts, self.attributes):
+            close = getattr(column, 'close', None)
+            if close is not None:
+                close()
+
+    def tag(self, row):
+        """Return the tag (with namespace) of a node."""
+        return self.tag_names[self.tag_ids[row]]
+
+    def tag_id(self, tag):
+        """Return the interned id of a tag, or None if it does not occur."""
+        return self._tag_lookup.get(tag)
+
+    def local_name(self, row):
+        """Return the tag of a node without its '{namespace}' prefix."""
+        return strip_namespace(self.tag(row))
+
+    def element_path(self, row):
+        """Generate a human-readable path to the element."""
+        path_parts = []
+        current = row
+
+        # Build path by traversing up to root
+        while current >= 0:
+            path_parts.append(path_label(self.tag(current), self.attributes[current]))
+
+            # Move to the parent
+            current = self.parents[current]
+            if current == 0:
+                # Add root and break
+                path_parts.append(self.tag(0))
+                break
+
+        # Reverse to get root->leaf order and join with '/'
+        path_parts.reverse()
+        return XPATH_DEFAULT_ROOT + '/'.join(path_parts)
+
+    def element_xpath(self, row):
+        """Generate a standard XPath for the element."""
+        path_parts = []
+
+        # Walk up the tree to build the XPath
+        current = row
+        while current > 0:
+            # Tag name (with namespace) and position among siblings with the same tag
+            path_parts.append(f"{self.tag(current)}[{self.positions[current]}]")
+            current = self.parents[current]
+
+        # This is the root element
+        path_parts.append(self.tag(0))
+
+        # Reverse and join with '/'
+        path_parts.reverse()
+        return XPATH_DEFAULT_ROOT + '/'.join(path_parts)
+
+
+def strip_namespace(tag):
+    """Remove the '{namespace}' prefix from a tag, if present."""
+    if '}' in tag:
+        tag = tag.split('}', 1)[1]
+    return tag
+
+
+def path_label(tag, attributes):
+    """
+    Label of one step in a human-readable path.
+
+    Args:
+        tag: Element tag (a namespace prefix is removed)
+        attributes: Element attribute dict (or None)
+
+    Returns:
+        str: The tag followed by its attributes, e.g. 'item [id="3"]'
+    """
+    label = strip_namespace(tag)
+
+    # Add attributes to distinguish elements with same tag
+    if attributes:
+        attribs = []
+        for key, value in attributes.items():
+            # Skip namespace declarations
+            if not key.startswith('xmlns'):
+                attribs.append(f'{key}="{value}"')
+
+        if attribs:
+            label += f" [{' '.join(attribs)}]"
+    return label
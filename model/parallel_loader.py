@@ -0,0 +1,304 @@
+import multiprocessing
+import os
+import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from xml.parsers import expat
+
+from model.node_table import NodeTable, strip_namespace
+from model.search_index import AttributeIndex, TermIndex
+from model.stream_loader import (LoadCancelled, MemoryLimitExceeded, SourceWindow, StreamLoader,
+                                 element_end_location, parse_error, read_start_tag, tag_name)
+
+
+def load_chunk(file_path, parts, bytes_per_element):
+    """
+    Parse and index one chunk of a document in a worker process.
+
+    The chunk is a run of top-level children wrapped in a copy of the root
+    start tag, so namespaces and entities declared there still apply.
+
+    Args:
+        file_path: Path to the XML file
+        parts: Byte ranges and bytes making up the chunk document, see StreamLoader.load_parts
+        bytes_per_element: Estimated fixed memory cost of one element
+
+    Returns:
+        dict: The node table columns and indexes of the chunk, without the
+              wrapping root. Column entries describe chunk rows 1, 2, ...
+              (row 0 is the root); 'top_level' lists the entries of the
+              top-level children. Source locations are relative to the
+              chunk document.
+    """
+    loader = StreamLoader(file_path, bytes_per_element=bytes_per_element)
+    _, table, tag_index, attribute_index = loader.load_parts(parts)
+
+    # Row 0 is the copy of the root, which the main process indexes itself
+    for index in (tag_index, attribute_index.keys, attribute_index.values):
+        for rows in index.rows:
+            if rows[0] == 0:
+                del rows[0]
+
+    parents = table.parents[1:]
+    return {
+        'tag_names': table.tag_names,
+        'tag_ids': table.tag_ids[1:],
+        'parents': parents,
+        'depths': table.depths[1:],
+        'positions': table.positions[1:],
+        'starts': table.starts[1:],
+        'ends': table.ends[1:],
+        'lines': table.lines[1:],
+        'columns': table.columns[1:],
+        'end_lines': table.end_lines[1:],
+        'end_columns': table.end_columns[1:],
+        'top_level': [i for i, parent in enumerate(parents) if parent == 0],
+        'tag_index': tag_index,
+        'attribute_index': attribute_index,
+        'estimated_bytes': loader.estimated_bytes,
+    }
+
+
+class ParallelLoader:
+    """
+    Loads an XML file with the parsing and indexing spread over processes.
+
+    The main process reads the file once. It scans it with expat for the
+    offsets of the root's top-level children and, from the same bytes, builds
+    the element tree with ElementTree's C parser. Runs of top-level children
+    are handed to a process pool as soon as they have been scanned; each
+    worker builds the node table columns and index postings of its chunk.
+    The chunks are then merged in document order, shifting rows and fixing up
+    the sibling positions of top-level children so paths stay global.
+
+    Produces the same results as StreamLoader.
+    """
+
+    def __init__(self, file_path, workers, progress=None, is_cancelled=None,
+                 memory_limit=None, chunk_size=1024 * 1024, bytes_per_element=512):
+        """
+        Args:
+            file_path: Path to the XML file
+            workers: Number of worker processes
+            progress: Optional callable(bytes_read, total_bytes, elements)
+            is_cancelled: Optional callable; the load stops when it returns True
+            memory_limit: Optional ceiling in bytes for the estimated memory use
+            chunk_size: Number of bytes read at a time; also the smallest chunk
+                        handed to a worker
+            bytes_per_element: Estimated fixed memory cost of one element
+        """
+        self.file_path = file_path
+        self.workers = workers
+        self.progress = progress
+        self.is_cancelled = is_cancelled
+        self.memory_limit = memory_limit
+        self.chunk_size = chunk_size
+        self.bytes_per_element = bytes_per_element
+
+        self._scanner = None
+        self._depth = 0
+        self._root_start = None    # Offset of the root start tag
+        self._root_location = None  # (line, column) of the root start tag
+        self._locations = {}       # Chunk start offset -> (line, column)
+        self._chunk_start = None   # Offset of the first top-level child of the pending chunk
+        self._last_boundary = None  # Offset where the most recent chunk starts
+        self._root_end = None      # Offset of the root end tag
+        self._root_end_location = None  # (line, 0-based column) of the root end tag
+        self._boundaries = []      # Offsets of top-level children that start a new chunk
+
+    def load(self):
+        """
+        Parse the whole file.
+
+        Returns:
+            (ElementTree, NodeTable, TermIndex, AttributeIndex): The parsed document
+
+        Raises:
+            LoadCancelled: If is_cancelled returned True
+            MemoryLimitExceeded: If the estimated memory use passed the ceiling
+            ET.ParseError: If the file is not well-formed
+        """
+        total_bytes = os.path.getsize(self.file_path)
+        # Several chunks per worker even out differences in chunk cost
+        self._target = max(total_bytes // (self.workers * 4), self.chunk_size)
+
+        # Workers are spawned rather than forked: the GUI process runs threads
+        executor = ProcessPoolExecutor(max_workers=self.workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+        try:
+            futures = []  # (future, chunk start offset)
+            root = self._scan_and_build(total_bytes, executor, futures)
+            return self._merge(root, futures, total_bytes)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scan_and_build(self, total_bytes, executor, futures):
+        """Read the file once, building the tree and submitting chunks to the workers."""
+        scanner = self._scanner = expat.ParserCreate()
+        scanner.StartElementHandler = self._start
+        scanner.EndElementHandler = self._end
+        builder = ET.XMLParser()
+
+        prolog = None
+        bytes_read = 0
+        with open(self.file_path, 'rb') as f:
+            while True:
+                if self.is_cancelled is not None and self.is_cancelled():
+                    raise LoadCancelled()
+                chunk = f.read(self.chunk_size)
+                try:
+                    scanner.Parse(chunk, not chunk)
+                except expat.ExpatError as e:
+                    raise parse_error(e) from None
+                builder.feed(chunk)
+
+                if self._boundaries or self._root_end is not None:
+                    if prolog is None:
+                        prolog = self._prolog(f)
+                    for start, end in self._take_chunks():
+                        futures.append((executor.submit(load_chunk, self.file_path,
+                                                        [prolog[0], (start, end), prolog[1]],
+                                                        self.bytes_per_element), start))
+                if not chunk:
+                    break
+                bytes_read += len(chunk)
+                if self.progress is not None:
+                    self.progress(bytes_read, total_bytes, 0)
+        return builder.close()
+
+    def _start(self, name, attrs):
+        scanner = self._scanner
+        if self._depth == 1:
+            offset = scanner.CurrentByteIndex
+            if self._last_boundary is None:
+                self._chunk_start = self._last_boundary = offset
+            elif offset - self._last_boundary >= self._target:
+                self._boundaries.append(offset)
+                self._last_boundary = offset
+            else:
+                offset = None
+            if offset is not None:
+                # Workers' locations are relative to their chunk; this maps them back
+                self._locations[offset] = (scanner.CurrentLineNumber, scanner.CurrentColumnNumber + 1)
+        elif self._depth == 0:
+            self._root_start = scanner.CurrentByteIndex
+            self._root_location = (scanner.CurrentLineNumber, scanner.CurrentColumnNumber + 1)
+        self._depth += 1
+
+    def _end(self, name):
+        self._depth -= 1
+        if self._depth == 0:
+            scanner = self._scanner
+            self._root_end = scanner.CurrentByteIndex
+            self._root_end_location = (scanner.CurrentLineNumber, scanner.CurrentColumnNumber)
+
+    def _take_chunks(self):
+        """Return the (start, end) byte ranges of the chunks completed by the scan so far."""
+        chunks = []
+        for boundary in self._boundaries:
+            chunks.append((self._chunk_start, boundary))
+            self._chunk_start = boundary
+        self._boundaries = []
+        if self._root_end is not None and self._chunk_start is not None:
+            chunks.append((self._chunk_start, self._root_end))
+            self._chunk_start = None
+        return chunks
+
+    def _prolog(self, f):
+        """
+        Return what wraps every chunk: the file up to the end of the root
+        start tag, and a matching end tag.
+        """
+        position = f.tell()
+        root_tag = read_start_tag(f, self._root_start, self.chunk_size)
+        f.seek(position)
+
+        # The raw (possibly prefixed) root name, as written in the file
+        return (0, self._root_start + len(root_tag)), b'</' + tag_name(root_tag) + b'>'
+
+    def _merge(self, root, futures, total_bytes):
+        """Combine the root with the chunks, in document order."""
+        table = NodeTable()
+        tag_index = TermIndex()
+        attribute_index = AttributeIndex()
+
+        table.append(root, -1, 1)
+        table.append_location(self._root_start, *self._root_location)
+        table.set_end(0, *self._root_end_position(root.text is None and self._last_boundary is None))
+        tag_index.add(strip_namespace(root.tag), 0)
+        if root.attrib:
+            attribute_index.add(0, root.attrib)
+
+        estimated_bytes = 0
+        top_level_counts = {}  # Top-level tag id -> children with that tag so far
+        for future, chunk_start in futures:
+            chunk = self._result(future)
+            estimated_bytes += chunk['estimated_bytes']
+            if self.memory_limit and estimated_bytes > self.memory_limit:
+                raise MemoryLimitExceeded()
+
+            # Chunk row r becomes table row r + shift
+            shift = len(table) - 1
+            tag_map = [table.intern_tag(tag) for tag in chunk['tag_names']]
+            tag_ids = array('I', map(tag_map.__getitem__, chunk['tag_ids']))
+            parents = array('i', [parent + shift if parent else 0 for parent in chunk['parents']])
+
+            # Sibling positions of top-level children continue from earlier chunks
+            positions = chunk['positions']
+            earlier_counts = dict(top_level_counts)
+            for i in chunk['top_level']:
+                tag_id = tag_ids[i]
+                positions[i] += earlier_counts.get(tag_id, 0)
+                top_level_counts[tag_id] = positions[i]
+
+            table.extend(tag_ids, parents, chunk['depths'], positions)
+            table.extend_locations(*self._file_locations(chunk, chunk_start))
+            tag_index.merge(chunk['tag_index'], shift)
+            attribute_index.merge(chunk['attribute_index'], shift)
+
+            if self.progress is not None:
+                self.progress(total_bytes, total_bytes, len(table))
+
+        table.attach_elements(list(root.iter()))
+        return ET.ElementTree(root), table, tag_index, attribute_index
+
+    def _file_locations(self, chunk, chunk_start):
+        """Convert the source locations of a chunk's rows to locations in the file."""
+        starts, lines, columns = chunk['starts'], chunk['lines'], chunk['columns']
+        # The chunk's first row is its first top-level child, found at chunk_start by the scan
+        first_line = lines[0]
+        file_line, file_column = self._locations[chunk_start]
+        byte_shift = chunk_start - starts[0]
+        line_shift = file_line - first_line
+        column_shift = file_column - columns[0]
+
+        def shift_lines(lines):
+            return array('I', [line + line_shift for line in lines])
+
+        def shift_columns(lines, columns):
+            # Only columns on the chunk's first line are shifted
+            return array('I', [column + column_shift if line == first_line else column
+                               for line, column in zip(lines, columns)])
+
+        return (array('q', [offset + byte_shift for offset in starts]),
+                array('q', [offset + byte_shift for offset in chunk['ends']]),
+                shift_lines(lines), shift_columns(lines, columns),
+                shift_lines(chunk['end_lines']), shift_columns(chunk['end_lines'], chunk['end_columns']))
+
+    def _root_end_position(self, maybe_empty):
+        """Return the offset, line and column just past the root element, see element_end_location."""
+        window = SourceWindow(start=self._root_end - 2)
+        with open(self.file_path, 'rb') as f:
+            f.seek(window.start)
+            window.feed(f.read(self.chunk_size))
+        return element_end_location(window, self._root_end, *self._root_end_location, maybe_empty)
+
+    def _result(self, future):
+        """Wait for a chunk, checking for cancellation while waiting."""
+        while True:
+            if self.is_cancelled is not None and self.is_cancelled():
+                raise LoadCancelled()
+            try:
+                return future.result(timeout=0.1)
+            except FutureTimeout:
+                pass
@@ -0,0 +1,82 @@
+import sys
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Least-recently-used cache of search results under a memory budget.
+    
+    Keys identify the file (path, modification time, size or content hash)
+    and the full query, so entries stay valid across file switches and are
+    never served for a file that has changed.
+    """
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # Key -> (results, size in bytes)
+    
+    def get(self, key):
+        """
+        Look up cached results, marking the entry as recently used.
+        
+        Returns:
+            The cached results, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, key, results):
+        """Store results, evicting least recently used entries to stay under budget."""
+        size = self._estimate_size(key, results)
+        if size > self.max_bytes:
+            return  # Never cache a result larger than the whole budget
+        
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (results, size)
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+    
+    def invalidate(self, predicate=None):
+        """
+        Drop cached entries.
+        
+        Args:
+            predicate: Optional callable taking a key; only matching entries are
+                       dropped. All entries are dropped if omitted.
+        """
+        if predicate is None:
+            self._entries.clear()
+            self.current_bytes = 0
+            return
+        for key in [key for key in self._entries if predicate(key)]:
+            self.current_bytes -= self._entries.pop(key)[1]
+    
+    def stats(self):
+        """Return hit/miss counters and memory use."""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    @staticmethod
+    def _estimate_size(key, results):
+        # Row arrays and ranges report their real buffer size
+        return sys.getsizeof(results) + sys.getsizeof(key)
@@ -0,0 +1,620 @@
+import heapq
+from array import array
+from bisect import bisect_left
+
+from model.spliced_column import SplicedColumn, splice
+
+TRIGRAM_SIZE = 3
+# Rows of posting lists brought up to date with pending shifts per change, see PendingShifts
+SHIFT_SWEEP_BUDGET = 1 << 14
+# Cost of bringing one posting list up to date, in rows
+SHIFT_SWEEP_LIST_COST = 64
+# Posting lists up to this long are copied rather than spliced when shifted
+SHIFT_COPY_LIMIT = 64
+
+
+def trigrams(text):
+    """Return the set of trigrams of a string."""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def is_plain_tag(tag_name):
+    """Check if a search string is a bare tag name rather than an ElementPath expression."""
+    if not tag_name or tag_name.startswith('.'):
+        return False
+    return not any(c in '/[]()@!=*{}' or c.isspace() for c in tag_name)
+
+
+def is_qualified_tag(tag_name):
+    """Check if a search string is a single tag with its namespace, e.g. '{urn:x}item'."""
+    if not tag_name.startswith('{') or '}' not in tag_name:
+        return False
+    return is_plain_tag(tag_name.split('}', 1)[1])
+
+
+def merge_rows(row_lists):
+    """
+    Merge sorted row lists into one sorted array without duplicates.
+
+    Args:
+        row_lists: Iterable of sorted row sequences
+
+    Returns:
+        array: Rows in document order
+    """
+    row_lists = [rows for rows in row_lists if len(rows)]
+    if len(row_lists) == 1:
+        return array('i', row_lists[0])
+
+    merged = array('i')
+    last = -1
+    for row in heapq.merge(*row_lists):
+        if row != last:
+            merged.append(row)
+            last = row
+    return merged
+
+
+def as_array(typecode, values):
+    """Copy a sequence of numbers, e.g. a memory-mapped posting list, into an array."""
+    if isinstance(values, memoryview):
+        result = array(typecode)
+        result.frombytes(values.cast('B'))
+        return result
+    if isinstance(values, SplicedColumn) and values.typecode == typecode:
+        return values.copy()
+    return array(typecode, values)
+
+
+def replace_run(rows, start, stop, new_rows, shift):
+    """
+    Replace the rows of a sorted row list that fall in a run of rows.
+
+    Args:
+        rows: Sorted rows
+        start: First row of the run
+        stop: Row after the run, before the change
+        new_rows: Sorted rows that take the run's place
+        shift: Amount added to the rows from stop on
+
+    Returns:
+        sequence: The updated rows, sharing the rows outside the run; rows
+                  itself if nothing changed
+    """
+    first = bisect_left(rows, start)
+    last = bisect_left(rows, stop)
+    if not new_rows and first == last and (not shift or last == len(rows)):
+        return rows
+    return splice(rows, first, last, new_rows, (None, shift) if shift else None)
+
+
+def shifted_rows(rows, shifts):
+    """
+    Apply shifts to a sorted row list.
+
+    Each shift is a (threshold, amount) pair; amount is added to the rows
+    at least threshold. The rows stay sorted, so a shift moves a tail of the
+    list, and long lists are spliced rather than copied.
+
+    Returns:
+        sequence: The shifted rows
+    """
+    if len(rows) <= SHIFT_COPY_LIMIT:
+        values = list(rows)
+        for threshold, amount in shifts:
+            if values and values[-1] >= threshold:
+                position = bisect_left(values, threshold)
+                values[position:] = [value + amount for value in values[position:]]
+        return array('i', values)
+    for threshold, amount in shifts:
+        position = bisect_left(rows, threshold)
+        if position < len(rows):
+            rows = splice(rows, position, position, (), (None, amount))
+    return rows
+
+
+class PendingShifts:
+    """
+    Row shifts of the posting lists of an index, recorded instead of applied.
+
+    When rows are added or removed, e.g. by an edit, the rows after the
+    change move. Only the posting lists with rows in the change are rebuilt;
+    the others get the move as a pending (threshold, amount) shift, added to
+    their rows at least threshold when they are read. Each posting list has
+    an epoch, the number of shifts it already has. On every change a few
+    posting lists are brought up to date, so shifts are dropped once every
+    list has them instead of piling up.
+    """
+
+    def __init__(self):
+        self.shifts = ()          # (threshold, amount) in the order of the changes
+        self.epochs = {}          # Key -> epoch of its posting list (default 0)
+        self._sweep_keys = None   # Keys of the posting lists being brought up to date
+        self._sweep_position = 0  # Next of the keys to bring up to date
+        self._sweep_epoch = 0     # Number of shifts when the sweep started
+
+    def copy(self):
+        """Return a copy, for the index of the next version of a table."""
+        pending = PendingShifts()
+        pending.shifts = self.shifts
+        pending.epochs = dict(self.epochs)
+        pending._sweep_keys = self._sweep_keys
+        pending._sweep_position = self._sweep_position
+        pending._sweep_epoch = self._sweep_epoch
+        return pending
+
+    def add(self, threshold, amount):
+        """Record that amount is added to the rows at least threshold."""
+        self.shifts += ((threshold, amount),)
+
+    def rows(self, key, rows):
+        """Return the posting list of key with the shifts it does not have yet."""
+        if not self.shifts:
+            return rows
+        epoch = self.epochs.get(key, 0)
+        return shifted_rows(rows, self.shifts[epoch:]) if epoch < len(self.shifts) else rows
+
+    def updated(self, key):
+        """Record that the posting list of key was rebuilt with every shift."""
+        if self.shifts:
+            self.epochs[key] = len(self.shifts)
+
+    def sweep(self, postings, keys):
+        """
+        Bring the next posting lists up to date.
+
+        Args:
+            postings: Key -> posting list; changed in place
+            keys: Callable returning every key, called when a sweep starts
+        """
+        if not self.shifts:
+            return
+        if self._sweep_keys is None:
+            self._sweep_keys = keys()
+            self._sweep_position = 0
+            self._sweep_epoch = len(self.shifts)
+        sweep_keys = self._sweep_keys
+        position = self._sweep_position
+        budget = SHIFT_SWEEP_BUDGET
+        while budget > 0 and position < len(sweep_keys):
+            key = sweep_keys[position]
+            position += 1
+            if self.epochs.get(key, 0) >= self._sweep_epoch:
+                continue
+            rows = postings.get(key) if isinstance(postings, dict) else postings[key]
+            if rows is not None:
+                rows = postings[key] = as_array('i', self.rows(key, rows))
+                self.epochs[key] = len(self.shifts)
+                budget -= len(rows)
+            budget -= SHIFT_SWEEP_LIST_COST
+        self._sweep_position = position
+
+        if position == len(sweep_keys):
+            # Every posting list has the shifts from before the sweep
+            done = self._sweep_epoch
+            self.shifts = self.shifts[done:]
+            self.epochs = {key: epoch - done for key, epoch in self.epochs.items() if epoch > done}
+            self._sweep_keys = None
+
+
+class TrigramIndex:
+    """
+    Maps every trigram to the sorted list of ids whose text contains it.
+
+    Ids must be added in increasing order so posting lists stay sorted.
+    """
+
+    def __init__(self):
+        self.postings = {}               # Trigram -> array of ids
+        self.pending = PendingShifts()   # Shifts of the ids not applied to the posting lists
+
+    def add(self, item_id, text):
+        """Index the trigrams of text under item_id."""
+        postings = self.postings
+        for gram in trigrams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array('i', (item_id,))
+            else:
+                posting.append(item_id)
+
+    def posting(self, gram):
+        """Return the ids whose text contains a trigram, or None if there are none."""
+        posting = self.postings.get(gram)
+        if posting is None:
+            return None
+        return self.pending.rows(gram, posting)
+
+    def candidates(self, query):
+        """
+        Return the ids that may contain query.
+
+        Posting lists are intersected from the shortest up. Once the
+        candidate set is much smaller than the next posting list it is
+        cheaper to verify candidates than to keep intersecting, so the result
+        is a superset of the ids whose text contains query and callers must
+        verify each candidate.
+
+        Args:
+            query: Case-folded search string
+
+        Returns:
+            list: Sorted candidate ids, or None if query is too short to use the index
+        """
+        grams = trigrams(query)
+        if not grams:
+            return None
+
+        postings = [self.posting(gram) for gram in grams]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        if len(postings) == 1:
+            return postings[0]
+
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if len(result) * 4 < len(posting):
+                break
+            result.intersection_update(posting)
+            if not result:
+                break
+        return sorted(result)
+
+
+class TermIndex:
+    """
+    Inverted index from distinct terms (e.g. tag names) to node table rows.
+
+    Substring lookups go through a trigram index over the case-folded
+    distinct terms, so they cost time proportional to the number of distinct
+    terms that match, not to the document size.
+    """
+
+    def __init__(self):
+        self.terms = []         # Term id -> term
+        self.rows = []          # Term id -> array of rows, in document order
+        self._lookup = {}       # Term -> term id
+        self._folded = []       # Term id -> case-folded term
+        self.trigrams = TrigramIndex()
+        self._pending = PendingShifts()  # Term id -> row shifts not applied to its posting list
+
+    @classmethod
+    def from_postings(cls, terms, rows, trigram_postings):
+        """
+        Create an index from saved terms and posting lists.
+
+        Args:
+            terms: Term id -> term
+            rows: Term id -> sorted rows
+            trigram_postings: Mapping from trigram of the case-folded terms to sorted term ids
+
+        Returns:
+            TermIndex: The index
+        """
+        index = cls()
+        index.terms = terms
+        index.rows = rows
+        index._lookup = {term: term_id for term_id, term in enumerate(terms)}
+        index._folded = [term.lower() for term in terms]
+        index.trigrams.postings = trigram_postings
+        return index
+
+    def add(self, term, row):
+        """Record that row contains term. Rows must be added in document order."""
+        rows = self.rows[self._term_id(term)]
+        # A row may contain the same term more than once (e.g. two attributes with one value)
+        if not rows or rows[-1] != row:
+            rows.append(row)
+
+    def merge(self, other, row_offset):
+        """
+        Append the postings of an index built over a later part of the document.
+
+        The other index's case-folded terms and trigram postings are reused,
+        so merging does not re-derive the trigrams of its terms.
+
+        Args:
+            other: TermIndex whose rows, shifted by row_offset, follow every
+                   row added so far
+            row_offset: Amount added to the other index's rows
+        """
+        id_map = []      # Other term id -> term id
+        is_new = []      # Other term id -> whether the term was added by this merge
+        for other_id, term in enumerate(other.terms):
+            term_id = self._lookup.get(term)
+            is_new.append(term_id is None)
+            if term_id is None:
+                term_id = len(self.terms)
+                self._lookup[term] = term_id
+                self.terms.append(term)
+                self.rows.append(array('i'))
+                self._folded.append(other._folded[other_id])
+            id_map.append(term_id)
+            self.rows[term_id].extend([row + row_offset for row in other.rows[other_id]])
+
+        # Term ids of new terms are increasing, so posting lists stay sorted
+        postings = self.trigrams.postings
+        for gram, other_posting in other.trigrams.postings.items():
+            term_ids = [id_map[other_id] for other_id in other_posting if is_new[other_id]]
+            if not term_ids:
+                continue
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array('i', term_ids)
+            else:
+                posting.extend(term_ids)
+
+    def _term_id(self, term):
+        """Return the id of a term, adding it if needed."""
+        term_id = self._lookup.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._lookup[term] = term_id
+            self.terms.append(term)
+            self.rows.append(array('i'))
+            folded = term.lower()
+            self._folded.append(folded)
+            self.trigrams.add(term_id, folded)
+        return term_id
+
+    def replace_rows(self, start, stop, replacement, shift):
+        """
+        Return a copy of the index with the postings of a run of rows replaced,
+        e.g. after the rows of a subtree were parsed again.
+
+        Only the posting lists of terms in the run are rebuilt, and those
+        share their rows outside the run. The rows of other terms that come
+        after the run move by a pending shift, applied when they are read.
+
+        Args:
+            start: First row of the run
+            stop: Row after the run, before the change
+            replacement: Term -> sorted rows that take the run's place; terms
+                         with rows in the run map to an empty sequence if they
+                         no longer occur
+            shift: Change in the number of rows; added to the rows from stop on
+
+        Returns:
+            TermIndex: The updated index
+        """
+        index = TermIndex()
+        index.terms = self.terms
+        index._lookup = self._lookup
+        index._folded = self._folded
+        index.trigrams = self.trigrams
+        index.rows = list(self.rows)
+        pending = index._pending = self._pending.copy()
+        if shift:
+            pending.add(stop, shift)
+        for term, new_rows in replacement.items():
+            term_id = self._lookup.get(term)
+            if term_id is not None:
+                index.rows[term_id] = replace_run(self.posting(term_id), start, stop, new_rows, shift)
+                pending.updated(term_id)
+
+        new_terms = [term for term in replacement if len(replacement[term]) and term not in self._lookup]
+        if new_terms:
+            # Shared lists and posting lists are copied before they change
+            index.terms = list(self.terms)
+            index._lookup = dict(self._lookup)
+            index._folded = list(self._folded)
+            index.trigrams = TrigramIndex()
+            postings = index.trigrams.postings = dict(self.trigrams.postings)
+            for term in new_terms:
+                term_id = len(index.terms)
+                folded = term.lower()
+                index._lookup[term] = term_id
+                index.terms.append(term)
+                index._folded.append(folded)
+                index.rows.append(array('i', replacement[term]))
+                pending.updated(term_id)
+                for gram in trigrams(folded):
+                    posting = as_array('i', postings.get(gram, ()))
+                    posting.append(term_id)
+                    postings[gram] = posting
+
+        pending.sweep(index.rows, lambda: range(len(index.rows)))
+        return index
+
+    def posting(self, term_id):
+        """Return the rows containing a term, in document order."""
+        return self._pending.rows(term_id, self.rows[term_id])
+
+    def __len__(self):
+        return len(self.terms)
+
+    def exact(self, term):
+        """Return the rows containing exactly term."""
+        term_id = self._lookup.get(term)
+        if term_id is None:
+            return array('i')
+        return self.posting(term_id)
+
+    def matching_terms(self, query):
+        """Return the ids of the terms that contain query, ignoring case."""
+        query = query.lower()
+        candidates = self.trigrams.candidates(query)
+        if candidates is None:
+            # Too short for trigrams: check every distinct term
+            candidates = range(len(self.terms))
+        folded = self._folded
+        return [term_id for term_id in candidates if query in folded[term_id]]
+
+    def rows_containing(self, query):
+        """Return the rows whose term contains query, ignoring case, in document order."""
+        return merge_rows(self.posting(term_id) for term_id in self.matching_terms(query))
+
+
+class AttributeIndex:
+    """
+    Index of attribute keys and values.
+
+    Distinct keys and distinct values each get their own TermIndex, so a
+    partial attribute search only looks at the distinct strings and the rows
+    that actually match.
+    """
+
+    def __init__(self):
+        self.keys = TermIndex()    # Attribute key -> rows
+        self.values = TermIndex()  # Attribute value -> rows
+
+    @classmethod
+    def build(cls, attributes):
+        """
+        Index the attribute column of a node table.
+
+        Args:
+            attributes: Row -> attribute dict (or None)
+
+        Returns:
+            AttributeIndex: The index
+        """
+        index = cls()
+        for row, attrib in enumerate(attributes):
+            if attrib:
+                index.add(row, attrib)
+        return index
+
+    def add(self, row, attrib):
+        """Index the attributes of a row. Rows must be added in document order."""
+        add_key = self.keys.add
+        add_value = self.values.add
+        for key, value in attrib.items():
+            add_key(key, row)
+            add_value(value, row)
+
+    def merge(self, other, row_offset):
+        """Append the postings of an index built over a later part of the document, see TermIndex.merge."""
+        self.keys.merge(other.keys, row_offset)
+        self.values.merge(other.values, row_offset)
+
+    def replace_rows(self, start, stop, keys, values, shift):
+        """
+        Return a copy of the index with the postings of a run of rows replaced, see TermIndex.replace_rows.
+
+        Args:
+            keys: Attribute key -> sorted rows that take the run's place
+            values: Attribute value -> sorted rows that take the run's place
+        """
+        index = AttributeIndex()
+        index.keys = self.keys.replace_rows(start, stop, keys, shift)
+        index.values = self.values.replace_rows(start, stop, values, shift)
+        return index
+
+    def rows_containing(self, query):
+        """Return the rows with an attribute key or value containing query, ignoring case."""
+        return merge_rows((self.keys.rows_containing(query), self.values.rows_containing(query)))
+
+
+class TextIndex:
+    """
+    Trigram index over the case-folded text of every element.
+
+    Unlike TermIndex the posting lists point straight at rows, since element
+    text is mostly distinct.
+    """
+
+    def __init__(self):
+        self.trigrams = TrigramIndex()
+        self.texts = None  # Row -> original text, for verifying candidates
+
+    @classmethod
+    def build(cls, texts, is_cancelled=None):
+        """
+        Index the text column of a node table.
+
+        Args:
+            texts: Row -> element text (or None)
+            is_cancelled: Optional callable; building stops early when it returns True
+
+        Returns:
+            TextIndex: The index, or None if building was cancelled
+        """
+        index = cls()
+        add = index.trigrams.add
+        for row, text in enumerate(texts):
+            if text:
+                add(row, text.lower())
+            if is_cancelled is not None and row % 10000 == 0 and is_cancelled():
+                return None
+        index.texts = texts
+        return index
+
+    @classmethod
+    def from_postings(cls, trigram_postings, texts):
+        """
+        Create an index from saved posting lists.
+
+        Args:
+            trigram_postings: Mapping from trigram of the case-folded texts to sorted rows
+            texts: Row -> element text (or None)
+
+        Returns:
+            TextIndex: The index
+        """
+        index = cls()
+        index.trigrams.postings = trigram_postings
+        index.texts = texts
+        return index
+
+    def replace_rows(self, start, stop, texts, shift):
+        """
+        Return a copy of the index with the texts of a run of rows replaced,
+        e.g. after the rows of a subtree were parsed again.
+
+        Only the posting lists of trigrams in the old or new texts of the run
+        are rebuilt, and those share their rows outside the run. The other
+        rows after the run move by a pending shift, see TrigramIndex.
+
+        Args:
+            start: First row of the run
+            stop: Row after the run, before the change
+            texts: Row -> element text, after the change
+            shift: Change in the number of rows; added to the rows from stop on
+
+        Returns:
+            TextIndex: The updated index
+        """
+        old_grams = set()
+        for row in range(start, stop):
+            text = self.texts[row]
+            if text:
+                old_grams.update(trigrams(text.lower()))
+        new_rows = {}
+        for row in range(start, stop + shift):
+            text = texts[row]
+            if text:
+                for gram in trigrams(text.lower()):
+                    new_rows.setdefault(gram, array('i')).append(row)
+
+        old = self.trigrams
+        index = TextIndex()
+        index.texts = texts
+        postings = index.trigrams.postings = dict(old.postings)
+        pending = index.trigrams.pending = old.pending.copy()
+        if shift:
+            pending.add(stop, shift)
+        for gram in old_grams.union(new_rows):
+            posting = replace_run(old.posting(gram) or (), start, stop, new_rows.get(gram, ()), shift)
+            if len(posting):
+                postings[gram] = posting
+                pending.updated(gram)
+            else:
+                postings.pop(gram, None)
+        pending.sweep(postings, lambda: list(postings))
+        return index
+
+    def rows_containing(self, query):
+        """
+        Return the rows whose text contains query, ignoring case.
+
+        Returns:
+            array: Rows in document order, or None if query is too short for the index
+        """
+        query = query.lower()
+        candidates = self.trigrams.candidates(query)
+        if candidates is None:
+            return None
+        texts = self.texts
+        return array('i', (row for row in candidates if query in texts[row].lower()))
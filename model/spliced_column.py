@@ -0,0 +1,171 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+
+# Runs a spliced column may be made of before it is copied into one array
+MAX_RUNS = 256
+# Pending shifts a run may carry before its column is copied
+MAX_SHIFTS = 32
+
+
+class SplicedColumn(Sequence):
+    """
+    Read-only column made of runs of other columns, with shifts applied on read.
+
+    Replacing rows this way costs time in the number of runs, not rows: the
+    rows before and after the change stay in the old column, and an amount
+    added to the rows after it (e.g. the byte offsets after an edit) is
+    recorded with their run instead of applied. A run's shifts are
+    (threshold, amount) pairs, applied in order to each value at least
+    threshold, or to every value if threshold is None.
+    """
+
+    def __init__(self, typecode, runs):
+        """
+        Args:
+            typecode: Array type code of the values, or None for a column of objects
+            runs: List of (values, start, stop, shifts); the column is every
+                  values[start:stop] in order, with its shifts applied
+        """
+        self.typecode = typecode
+        self.runs = runs
+        self._bounds = array('q')  # Run -> row of its first value
+        length = 0
+        for _, start, stop, _ in runs:
+            self._bounds.append(length)
+            length += stop - start
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            start, stop, step = row.indices(self._length)
+            values = _copy(self.typecode, _runs_of(self, start, max(start, stop)))
+            return values if step == 1 else values[::step]
+        if row < 0:
+            row += self._length
+        if not 0 <= row < self._length:
+            raise IndexError('column index out of range')
+        run = bisect_right(self._bounds, row) - 1
+        values, start, _, shifts = self.runs[run]
+        value = values[start + row - self._bounds[run]]
+        for threshold, amount in shifts:
+            if threshold is None or value >= threshold:
+                value += amount
+        return value
+
+    def __iter__(self):
+        for values, start, stop, shifts in self.runs:
+            yield from _shifted(_take(values, start, stop), shifts)
+
+    def copy(self):
+        """Return the values as one array, or a list for a column of objects."""
+        return _copy(self.typecode, self.runs)
+
+
+def splice(column, start, stop, values, shift=None):
+    """
+    Return a column with a run of rows replaced.
+
+    The old column is not changed. The result shares the old column's rows,
+    unless it grew past MAX_RUNS runs or MAX_SHIFTS shifts and was copied.
+
+    Args:
+        column: Array, list, memoryview or SplicedColumn
+        start: First row replaced
+        stop: Row after the last row replaced
+        values: Sequence of rows that take their place; kept, not copied
+        shift: Optional (threshold, amount) to apply to the rows from stop on,
+               see SplicedColumn
+
+    Returns:
+        sequence: The new column
+    """
+    runs = _runs_of(column, 0, start)
+    if len(values):
+        runs.append((values, 0, len(values), ()))
+    for run_values, run_start, run_stop, shifts in _runs_of(column, stop, len(column)):
+        if shift is not None:
+            shifts = _add_shift(shifts, shift)
+        runs.append((run_values, run_start, run_stop, shifts))
+
+    typecode = _typecode(column)
+    if len(runs) > MAX_RUNS or any(len(run[3]) > MAX_SHIFTS for run in runs):
+        return _copy(typecode, runs)
+    return SplicedColumn(typecode, runs)
+
+
+def _add_shift(shifts, shift):
+    """Append a shift to a run's shifts, merging it into a last shift of every value."""
+    threshold, amount = shift
+    if threshold is None and shifts and shifts[-1][0] is None:
+        return shifts[:-1] + ((None, shifts[-1][1] + amount),)
+    return shifts + (shift,)
+
+
+def _typecode(column):
+    """Return the array type code of a column's values, or None for objects."""
+    if isinstance(column, (array, SplicedColumn)):
+        return column.typecode
+    if isinstance(column, memoryview):
+        return column.format
+    return None
+
+
+def _runs_of(column, start, stop):
+    """Return the runs holding rows start..stop of a column."""
+    if start >= stop:
+        return []
+    if not isinstance(column, SplicedColumn):
+        return [(column, start, stop, ())]
+    runs = []
+    bounds = column._bounds
+    run = bisect_right(bounds, start) - 1
+    while run < len(column.runs) and bounds[run] < stop:
+        values, run_start, run_stop, shifts = column.runs[run]
+        first = bounds[run]
+        runs.append((values, run_start + max(start - first, 0),
+                     run_stop - max(first + run_stop - run_start - stop, 0), shifts))
+        run += 1
+    return runs
+
+
+def _take(values, start, stop):
+    """Return values[start:stop], also for sequences that cannot be sliced."""
+    if isinstance(values, (array, list, memoryview)):
+        return values[start:stop]
+    return [values[i] for i in range(start, stop)]
+
+
+def _shifted(values, shifts):
+    """Apply shifts to an iterable of values."""
+    for threshold, amount in shifts:
+        if threshold is None:
+            values = map(amount.__add__, values)
+        else:
+            values = _shifted_from(values, threshold, amount)
+    return values
+
+
+def _shifted_from(values, threshold, amount):
+    """Add amount to the values at least threshold."""
+    for value in values:
+        yield value + amount if value >= threshold else value
+
+
+def _copy(typecode, runs):
+    """Concatenate runs into one array, or a list if typecode is None."""
+    result = array(typecode) if typecode else []
+    for values, start, stop, shifts in runs:
+        part = _take(values, start, stop)
+        if shifts:
+            result.extend(_shifted(part, shifts))
+        elif typecode and isinstance(part, memoryview):
+            result.frombytes(part.cast('B'))
+        elif isinstance(part, array) and part.typecode != typecode:
+            result.extend(iter(part))
+        else:
+            result.extend(part)
+    return result
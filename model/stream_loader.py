@@ -0,0 +1,311 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+from model.node_table import NodeTable, strip_namespace
+from model.search_index import AttributeIndex, TermIndex
+
+
+# A start tag; '>' inside a quoted attribute value does not end it
+START_TAG = re.compile(rb'<[^"\'>]*(?:(?:"[^"]*"|\'[^\']*\')[^"\'>]*)*>')
+
+
+class LoadCancelled(Exception):
+    """Raised when a streaming load is cancelled."""
+
+
+class MemoryLimitExceeded(Exception):
+    """Raised when a streaming load exceeds its memory ceiling."""
+
+
+def parse_error(error):
+    """Convert an expat error to the ET.ParseError ElementTree would raise."""
+    result = ET.ParseError(f"{expat.ErrorString(error.code)}: line {error.lineno}, column {error.offset}")
+    result.code = error.code
+    result.position = (error.lineno, error.offset)
+    return result
+
+
+def element_end(data, index, maybe_empty):
+    """
+    Find where an element ends from the byte index of its end event.
+
+    Expat reports the end of an empty-element tag ('<a/>') just past it, and
+    any other end tag at its '<'.
+
+    Args:
+        data: Document bytes around index, indexed by document offset (a
+              memory map or a SourceWindow)
+        index: Byte index expat reported for the end event
+        maybe_empty: False if character data or a child was reported since
+                     the element's start tag
+
+    Returns:
+        int: Offset just past the element's last byte
+    """
+    if maybe_empty and data[index - 2:index] == b'/>':
+        return index
+    return data.find(b'>', index) + 1
+
+
+def element_end_location(data, index, line, column, maybe_empty):
+    """
+    Find where an element ends, as an offset and a line and column, from the
+    position of its end event.
+
+    Args:
+        data: Document bytes around index, see element_end
+        index: Byte index expat reported for the end event
+        line: Line expat reported for the end event
+        column: 0-based column expat reported for the end event
+        maybe_empty: See element_end
+
+    Returns:
+        (int, int, int): Offset, 1-based line and 1-based column (in
+            characters) just past the element's last byte
+    """
+    end = element_end(data, index, maybe_empty)
+    # The rest of the end tag, which may hold line breaks before its '>'
+    rest = data[index:end].decode('utf-8', 'replace')
+    if '\n' not in rest and '\r' not in rest:
+        return end, line, column + 1 + len(rest)
+    breaks = rest.count('\n') + rest.count('\r') - rest.count('\r\n')
+    return end, line + breaks, len(rest) - max(rest.rfind('\n'), rest.rfind('\r'))
+
+
+def read_start_tag(f, offset, block_size=64 * 1024):
+    """
+    Read the start tag at an offset of a file.
+
+    Args:
+        f: File opened in binary mode
+        offset: Byte offset of the tag's '<'
+        block_size: Number of bytes read at a time
+
+    Returns:
+        bytes: The tag, up to and including its '>'
+
+    Raises:
+        ET.ParseError: If there is no complete start tag at offset
+    """
+    f.seek(offset)
+    data = b''
+    while True:
+        block = f.read(block_size)
+        data += block
+        match = START_TAG.match(data)
+        if match is not None:
+            return match.group()
+        if not block:
+            raise ET.ParseError(f"unclosed start tag at offset {offset}")
+
+
+def tag_name(tag):
+    """Return the name of a start tag as written, with its prefix (e.g. b'x:item')."""
+    return tag[1:].split(None, 1)[0].rstrip(b'/>')
+
+
+class SourceWindow:
+    """
+    The most recent bytes fed to a parser, indexed by document offset.
+
+    Keeps enough of the previous chunk to cover a tag split across chunks,
+    so element ends can be found without holding the whole document.
+    """
+
+    def __init__(self, start=0, keep=64 * 1024):
+        """
+        Args:
+            start: Document offset of the first byte fed
+            keep: Number of bytes of earlier chunks kept
+        """
+        self.start = start  # Document offset of data[0]
+        self.keep = keep
+        self.data = b''
+
+    def feed(self, chunk):
+        """Add the next bytes of the document."""
+        kept = self.data[-self.keep:]
+        self.start += len(self.data) - len(kept)
+        self.data = kept + chunk
+
+    def __getitem__(self, key):
+        return self.data[max(key.start - self.start, 0):max(key.stop - self.start, 0)]
+
+    def find(self, sub, start):
+        """Return the document offset of sub at or after start, or -1."""
+        index = self.data.find(sub, max(start - self.start, 0))
+        return index + self.start if index >= 0 else -1
+
+
+class StreamLoader:
+    """
+    Parses an XML file incrementally, building the element tree, the node
+    table and the tag/attribute indexes in a single pass.
+
+    The file is fed to expat in chunks; between chunks the loader reports
+    progress, checks for cancellation and enforces the memory ceiling.
+    """
+
+    def __init__(self, file_path, progress=None, is_cancelled=None,
+                 memory_limit=None, chunk_size=1024 * 1024, bytes_per_element=512):
+        """
+        Args:
+            file_path: Path to the XML file
+            progress: Optional callable(bytes_read, total_bytes, elements)
+            is_cancelled: Optional callable; the load stops when it returns True
+            memory_limit: Optional ceiling in bytes for the estimated memory use
+            chunk_size: Number of bytes parsed between progress reports
+            bytes_per_element: Estimated fixed memory cost of one element
+                               (tree node, table row and index entries)
+        """
+        self.file_path = file_path
+        self.progress = progress
+        self.is_cancelled = is_cancelled
+        self.memory_limit = memory_limit
+        self.chunk_size = chunk_size
+        self.bytes_per_element = bytes_per_element
+
+        self.builder = ET.TreeBuilder()
+        self.table = NodeTable()
+        self.tag_index = TermIndex()
+        self.attribute_index = AttributeIndex()
+        self.estimated_bytes = 0
+
+        self._local_names = []  # Tag id -> namespace-stripped tag
+        self._stack = []        # Open elements: (element, row, {tag: child count})
+        self._names = {}        # Expat name -> ElementTree tag
+        self._parser = None
+        self._window = SourceWindow()
+
+    def load(self):
+        """
+        Parse the whole file.
+
+        Returns:
+            (ElementTree, NodeTable, TermIndex, AttributeIndex): The parsed document
+
+        Raises:
+            LoadCancelled: If is_cancelled returned True
+            MemoryLimitExceeded: If the estimated memory use passed the ceiling
+            ET.ParseError: If the file is not well-formed
+        """
+        with open(self.file_path, 'rb') as f:
+            return self._parse(iter(lambda: f.read(self.chunk_size), b''), os.path.getsize(self.file_path))
+
+    def load_parts(self, parts):
+        """
+        Parse a document assembled from parts of the file.
+
+        Args:
+            parts: Sequence of (start, end) byte ranges of the file and bytes
+                   objects, concatenated in order
+
+        Returns:
+            (ElementTree, NodeTable, TermIndex, AttributeIndex): The parsed document
+
+        Raises:
+            LoadCancelled: If is_cancelled returned True
+            MemoryLimitExceeded: If the estimated memory use passed the ceiling
+            ET.ParseError: If the document is not well-formed
+        """
+        total_bytes = sum(len(part) if isinstance(part, bytes) else part[1] - part[0] for part in parts)
+        with open(self.file_path, 'rb') as f:
+            return self._parse(self._read_parts(f, parts), total_bytes)
+
+    def _read_parts(self, f, parts):
+        """Yield the bytes of parts in chunks of at most chunk_size."""
+        for part in parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            start, end = part
+            f.seek(start)
+            while start < end:
+                chunk = f.read(min(self.chunk_size, end - start))
+                if not chunk:
+                    break
+                start += len(chunk)
+                yield chunk
+
+    def _parse(self, chunks, total_bytes):
+        """Feed chunks of the document to expat and build the results."""
+        parser = self._parser = expat.ParserCreate(None, '}')
+        parser.buffer_text = True
+        parser.StartElementHandler = self._start
+        parser.EndElementHandler = self._end
+        parser.CharacterDataHandler = self.builder.data
+
+        bytes_read = 0
+        try:
+            for chunk in chunks:
+                if self.is_cancelled is not None and self.is_cancelled():
+                    raise LoadCancelled()
+                self._window.feed(chunk)
+                parser.Parse(chunk, False)
+                bytes_read += len(chunk)
+                if self.memory_limit and self.estimated_bytes > self.memory_limit:
+                    raise MemoryLimitExceeded()
+                if self.progress is not None:
+                    self.progress(bytes_read, total_bytes, len(self.table))
+            parser.Parse(b'', True)
+        except expat.ExpatError as e:
+            raise parse_error(e) from None
+
+        root = self.builder.close()
+        return ET.ElementTree(root), self.table, self.tag_index, self.attribute_index
+
+    def _fixname(self, name):
+        # Expat reports namespaced names as 'uri}local'; ElementTree uses '{uri}local'
+        tag = self._names.get(name)
+        if tag is None:
+            tag = '{' + name if '}' in name else name
+            self._names[name] = tag
+        return tag
+
+    def _start(self, name, attrs):
+        fixname = self._fixname
+        tag = fixname(name)
+        attrib = {fixname(key): value for key, value in attrs.items()} if attrs else {}
+        element = self.builder.start(tag, attrib)
+
+        stack = self._stack
+        if stack:
+            _, parent, tag_counts = stack[-1]
+            position = tag_counts.get(tag, 0) + 1
+            tag_counts[tag] = position
+        else:
+            parent, position = -1, 1
+        parser = self._parser
+        row = self.table.append(element, parent, position)
+        self.table.append_location(parser.CurrentByteIndex, parser.CurrentLineNumber,
+                                   parser.CurrentColumnNumber + 1)
+        stack.append((element, row, {}))
+
+        # Indexes are filled in the same pass
+        tag_id = self.table.tag_ids[row]
+        if tag_id == len(self._local_names):
+            self._local_names.append(strip_namespace(tag))
+        self.tag_index.add(self._local_names[tag_id], row)
+        if attrib:
+            self.attribute_index.add(row, attrib)
+            self.estimated_bytes += sum(len(key) + len(value) for key, value in attrib.items())
+        self.estimated_bytes += self.bytes_per_element
+
+    def _end(self, name):
+        element = self.builder.end(self._fixname(name))
+        _, row, _ = self._stack.pop()
+
+        # Text is only complete once the element has ended
+        text = element.text
+        if text is not None:
+            self.table.texts[row] = text
+            self.estimated_bytes += len(text)
+
+        # Nothing was reported inside an element without text or children
+        maybe_empty = text is None and row == len(self.table) - 1
+        parser = self._parser
+        self.table.set_end(row, *element_end_location(self._window, parser.CurrentByteIndex,
+                                                      parser.CurrentLineNumber,
+                                                      parser.CurrentColumnNumber, maybe_empty))
@@ -0,0 +1,233 @@
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+from model.element_record import DetachedRecord
+from model.node_table import path_label, strip_namespace
+from model.search_index import is_plain_tag, is_qualified_tag
+from model.stream_loader import SourceWindow, element_end_location
+from DefineConst import ERROR_STREAMING_PATH, SEARCH_ALL_ELEMENTS, XPATH_DEFAULT_ROOT
+
+
+class SearchCancelled(Exception):
+    """Raised when a search is cancelled because a newer one has started."""
+
+
+class SearchCriteria:
+    """The tag/attribute/value criteria of a search, evaluated one element at a time."""
+    
+    def __init__(self, tag_name, flag_name, flag_att, flag_value, partial_match):
+        """
+        Raises:
+            ValueError: If an exact search is a path expression, see supports
+        """
+        if not self.supports(tag_name, partial_match):
+            raise ValueError(ERROR_STREAMING_PATH)
+        self.tag_name = tag_name
+        self.flag_name = flag_name
+        self.flag_att = flag_att
+        self.flag_value = flag_value
+        self.partial_match = partial_match
+        self.query = tag_name.lower()
+        self.match_all = tag_name == SEARCH_ALL_ELEMENTS
+        self.plain_tag = is_plain_tag(tag_name)
+        # '{}tag' is a tag without a namespace
+        self.qualified_tag = tag_name[2:] if tag_name.startswith('{}') else tag_name
+    
+    @staticmethod
+    def supports(tag_name, partial_match):
+        """
+        Check if a search can be evaluated one element at a time.
+        
+        Path expressions (e.g. 'a/b' or 'item[@id]') need the element tree, so
+        an exact search must be a tag, bare or with its namespace.
+        """
+        if partial_match or tag_name == SEARCH_ALL_ELEMENTS:
+            return True
+        return is_plain_tag(tag_name) or is_qualified_tag(tag_name)
+    
+    def matches(self, tag, text, attributes, is_root):
+        """
+        Check one element against the criteria.
+        
+        Args:
+            tag: Element tag (with namespace)
+            text: Element text (or None)
+            attributes: Element attribute dict
+            is_root: True for the document element
+        """
+        if self.match_all:
+            return True
+        
+        if not self.partial_match:
+            # Exact tag match; like findall('.//tag') the root is excluded
+            if is_root:
+                return False
+            if self.plain_tag:
+                return strip_namespace(tag) == self.tag_name
+            return tag == self.qualified_tag
+        
+        query = self.query
+        if self.flag_name and query in tag.lower():
+            return True
+        if self.flag_value and text is not None and query in text.lower():
+            return True
+        if self.flag_att and attributes:
+            for key, value in attributes.items():
+                if query in key.lower() or query in value.lower():
+                    return True
+        return False
+
+
+class StreamSearch:
+    """
+    Searches an XML file directly over parse events, without building a tree.
+    
+    Only the chain of open ancestors is kept in memory, so files larger than
+    RAM can be searched. Matches carry their path and XPath, computed from the
+    ancestor stack, and are produced in document order as the file is read.
+    """
+    
+    def __init__(self, file_path, criteria, is_cancelled=None, chunk_size=1024 * 1024):
+        """
+        Args:
+            file_path: Path to the XML file
+            criteria: SearchCriteria to evaluate
+            is_cancelled: Optional callable; the search stops when it returns True
+            chunk_size: Number of bytes parsed between batches
+        """
+        self.file_path = file_path
+        self.criteria = criteria
+        self.is_cancelled = is_cancelled
+        self.chunk_size = chunk_size
+        
+        self._stack = []    # Open elements: [tag, attributes, position, {tag: child count}]
+        self._locations = []  # Open elements: (byte offset, line, column) of the start tag
+        self._open_matches = {}  # Depth -> record of a matched element that has not ended
+        self._pending = None  # Element whose text is still being collected
+        self._text = []
+        self._matches = []
+        self._names = {}
+        self._parser = None
+        self._window = SourceWindow()
+    
+    def batches(self):
+        """
+        Parse the file and yield matches as they are found.
+        
+        Yields:
+            list: DetachedRecords for the matches found in each chunk of the file.
+                  A record's end location is set once its element has ended.
+        
+        Raises:
+            ET.ParseError: If the file is not well-formed
+            SearchCancelled: If is_cancelled returned True
+        """
+        parser = self._parser = expat.ParserCreate(None, '}')
+        parser.buffer_text = True
+        parser.StartElementHandler = self._start
+        parser.EndElementHandler = self._end
+        parser.CharacterDataHandler = self._data
+        
+        try:
+            with open(self.file_path, 'rb') as f:
+                while True:
+                    if self.is_cancelled is not None and self.is_cancelled():
+                        raise SearchCancelled()
+                    chunk = f.read(self.chunk_size)
+                    self._window.feed(chunk)
+                    parser.Parse(chunk, not chunk)
+                    if self._matches:
+                        batch, self._matches = self._matches, []
+                        yield batch
+                    if not chunk:
+                        break
+        except expat.ExpatError as e:
+            raise ET.ParseError(f"{expat.ErrorString(e.code)}: line {e.lineno}, column {e.offset}") from None
+    
+    def _fixname(self, name):
+        # Expat reports namespaced names as 'uri}local'; ElementTree uses '{uri}local'
+        tag = self._names.get(name)
+        if tag is None:
+            tag = '{' + name if '}' in name else name
+            self._names[name] = tag
+        return tag
+    
+    def _start(self, name, attrs):
+        # The previous element's text ends where its first child starts
+        if self._pending is not None:
+            self._resolve()
+        
+        fixname = self._fixname
+        tag = fixname(name)
+        attributes = {fixname(key): value for key, value in attrs.items()} if attrs else {}
+        
+        stack = self._stack
+        if stack:
+            tag_counts = stack[-1][3]
+            position = tag_counts.get(tag, 0) + 1
+            tag_counts[tag] = position
+        else:
+            position = 1
+        stack.append((tag, attributes, position, {}))
+        parser = self._parser
+        self._locations.append((parser.CurrentByteIndex, parser.CurrentLineNumber,
+                                parser.CurrentColumnNumber + 1))
+        self._pending = len(stack)
+    
+    def _data(self, data):
+        # Only the text before the first child belongs to the element
+        if self._pending is not None:
+            self._text.append(data)
+    
+    def _end(self, name):
+        # Nothing was reported inside an element still pending without text
+        maybe_empty = self._pending is not None and not self._text
+        if self._pending is not None:
+            self._resolve()
+        record = self._open_matches.pop(len(self._stack), None)
+        if record is not None:
+            parser = self._parser
+            record.end_offset, record.end_line, record.end_column = element_end_location(
+                self._window, parser.CurrentByteIndex, parser.CurrentLineNumber,
+                parser.CurrentColumnNumber, maybe_empty)
+        self._stack.pop()
+        self._locations.pop()
+    
+    def _resolve(self):
+        """Evaluate the pending element now that its text is complete."""
+        text = ''.join(self._text) if self._text else None
+        self._text = []
+        self._pending = None
+        
+        stack = self._stack
+        tag, attributes, _, _ = stack[-1]
+        if self.criteria.matches(tag, text, attributes, len(stack) == 1):
+            offset, line, column = self._locations[-1]
+            record = DetachedRecord(
+                strip_namespace(tag),
+                text.strip() if text else "",
+                self._path(),
+                self._xpath(),
+                attributes,
+                line=line,
+                column=column,
+                offset=offset)
+            self._matches.append(record)
+            self._open_matches[len(stack)] = record
+    
+    def _path(self):
+        """Human-readable path of the innermost open element."""
+        stack = self._stack
+        if len(stack) == 1:
+            tag, attributes, _, _ = stack[0]
+            return XPATH_DEFAULT_ROOT + path_label(tag, attributes)
+        parts = [stack[0][0]]
+        parts.extend(path_label(tag, attributes) for tag, attributes, _, _ in stack[1:])
+        return XPATH_DEFAULT_ROOT + '/'.join(parts)
+    
+    def _xpath(self):
+        """Standard XPath of the innermost open element."""
+        stack = self._stack
+        parts = [stack[0][0]]
+        parts.extend(f"{tag}[{position}]" for tag, _, position, _ in stack[1:])
+        return XPATH_DEFAULT_ROOT + '/'.join(parts)
@@ -0,0 +1,262 @@
+import xml.etree.ElementTree as ET
+from array import array
+from bisect import bisect_left, bisect_right
+
+from model.node_table import NodeTable, strip_namespace
+from model.spliced_column import splice
+from model.stream_loader import StreamLoader, read_start_tag, tag_name
+
+# Bytes searched back from an element's end for its end tag ('</name' plus whitespace)
+END_TAG_SLACK = 256
+
+
+class SubtreeReloader:
+    """
+    Brings a node table and its indexes up to date after an edit of the file,
+    by parsing again only the smallest element that encloses the edit.
+
+    The element is parsed together with the prolog and the start tags of its
+    ancestors, so namespaces and entities resolve as in a full parse. Its rows
+    are spliced into a new table that shares the other rows with the old one;
+    the offsets, lines and columns of the rows after it are shifted when they
+    are read. Unchanged posting lists are shared with the old indexes, so
+    tables and indexes handed out before stay valid.
+    """
+
+    def __init__(self, file_path, table, tag_index, attribute_index, text_index=None,
+                 chunk_size=1024 * 1024):
+        """
+        Args:
+            file_path: Path to the edited file
+            table: NodeTable of the file before the edit
+            tag_index: TermIndex of the table's namespace-stripped tags
+            attribute_index: AttributeIndex of the table's attributes
+            text_index: Optional TextIndex of the table's text
+            chunk_size: Number of bytes read at a time
+        """
+        self.file_path = file_path
+        self.table = table
+        self.tag_index = tag_index
+        self.attribute_index = attribute_index
+        self.text_index = text_index
+        self.chunk_size = chunk_size
+
+    def reload(self, start, old_end, new_end):
+        """
+        Parse the element that encloses an edit again.
+
+        Args:
+            start: Byte offset where the edit starts, the same before and after it
+            old_end: Byte offset just past the edited bytes, before the edit
+            new_end: Byte offset just past the edited bytes, after the edit
+
+        Returns:
+            (NodeTable, TermIndex, AttributeIndex, TextIndex): The updated table and
+                indexes; the text index is None if there was none.
+                None if no element encloses the edit, e.g. the root's start tag was edited.
+
+        Raises:
+            ET.ParseError: If the edited element is not well-formed
+        """
+        delta = new_end - old_end
+        with open(self.file_path, 'rb') as f:
+            found = self._enclosing_row(f, start, old_end, new_end, delta)
+            if found is None:
+                return None
+            row, ancestors = found
+            parts = [(0, self.table.starts[0])]
+            names = []
+            for ancestor in ancestors:
+                tag = read_start_tag(f, self.table.starts[ancestor], self.chunk_size)
+                parts.append(tag)
+                names.append(tag_name(tag))
+        parts.append((self.table.starts[row], self.table.ends[row] + delta))
+        parts.extend(b'</' + name + b'>' for name in reversed(names))
+
+        loader = StreamLoader(self.file_path, chunk_size=self.chunk_size)
+        _, fragment, fragment_tags, fragment_attributes = loader.load_parts(parts)
+        first = len(ancestors)
+        if len(fragment) <= first or fragment.tag(first) != self.table.tag(row):
+            return None
+        if fragment.ends[first] - fragment.starts[first] != self.table.ends[row] + delta - self.table.starts[row]:
+            return None
+        return self._splice(row, ancestors, fragment, first, fragment_tags, fragment_attributes, delta)
+
+    def _enclosing_row(self, f, start, old_end, new_end, delta):
+        """
+        Find the innermost element whose content holds the whole edit.
+
+        Returns:
+            (int, list): Its row and the rows of its ancestors from the root
+                down, or None if there is none
+        """
+        table = self.table
+        row = bisect_right(table.starts, start) - 1
+        while row >= 0:
+            if table.ends[row] >= old_end and self._holds_edit(f, row, start, new_end, delta):
+                ancestors = []
+                parent = table.parents[row]
+                while parent >= 0:
+                    ancestors.append(parent)
+                    parent = table.parents[parent]
+                ancestors.reverse()
+                return row, ancestors
+            row = table.parents[row]
+        return None
+
+    def _holds_edit(self, f, row, start, new_end, delta):
+        """Check that the edit lies between the start tag and the end tag of an element."""
+        try:
+            tag = read_start_tag(f, self.table.starts[row], self.chunk_size)
+        except ET.ParseError:
+            return False
+        if tag.endswith(b'/>') or self.table.starts[row] + len(tag) > start:
+            return False
+        # The end tag must be intact, so it is found after the edited bytes
+        end = self.table.ends[row] + delta
+        window_start = max(new_end, end - len(tag_name(tag)) - END_TAG_SLACK)
+        if window_start >= end:
+            return False
+        f.seek(window_start)
+        return f.read(end - window_start).rfind(b'</' + tag_name(tag)) >= 0
+
+    def _splice(self, row, ancestors, fragment, first, fragment_tags, fragment_attributes, delta):
+        """
+        Replace the rows of an element and its descendants with those parsed again.
+
+        The new columns are spliced from the old ones (see SplicedColumn), so
+        the work grows with the size of the element, not of the file: the
+        rows after it move by pending shifts rather than being copied.
+        """
+        old = self.table
+        stop = bisect_left(old.starts, old.ends[row], row + 1)
+        count = len(fragment) - first
+        shift = count - (stop - row)
+
+        # Where the fragment's rows are in the file
+        byte_shift = old.starts[row] - fragment.starts[first]
+        line_shift = old.lines[row] - fragment.lines[first]
+        first_line = fragment.lines[first]
+        column_shift = old.columns[row] - fragment.columns[first]
+
+        def line_of(line):
+            return line + line_shift
+
+        def column_of(line, column):
+            return column + column_shift if line == first_line else column
+
+        fragment_rows = range(first, len(fragment))
+        new_lines = array('I', [line_of(fragment.lines[r]) for r in fragment_rows])
+        new_columns = array('I', [column_of(fragment.lines[r], fragment.columns[r]) for r in fragment_rows])
+        new_end_lines = array('I', [line_of(fragment.end_lines[r]) for r in fragment_rows])
+        new_end_columns = array('I', [column_of(fragment.end_lines[r], fragment.end_columns[r])
+                                      for r in fragment_rows])
+
+        # The rest of the file moves by as many lines, and on the line where the element ended, columns
+        old_end_line = old.end_lines[row]
+        end_line_shift = new_end_lines[0] - old_end_line
+        end_column_shift = new_end_columns[0] - old.end_columns[row]
+
+        table = NodeTable()
+        table.tag_names = old.tag_names
+        table._tag_lookup = old._tag_lookup
+        if any(old.tag_id(fragment.tag(r)) is None for r in fragment_rows):
+            table.tag_names = list(old.tag_names)
+            table._tag_lookup = dict(old._tag_lookup)
+        tag_ids = array('I', [table.intern_tag(fragment.tag(r)) for r in fragment_rows])
+        table.tag_ids = splice(old.tag_ids, row, stop, tag_ids)
+
+        # Parents after the element are either its ancestors or rows after it
+        parents = array('i', [old.parents[row]])
+        parents.extend(parent - first + row for parent in fragment.parents[first + 1:])
+        table.parents = splice(old.parents, row, stop, parents, (stop, shift) if shift else None)
+
+        depth_shift = old.depths[row] - fragment.depths[first]
+        table.depths = splice(old.depths, row, stop,
+                              array('I', [fragment.depths[r] + depth_shift for r in fragment_rows]))
+        positions = array('I', [old.positions[row]])
+        positions.extend(fragment.positions[first + 1:])
+        table.positions = splice(old.positions, row, stop, positions)
+
+        table.starts = splice(old.starts, row, stop,
+                              array('q', [fragment.starts[r] + byte_shift for r in fragment_rows]),
+                              (None, delta) if delta else None)
+        table.ends = splice(old.ends, row, stop,
+                            array('q', [fragment.ends[r] + byte_shift for r in fragment_rows]),
+                            (None, delta) if delta else None)
+        line_shift_after = (None, end_line_shift) if end_line_shift else None
+        table.lines = splice(old.lines, row, stop, new_lines, line_shift_after)
+        table.end_lines = splice(old.end_lines, row, stop, new_end_lines, line_shift_after)
+        table.columns = splice(old.columns, row, stop, new_columns)
+        table.end_columns = splice(old.end_columns, row, stop, new_end_columns)
+
+        if end_column_shift:
+            # Rows after the element that start on the line it ended on
+            last = stop
+            while last < len(old) and old.lines[last] == old_end_line:
+                last += 1
+            columns = array('I', [old.columns[r] + end_column_shift for r in range(stop, last)])
+            end_columns = array('I', [old.end_columns[r] + end_column_shift
+                                      if old.end_lines[r] == old_end_line else old.end_columns[r]
+                                      for r in range(stop, last)])
+            table.columns = splice(table.columns, stop + shift, last + shift, columns)
+            table.end_columns = splice(table.end_columns, stop + shift, last + shift, end_columns)
+
+        for ancestor in ancestors:
+            table.ends = _replaced(table.ends, ancestor, old.ends[ancestor] + delta)
+            table.end_lines = _replaced(table.end_lines, ancestor, old.end_lines[ancestor] + end_line_shift)
+            if old.end_lines[ancestor] == old_end_line:
+                table.end_columns = _replaced(table.end_columns, ancestor,
+                                              old.end_columns[ancestor] + end_column_shift)
+
+        table.texts = splice(old.texts, row, stop, fragment.texts[first:])
+        attributes = [old.attributes[row]]
+        attributes.extend(fragment.attributes[first + 1:])
+        table.attributes = splice(old.attributes, row, stop, attributes)
+        if len(old.elements):
+            # The element keeps its identity in the tree; its content is replaced
+            element = old.elements[row]
+            new_element = fragment.elements[first]
+            element.text = new_element.text
+            element[:] = list(new_element)
+            elements = [element]
+            elements.extend(fragment.elements[first + 1:])
+            table.elements = splice(old.elements, row, stop, elements)
+
+        # Index postings of the fragment, numbered like the table
+        old_attributes = [old.attributes[r] for r in range(row, stop) if old.attributes[r]]
+        tag_rows = _fragment_rows(fragment_tags, first, row,
+                                  {strip_namespace(old.tag(r)) for r in range(row, stop)})
+        key_rows = _fragment_rows(fragment_attributes.keys, first, row,
+                                  {key for attrib in old_attributes for key in attrib})
+        value_rows = _fragment_rows(fragment_attributes.values, first, row,
+                                    {value for attrib in old_attributes for value in attrib.values()})
+        tag_index = self.tag_index.replace_rows(row, stop, tag_rows, shift)
+        attribute_index = self.attribute_index.replace_rows(row, stop, key_rows, value_rows, shift)
+        text_index = None
+        if self.text_index is not None:
+            text_index = self.text_index.replace_rows(row, stop, table.texts, shift)
+        return table, tag_index, attribute_index, text_index
+
+
+def _replaced(column, row, value):
+    """Return a column with the value of one row replaced."""
+    return splice(column, row, row + 1, array(column.typecode, [value]))
+
+
+def _fragment_rows(index, first, row, old_terms):
+    """
+    Return the postings of a fragment's index for its rows from first on, numbered from row.
+
+    Args:
+        index: TermIndex of the fragment
+        first: Fragment row of the element parsed again
+        row: Table row of the element
+        old_terms: Terms of the rows replaced; they map to no rows unless they still occur
+    """
+    replacement = {term: () for term in old_terms}
+    for term, rows in zip(index.terms, index.rows):
+        position = bisect_left(rows, first)
+        if position < len(rows):
+            replacement[term] = array('i', [r - first + row for r in rows[position:]])
+    return replacement
@@ -0,0 +1,138 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Characters searched between checks for cancellation
+SCAN_CHUNK_SIZE = 1 << 20
+# Characters searched past a chunk for the matches that start in it
+SCAN_OVERLAP = 1 << 16
+
+
+def compile_pattern(pattern, regex=False, case_sensitive=False):
+    """
+    Compile what the user searches for.
+
+    Args:
+        pattern: Text to find, or a regular expression
+        regex: Treat pattern as a regular expression; '^' and '$' match at line breaks
+        case_sensitive: Match letter case exactly
+
+    Returns:
+        re.Pattern: The compiled pattern
+
+    Raises:
+        re.error: If pattern is not a valid regular expression
+    """
+    flags = re.MULTILINE if regex else 0
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern if regex else re.escape(pattern), flags)
+
+
+class TextMatches:
+    """
+    Every match of a pattern in a text, as sorted arrays of offsets.
+
+    The text is scanned once; the match after or before an offset, and the
+    matches in a range, are then found by binary search.
+    """
+
+    def __init__(self, starts=None, ends=None):
+        """
+        Args:
+            starts: Sorted start offset of each match
+            ends: End offset of each match, just past its last character
+        """
+        self.starts = starts if starts is not None else array('q')
+        self.ends = ends if ends is not None else array('q')
+
+    @classmethod
+    def scan(cls, pattern, text, is_cancelled=None, chunk_size=SCAN_CHUNK_SIZE, overlap=SCAN_OVERLAP):
+        """
+        Find every match of a pattern in a text.
+
+        The text is searched a chunk at a time, so cancellation is checked
+        after a bounded amount of text even where there are few matches.
+        Each chunk is searched together with the overlap after it; a match
+        found there is matched again in the whole text, in case the end of
+        the searched part cut it short. A match is missed only if it needs
+        more than overlap characters past its chunk to be recognized.
+
+        Empty matches (e.g. of 'a*') are skipped, as they cannot be selected.
+
+        Args:
+            pattern: Compiled pattern, see compile_pattern
+            text: Text to search
+            is_cancelled: Optional callable; the scan stops when it returns True
+            chunk_size: Characters searched between checks for cancellation
+            overlap: Characters searched past each chunk for the matches that start in it
+
+        Returns:
+            TextMatches: The matches, or None if the scan was cancelled
+        """
+        matches = cls()
+        starts, ends = matches.starts, matches.ends
+        position = 0
+        while True:
+            if is_cancelled is not None and is_cancelled():
+                return None
+            chunk_end = position + chunk_size
+            window_end = min(chunk_end + overlap, len(text))
+            last = window_end == len(text)
+            next_position = chunk_end
+            for match in pattern.finditer(text, position, window_end):
+                start, end = match.span()
+                if not last and start >= chunk_end:
+                    break
+                if start == end:
+                    continue
+                if not last:
+                    match = pattern.match(text, start)
+                    if match is None or match.end() == start:
+                        # Matched only because the searched part ended; search on after its start
+                        next_position = start + 1
+                        break
+                starts.append(start)
+                ends.append(match.end())
+                next_position = max(next_position, match.end())
+                if match.end() != end:
+                    # Longer in the whole text; search on after it
+                    break
+            if last:
+                return matches
+            position = next_position
+
+    def __len__(self):
+        return len(self.starts)
+
+    def after(self, offset, inclusive=False):
+        """
+        Return the index of the first match starting after offset, wrapping to the first match.
+
+        Args:
+            offset: Offset in the text
+            inclusive: Also accept a match starting at offset
+
+        Returns:
+            int: Index of the match, or None if there are no matches
+        """
+        if not self.starts:
+            return None
+        index = bisect_left(self.starts, offset) if inclusive else bisect_right(self.starts, offset)
+        return index % len(self.starts)
+
+    def before(self, offset):
+        """
+        Return the index of the last match starting before offset, wrapping to the last match.
+
+        Returns:
+            int: Index of the match, or None if there are no matches
+        """
+        if not self.starts:
+            return None
+        return (bisect_left(self.starts, offset) - 1) % len(self.starts)
+
+    def overlapping(self, start, end):
+        """Return the range of indexes of the matches that overlap start..end."""
+        # Matches do not overlap each other, so their ends are sorted too
+        return range(bisect_right(self.ends, start), bisect_left(self.starts, end))
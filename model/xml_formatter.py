@@ -0,0 +1,311 @@
+from xml.parsers import expat
+
+# Kinds of child nodes, as minidom builds them
+ELEMENT, TEXT, CDATA, OTHER = range(4)
+
+# States of an open element
+OPEN = 0      # Start tag written up to its '>', no child yet
+PENDING = 1   # Only child so far is character data, held back
+NESTED = 2    # Children written one per line
+
+NEWLINE = '\n'
+
+
+def escape(data):
+    """Escape character data and attribute values as minidom writes them."""
+    return data.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+
+
+def qualified_name(name):
+    """Turn a name reported by a namespace-aware expat parser back into its prefixed form."""
+    parts = name.split(' ')
+    if len(parts) == 3:
+        return f"{parts[2]}:{parts[1]}"
+    if len(parts) == 2:
+        return parts[1]
+    if len(parts) == 1:
+        return name
+    raise ValueError(f"Unsupported syntax: spaces in URIs not supported: {name!r}")
+
+
+class _BlankLineFilter:
+    """Writer that passes text on line by line, dropping lines that are blank."""
+
+    def __init__(self, write):
+        self.write_through = write
+        self.line = []       # Pieces of the line being written
+        self.started = False
+
+    def write(self, text):
+        if NEWLINE not in text:
+            self.line.append(text)
+            return
+        lines = text.split(NEWLINE)
+        self.line.append(lines[0])
+        self._end_line()
+        for line in lines[1:-1]:
+            self.line.append(line)
+            self._end_line()
+        self.line.append(lines[-1])
+
+    def close(self):
+        self._end_line()
+
+    def _end_line(self):
+        line = ''.join(self.line)
+        self.line = []
+        if line.strip():
+            self.write_through(NEWLINE + line if self.started else line)
+            self.started = True
+
+
+class _Element:
+    __slots__ = ('name', 'indent', 'state')
+
+    def __init__(self, name, indent):
+        self.name = name
+        self.indent = indent
+        self.state = OPEN
+
+
+class XMLFormatter:
+    """
+    Streaming pretty-printer for XML documents.
+
+    Writes exactly what minidom's toprettyxml() writes, with blank lines
+    removed, but from expat events rather than a DOM: memory stays bounded
+    by the nesting depth and the longest run of character data, whatever
+    the document size.
+
+    Usage:
+        formatter = XMLFormatter(output.write)
+        formatter.feed(chunk)  # As often as needed, str or bytes
+        formatter.close()
+    """
+
+    def __init__(self, write, indent="  "):
+        """
+        Args:
+            write: Callable receiving the formatted text piece by piece
+            indent: Indentation added per nesting level
+        """
+        self.indent = indent
+        self._out = _BlankLineFilter(write)
+        self._stack = []        # Open elements, innermost last
+        self._last = None       # Kind of the last child of the innermost element
+        self._text = None       # Kind of character data being written in a NESTED element
+        self._held = []         # Character data held back for a PENDING element
+        self._in_cdata = False
+        self._cdata_continue = False
+        self._namespaces = []   # (prefix, uri) declared on the next element
+        self._doctype = None
+        self._subset = None
+
+        # Configured like minidom's builder, so the same documents parse the same way
+        parser = expat.ParserCreate(namespace_separator=' ')
+        parser.namespace_prefixes = True
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+        parser.specified_attributes = True
+        parser.StartDoctypeDeclHandler = self._start_doctype
+        parser.StartElementHandler = self._start_element
+        parser.EndElementHandler = self._end_element
+        parser.StartNamespaceDeclHandler = self._start_namespace
+        parser.CharacterDataHandler = self._character_data
+        parser.StartCdataSectionHandler = self._start_cdata
+        parser.EndCdataSectionHandler = self._end_cdata
+        parser.CommentHandler = self._comment
+        parser.ProcessingInstructionHandler = self._processing_instruction
+        parser.ExternalEntityRefHandler = lambda *args: 1
+        self._parser = parser
+
+        self._out.write('<?xml version="1.0" ?>' + NEWLINE)
+
+    def feed(self, data):
+        """
+        Parse the next part of the document.
+
+        Raises:
+            xml.parsers.expat.ExpatError: If the document is not well-formed
+        """
+        self._parser.Parse(data, False)
+
+    def close(self):
+        """Finish the document and write what is left."""
+        self._parser.Parse(b'', True)
+        self._out.close()
+
+    def _child(self, kind):
+        """Write what comes before a new child of the innermost element."""
+        if self._text is not None:
+            self._end_text()
+        if not self._stack:
+            return
+        element = self._stack[-1]
+        if element.state == OPEN:
+            if kind == TEXT or kind == CDATA:
+                element.state = PENDING
+                self._out.write('>')
+                return
+            self._out.write('>' + NEWLINE)
+        elif element.state == PENDING:
+            # A second child: the first one goes on its own line after all
+            self._out.write(NEWLINE)
+            held_kind = self._held[0]
+            data = ''.join(self._held[1:])
+            self._held = []
+            if held_kind == TEXT:
+                self._out.write(escape(element.indent + self.indent + data + NEWLINE))
+            else:
+                self._out.write(f"<![CDATA[{data}]]>")
+        else:
+            return
+        element.state = NESTED
+
+    def _child_indent(self):
+        return self._stack[-1].indent + self.indent if self._stack else ''
+
+    def _start_text(self, kind, data):
+        self._child(kind)
+        self._last = kind
+        if self._stack[-1].state == PENDING:
+            self._held = [kind, data]
+            return
+        self._text = kind
+        if kind == TEXT:
+            self._out.write(escape(self._child_indent() + data))
+        else:
+            self._out.write('<![CDATA[' + data)
+
+    def _end_text(self):
+        self._out.write(NEWLINE if self._text == TEXT else ']]>')
+        self._text = None
+
+    def _character_data(self, data):
+        # Runs of character data are merged into nodes as minidom's builder does
+        if self._in_cdata:
+            if self._cdata_continue and self._last == CDATA:
+                self._append_text(data)
+                return
+            self._cdata_continue = True
+            self._start_text(CDATA, data)
+        elif self._last == TEXT:
+            self._append_text(data)
+        else:
+            self._start_text(TEXT, data)
+
+    def _append_text(self, data):
+        if self._stack[-1].state == PENDING:
+            self._held.append(data)
+        else:
+            self._out.write(escape(data) if self._text == TEXT else data)
+
+    def _start_cdata(self):
+        self._in_cdata = True
+        self._cdata_continue = False
+
+    def _end_cdata(self):
+        self._in_cdata = False
+        self._cdata_continue = False
+
+    def _start_namespace(self, prefix, uri):
+        self._namespaces.append((prefix, uri))
+
+    def _start_element(self, name, attributes):
+        self._child(ELEMENT)
+        indent = self._child_indent()
+        parts = [indent, '<', qualified_name(name)]
+        # Namespace declarations come first, as minidom adds them before other attributes
+        for prefix, uri in self._namespaces:
+            parts.append(f' xmlns:{prefix}="' if prefix else ' xmlns="')
+            parts.append(escape(uri or ''))
+            parts.append('"')
+        self._namespaces = []
+        for i in range(0, len(attributes), 2):
+            parts.append(f' {qualified_name(attributes[i])}="')
+            parts.append(escape(attributes[i + 1]))
+            parts.append('"')
+        self._out.write(''.join(parts))
+        self._stack.append(_Element(qualified_name(name), indent))
+        self._last = None
+
+    def _end_element(self, name):
+        element = self._stack.pop()
+        if element.state == OPEN:
+            self._out.write('/>' + NEWLINE)
+        elif element.state == PENDING:
+            held_kind = self._held[0]
+            data = ''.join(self._held[1:])
+            self._held = []
+            content = escape(data) if held_kind == TEXT else f"<![CDATA[{data}]]>"
+            self._out.write(f"{content}</{element.name}>{NEWLINE}")
+        else:
+            if self._text is not None:
+                self._end_text()
+            self._out.write(f"{element.indent}</{element.name}>{NEWLINE}")
+        self._last = ELEMENT
+
+    def _comment(self, data):
+        self._child(OTHER)
+        self._last = OTHER
+        self._out.write(f"{self._child_indent()}<!--{data}-->{NEWLINE}")
+
+    def _processing_instruction(self, target, data):
+        self._child(OTHER)
+        self._last = OTHER
+        self._out.write(f"{self._child_indent()}<?{target} {data}?>{NEWLINE}")
+
+    def _start_doctype(self, name, system_id, public_id, has_internal_subset):
+        self._doctype = (name, system_id, public_id)
+        if not has_internal_subset:
+            self._write_doctype()
+            return
+        # The internal subset is copied as written; comments and processing
+        # instructions in it are part of it, not nodes of the document
+        self._subset = []
+        self._parser.CommentHandler = None
+        self._parser.ProcessingInstructionHandler = None
+        self._parser.DefaultHandlerExpand = self._subset.append
+        self._parser.EndDoctypeDeclHandler = self._end_doctype
+
+    def _end_doctype(self):
+        self._parser.DefaultHandlerExpand = None
+        self._parser.CommentHandler = self._comment
+        self._parser.ProcessingInstructionHandler = self._processing_instruction
+        self._subset = ''.join(self._subset).replace('\r\n', '\n').replace('\r', '\n')
+        self._write_doctype()
+
+    def _write_doctype(self):
+        name, system_id, public_id = self._doctype
+        parts = ['<!DOCTYPE ', name]
+        if public_id:
+            parts.append(f"{NEWLINE}  PUBLIC '{public_id}'{NEWLINE}  '{system_id}'")
+        elif system_id:
+            parts.append(f"{NEWLINE}  SYSTEM '{system_id}'")
+        if self._subset is not None:
+            parts.append(f" [{self._subset}]")
+        parts.append('>' + NEWLINE)
+        self._out.write(''.join(parts))
+
+
+def format_xml_text(text, indent="  ", chunk_size=1024 * 1024):
+    """
+    Pretty-print an XML document held in a string.
+
+    Args:
+        text: XML document
+        indent: Indentation added per nesting level
+        chunk_size: Characters parsed at a time
+
+    Returns:
+        str: The formatted document, without blank lines
+
+    Raises:
+        xml.parsers.expat.ExpatError: If the document is not well-formed
+    """
+    pieces = []
+    formatter = XMLFormatter(pieces.append, indent)
+    for start in range(0, len(text), chunk_size):
+        formatter.feed(text[start:start + chunk_size])
+    formatter.close()
+    return ''.join(pieces)
@@ -1,7 +1,20 @@
 import xml.etree.ElementTree as ET
+import hashlib
 import os
+import threading
+from array import array
 
 from model.singleton import Singleton
+from model.element_record import ElementRecord, ElementRecordList
+from model.index_cache import IndexCache
+from model.mapped_loader import MappedLoader
+from model.node_table import strip_namespace
+from model.result_cache import ResultCache
+from model.search_index import TextIndex, is_plain_tag, is_qualified_tag, merge_rows
+from model.parallel_loader import ParallelLoader
+from model.stream_loader import StreamLoader, LoadCancelled, MemoryLimitExceeded
+from model.stream_search import SearchCancelled, SearchCriteria, StreamSearch
+from model.subtree_reloader import SubtreeReloader
 from DefineConst import *
 
 class XMLModel(Singleton):
@@ -13,7 +26,19 @@ class XMLModel(Singleton):
             self.xml_file_path = None
             self.xml_tree = None
             self.root = None
-            self.cache = {}  # Cache for faster repeated searches
+            self.file_identity = None  # Identifies the loaded file version
+            self.file_stamp = None  # (modification time, size) of the loaded file version, to match edits against
+            self._hashed = {}  # Path -> ((modification time, size), identity) of the last hashed version
+            self.cache = ResultCache(RESULT_CACHE_MAX_BYTES)  # Cache for faster repeated searches
+            self.index_cache = IndexCache(INDEX_CACHE_DIR, INDEX_CACHE_MAX_MB * 1024 * 1024)  # Tables and indexes of earlier opened files
+            self.node_table = None  # Compact per-element table built at load
+            self._row_lookup = None  # Element -> row, built only when needed
+            self.tag_index = None  # Namespace-stripped tag -> rows
+            self.attribute_index = None  # Attribute keys and values -> rows
+            self.text_index = None  # Trigram index over element text, built in the background
+            self._text_index_thread = None
+            self.streaming = False  # File too large to load; searched by streaming instead
+            self.low_memory = False  # Values are read from the mapped file; no element tree or attribute index
             self.initialized = True
         
     def is_file_loaded(self):
@@ -23,46 +48,381 @@ class XMLModel(Singleton):
         Returns:
             bool: True if a file is loaded, False otherwise
         """
-        return hasattr(self, 'root') and self.root is not None
+        return self.node_table is not None
     
-    def load_xml_file(self, file_path):
+    def is_streaming(self):
+        """
+        Check if the current file is searched in streaming mode.
+        
+        Returns:
+            bool: True if the file is too large to hold in memory
+        """
+        return self.streaming
+    
+    def is_low_memory(self):
+        """
+        Check if the current file is loaded in low-memory mode.
+        
+        Returns:
+            bool: True if values are read from the mapped file instead of kept in memory
+        """
+        return self.low_memory
+    
+    def load_xml_file(self, file_path, progress=None, is_cancelled=None):
         """
         Load an XML file for processing.
         
+        The file is parsed incrementally and the node table and search indexes
+        are built in the same pass, split across worker processes when
+        PARALLEL_LOAD_ENABLED is set. Large files reopened unchanged are read
+        from the index cache instead of being parsed. The previously loaded file
+        stays active until the new one has loaded successfully. Loading the
+        loaded file again does nothing unless it changed on disk.
+        
         Args:
             file_path: Path to the XML file
+            progress: Optional callable(bytes_read, total_bytes, elements) called while parsing
+            is_cancelled: Optional callable; loading stops when it returns True
             
         Returns:
             (bool, str): Success status and error message if any
         """
-        # If same file, don't reload
-        if self.xml_file_path == file_path and self.xml_tree is not None:
-            return True, None
-            
         try:
             # Validate file exists
             if not os.path.exists(file_path):
                 return False, ERROR_FILE_NOT_FOUND.format(file=file_path)
+            
+            # If same file version, don't reload
+            file_identity = self._get_file_identity(file_path)
+            if (self.xml_file_path == file_path and file_identity == self.file_identity
+                    and (self.node_table is not None or self.streaming)):
+                return True, None
                 
             # Validate file is an XML file
             if not file_path.lower().endswith('.xml') and not self._is_xml_content(file_path):
                 return False, ERROR_NOT_XML.format(file=file_path)
-                
-            self.xml_file_path = file_path
             
-            # Use standard parser
-            self.xml_tree = ET.parse(file_path)
-
-            self.root = self.xml_tree.getroot()  # Set the root attribute
+            file_stamp = self._get_file_stamp(file_path)
+            file_size = file_stamp[1]
+            
+            # Files above the threshold are never loaded, only streamed
+            if file_size > STREAM_SEARCH_THRESHOLD_MB * 1024 * 1024:
+                self._set_streaming_file(file_path, file_identity)
+                self.file_stamp = file_stamp
+                return True, None
+            
+            low_memory = file_size >= LOW_MEMORY_MIN_MB * 1024 * 1024
+            # Low-memory tables read their values from the file, so there is nothing to cache
+            use_index_cache = (INDEX_CACHE_ENABLED and not low_memory
+                               and file_size >= INDEX_CACHE_MIN_MB * 1024 * 1024)
+            cached = self.index_cache.load(file_identity) if use_index_cache else None
+            if cached is not None:
+                # The element tree is only parsed if a path expression needs it
+                xml_tree = None
+                node_table, tag_index, attribute_index, text_index = cached
+                if progress is not None:
+                    progress(file_size, file_size, len(node_table))
+            else:
+                if low_memory:
+                    # Keep only offsets; values are decoded from a map of the file when used
+                    loader = MappedLoader(file_path,
+                                          progress=progress,
+                                          is_cancelled=is_cancelled,
+                                          memory_limit=LOAD_MEMORY_CEILING_MB * 1024 * 1024,
+                                          chunk_size=LOAD_CHUNK_SIZE,
+                                          bytes_per_element=LOW_MEMORY_BYTES_PER_ELEMENT)
+                elif PARALLEL_LOAD_ENABLED and file_size >= PARALLEL_LOAD_MIN_MB * 1024 * 1024:
+                    # Parse and index chunks of the file in worker processes
+                    loader = ParallelLoader(file_path, PARALLEL_LOAD_WORKERS,
+                                            progress=progress,
+                                            is_cancelled=is_cancelled,
+                                            memory_limit=LOAD_MEMORY_CEILING_MB * 1024 * 1024,
+                                            chunk_size=LOAD_CHUNK_SIZE,
+                                            bytes_per_element=LOAD_BYTES_PER_ELEMENT)
+                else:
+                    # Parse and index in a single streaming pass
+                    loader = StreamLoader(file_path,
+                                          progress=progress,
+                                          is_cancelled=is_cancelled,
+                                          memory_limit=LOAD_MEMORY_CEILING_MB * 1024 * 1024,
+                                          chunk_size=LOAD_CHUNK_SIZE,
+                                          bytes_per_element=LOAD_BYTES_PER_ELEMENT)
+                xml_tree, node_table, tag_index, attribute_index = loader.load()
+                text_index = None
+            
+            self.xml_file_path = file_path
+            self.xml_tree = xml_tree
+            self.root = xml_tree.getroot() if xml_tree is not None else None
             self.file_path = file_path
             
-            self.cache = {}  # Clear cache when loading a new file
+            # The node table lets searches return row indices and makes path
+            # generation O(depth)
+            previous_table = self.node_table
+            self.node_table = node_table
+            if previous_table is not None:
+                previous_table.close()
+            self._row_lookup = None
+            self.tag_index = tag_index
+            self.attribute_index = attribute_index
+            self.streaming = False
+            self.low_memory = low_memory
+            # Newly parsed large files are written to the index cache once fully indexed
+            self._start_text_index(text_index, file_identity if use_index_cache and cached is None else None)
+            
+            # Cached results are keyed by file identity, so they stay valid
+            # when switching between files
+            self.file_identity = file_identity
+            self.file_stamp = file_stamp
             return True, None
+        except LoadCancelled:
+            return False, ERROR_LOAD_CANCELLED
+        except MemoryLimitExceeded:
+            return False, ERROR_LOAD_MEMORY_CEILING.format(limit=LOAD_MEMORY_CEILING_MB)
         except ET.ParseError as e:
             return False, ERROR_PARSING_XML.format(error=e)
         except Exception as e:
             return False, ERROR_LOADING_XML.format(error=str(e))
     
+    def apply_edit(self, file_path, edit, progress=None, is_cancelled=None):
+        """
+        Bring the loaded file up to date after it was saved with an edit.
+        
+        Only the smallest element enclosing the edited bytes is parsed again;
+        it is spliced into the element tree, node table and indexes, and the
+        locations of the elements after it are shifted. The file is loaded
+        again from scratch when the edit cannot be applied that way, e.g. it
+        is not known, was made to another version of the file or changes the
+        root's tags.
+        
+        Args:
+            file_path: Path to the saved file
+            edit: (base stamp, start, old end, new end) as reported by the
+                  editor, or None: the (modification time, size) of the file
+                  the edit was made to, and the byte range of the edited
+                  bytes before and after the edit
+            progress: See load_xml_file
+            is_cancelled: See load_xml_file
+            
+        Returns:
+            (bool, str): Success status and error message if any
+        """
+        if not self._can_apply(file_path, edit):
+            return self.load_xml_file(file_path, progress=progress, is_cancelled=is_cancelled)
+        
+        _, start, old_end, new_end = edit
+        if start == old_end == new_end:
+            # Saved unchanged
+            self.file_identity = self._get_file_identity(file_path)
+            self.file_stamp = self._get_file_stamp(file_path)
+            return True, None
+        reloader = SubtreeReloader(file_path, self.node_table, self.tag_index, self.attribute_index,
+                                   self.text_index, chunk_size=LOAD_CHUNK_SIZE)
+        try:
+            result = reloader.reload(start, old_end, new_end)
+        except ET.ParseError as e:
+            return False, ERROR_PARSING_XML.format(error=e)
+        if result is None:
+            return self.load_xml_file(file_path, progress=progress, is_cancelled=is_cancelled)
+        
+        node_table, tag_index, attribute_index, text_index = result
+        self.node_table = node_table
+        self._row_lookup = None
+        self.tag_index = tag_index
+        self.attribute_index = attribute_index
+        # The text index is built now if it was still being built for the old table
+        self._start_text_index(text_index)
+        self.file_identity = self._get_file_identity(file_path)
+        self.file_stamp = self._get_file_stamp(file_path)
+        return True, None
+    
+    def is_file_changed(self):
+        """
+        Check if the loaded file was changed or removed on disk since it was loaded.
+        
+        Returns:
+            bool: True if the loaded data no longer matches the file
+        """
+        if not self.xml_file_path or self.file_identity is None:
+            return False
+        try:
+            return self._get_file_identity(self.xml_file_path) != self.file_identity
+        except OSError:
+            return True
+    
+    def invalidate_file(self):
+        """
+        Drop what is cached for the loaded version of the file, once it changed on disk.
+        
+        The node table and indexes stay in use until the file is loaded again.
+        In low-memory mode the file is unmapped, so it can be replaced on every
+        platform; its texts and attributes read as None until then.
+        """
+        identity = self.file_identity
+        if identity is None:
+            return
+        self.cache.invalidate(lambda key: key[0] == identity)
+        self.index_cache.remove(identity)
+        if self.low_memory and self.node_table is not None:
+            self.node_table.close()
+    
+    def _can_apply(self, file_path, edit):
+        """Check if an edit can be spliced into the loaded file, see apply_edit."""
+        if edit is None or self.node_table is None or self.streaming or self.low_memory:
+            return False
+        if not self.xml_file_path or os.path.abspath(file_path) != os.path.abspath(self.xml_file_path):
+            return False
+        base_stamp, start, old_end, new_end = edit
+        if base_stamp is None or base_stamp != self.file_stamp:
+            return False
+        try:
+            file_size = os.path.getsize(file_path)
+        except OSError:
+            return False
+        # A file that grew into low-memory mode is loaded differently
+        return (file_size == base_stamp[1] + new_end - old_end
+                and file_size < LOW_MEMORY_MIN_MB * 1024 * 1024)
+    
+    def _set_streaming_file(self, file_path, file_identity):
+        """Switch to streaming mode for a file that is too large to load."""
+        self.xml_file_path = file_path
+        self.file_path = file_path
+        self.xml_tree = None
+        self.root = None
+        if self.node_table is not None:
+            self.node_table.close()
+        self.node_table = None
+        self._row_lookup = None
+        self.tag_index = None
+        self.attribute_index = None
+        self.text_index = None
+        self.streaming = True
+        self.low_memory = False
+        self.file_identity = file_identity
+    
+    def stream_search(self, tag_name, flag_name, flag_att, flag_value, partial_match, is_cancelled=None):
+        """
+        Search the current file directly over parse events, without loading it.
+        
+        Args:
+            tag_name (str): The search string
+            is_cancelled: Optional callable; the search stops when it returns True
+        
+        Yields:
+            list: Result records for the matches found in each chunk of the file
+        
+        Raises:
+            ValueError: If an exact search is a path expression, which needs the
+                        element tree; raised here, before the file is read
+        """
+        criteria = SearchCriteria(tag_name, flag_name, flag_att, flag_value, partial_match)
+        search = StreamSearch(self.xml_file_path, criteria,
+                              is_cancelled=is_cancelled, chunk_size=LOAD_CHUNK_SIZE)
+        return search.batches()
+    
+    def _start_text_index(self, text_index=None, store_identity=None):
+        """
+        Start building the text index for the loaded node table in the background.
+        
+        Args:
+            text_index: Text index read from the index cache, if any
+            store_identity: File identity to store the table and indexes under
+                            in the index cache once built, or None
+        """
+        # The text index is optional and slower to build, so value searches
+        # scan the text column until it is ready
+        self.text_index = text_index
+        # Low-memory mode does not hold an index as large as the text itself
+        build = TEXT_INDEX_ENABLED and text_index is None and not self.low_memory
+        if build or store_identity is not None:
+            self._text_index_thread = threading.Thread(
+                target=self._build_text_index,
+                args=(self.node_table, self.tag_index, self.attribute_index, build, store_identity),
+                daemon=True)
+            self._text_index_thread.start()
+    
+    def _build_text_index(self, table, tag_index, attribute_index, build, store_identity):
+        """Build the text index for a node table and cache the indexes (runs on a background thread)."""
+        text_index = None
+        if build:
+            # Give up if another file is loaded in the meantime
+            text_index = TextIndex.build(table.texts, is_cancelled=lambda: self.node_table is not table)
+            if text_index is None:
+                return
+            if self.node_table is table:
+                self.text_index = text_index
+        if store_identity is not None:
+            self.index_cache.store(store_identity, table, tag_index, attribute_index, text_index)
+    
+    def wait_for_text_index(self, timeout=None):
+        """
+        Block until the background text index build and index cache write have finished.
+        
+        Returns:
+            bool: True if the text index is available
+        """
+        if self._text_index_thread is not None:
+            self._text_index_thread.join(timeout)
+        return self.text_index is not None
+    
+    def _get_file_identity(self, file_path):
+        """
+        Identify a version of a file for cache keys.
+        
+        Returns:
+            tuple: (path, modification time, size), or (path, size, content hash)
+                   when FILE_IDENTITY_USE_HASH is enabled
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if not FILE_IDENTITY_USE_HASH:
+            return (path,) + stamp
+        
+        # A file is hashed again only if its modification time or size changed,
+        # so touching it without changing its content keeps its identity
+        hashed = self._hashed.get(path)
+        if hashed is not None and hashed[0] == stamp:
+            return hashed[1]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        identity = (path, stat.st_size, digest.hexdigest())
+        self._hashed[path] = (stamp, identity)
+        return identity
+    
+    @staticmethod
+    def _get_file_stamp(file_path):
+        """Return (modification time, size) of a file, as the editor records them."""
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _get_root(self):
+        """
+        Return the root Element of the loaded file.
+        
+        Files opened from the index cache are not parsed at load, so their
+        element tree is built the first time a search needs it.
+        """
+        if self.root is None:
+            if self.low_memory:
+                raise ValueError(ERROR_LOW_MEMORY_PATH)
+            xml_tree = ET.parse(self.xml_file_path)
+            elements = list(xml_tree.iter())
+            if len(elements) != len(self.node_table):
+                raise ValueError(f"'{self.xml_file_path}' changed since it was loaded")
+            self.node_table.elements = elements
+            self._row_lookup = None
+            self.xml_tree = xml_tree
+            self.root = xml_tree.getroot()
+        return self.root
+    
+    def _get_row_lookup(self):
+        """Return a mapping from live Element to node table row, built on first use."""
+        if self._row_lookup is None:
+            self._row_lookup = {element: row for row, element in enumerate(self.node_table.elements)}
+        return self._row_lookup
+    
     def _is_xml_content(self, file_path):
         """Check if file content appears to be XML regardless of extension."""
         try:
@@ -119,7 +479,7 @@ class XMLModel(Singleton):
         xpath = "/" + "/".join(path)
         return xpath
 
-    def find_elements_by_tag(self, tag_name, flag_name, flag_att, flag_value, partial_match):
+    def find_elements_by_tag(self, tag_name, flag_name, flag_att, flag_value, partial_match, is_cancelled=None):
         """
         Find all elements with the specified tag name.
         
@@ -127,207 +487,304 @@ class XMLModel(Singleton):
             tag_name (str): The tag name to search for
             partial_match (bool): If True, return elements with tags that contain the search string
                                 If False, only return exact matches
+            is_cancelled: Optional callable; the search stops when it returns True
         
         Returns:
-            list: List of element dictionaries containing name, value, XPath, and attributes
+            (sequence, str): Node table row indices of the matches, in document order,
+                             and error message if any
+        
+        Raises:
+            SearchCancelled: If is_cancelled returned True
+        """
+        return self._collect_rows(tag_name, flag_name, flag_att, flag_value, partial_match, is_cancelled)
+    
+    def narrow_elements_by_tag(self, rows, tag_name, flag_name, flag_att, flag_value, is_cancelled=None):
+        """
+        Run a partial search over the results of an earlier one.
+        
+        A substring query can only match a subset of what a query it contains
+        matched, so filtering those rows gives the same results as a full
+        partial search, in time proportional to the earlier result set.
+        
+        Args:
+            rows: Results of a partial search, with the same flags, for a
+                  query contained in tag_name (ignoring case)
+            tag_name (str): The new search string
+            is_cancelled: Optional callable; the search stops when it returns True
+        
+        Returns:
+            (sequence, str): Node table row indices of the matches, in document order,
+                             and error message if any
+        
+        Raises:
+            SearchCancelled: If is_cancelled returned True
         """
+        return self._collect_rows(tag_name, flag_name, flag_att, flag_value, True, is_cancelled, candidates=rows)
+    
+    def iter_elements_by_tag(self, tag_name, flag_name, flag_att, flag_value, partial_match,
+                             is_cancelled=None, candidates=None):
+        """
+        Find elements like find_elements_by_tag, yielding them in batches as they are found.
+        
+        The first batch holds at most SEARCH_FIRST_BATCH_SIZE rows so the first
+        page of results can be shown before a scan has gone through the whole
+        document; later batches hold up to SEARCH_BATCH_SIZE rows.
+        
+        Args:
+            tag_name (str): The tag name to search for
+            partial_match (bool): If True, match tags that contain the search string
+            is_cancelled: Optional callable; the search stops when it returns True
+            candidates: Optional rows to narrow, see narrow_elements_by_tag
+        
+        Yields:
+            sequence: Node table row indices of the next matches, in document order
+        
+        Raises:
+            SearchCancelled: If is_cancelled returned True
+        """
+        if self.node_table is None:
+            return
+        
+        if tag_name == SEARCH_ALL_ELEMENTS:
+            results, error = self.find_all_elements()
+            if error:
+                raise RuntimeError(error)
+            yield from self._split_rows(results)
+            return
+        
+        cache_key, results, matches = self._search_rows(tag_name, flag_name, flag_att, flag_value,
+                                                        partial_match, is_cancelled, candidates)
+        if results is not None:
+            yield from self._split_rows(results)
+            return
+        
+        # Matches are produced lazily; hand them out as they are found
+        results = array('i')
+        batch = array('i')
+        limit = SEARCH_FIRST_BATCH_SIZE
+        for row in matches:
+            batch.append(row)
+            if len(batch) >= limit:
+                results.extend(batch)
+                yield batch
+                batch = array('i')
+                limit = SEARCH_BATCH_SIZE
+        if batch:
+            results.extend(batch)
+            yield batch
+        self.cache.put(cache_key, results)
+    
+    def _collect_rows(self, tag_name, flag_name, flag_att, flag_value, partial_match,
+                      is_cancelled=None, candidates=None):
+        """Run a search to completion; see find_elements_by_tag."""
         try:
-            if not hasattr(self, 'root') or self.root is None:
+            if self.node_table is None:
                 return ([], "No XML file is loaded")
             
-            results = []
-            elements = []
-            
             # Special case for showing all elements
             if tag_name == SEARCH_ALL_ELEMENTS:
-                elements = list(self.root.iter())
-            else:
-                # For partial matching, we need to iterate through all elements and check manually
-                if partial_match:
-                    elements = []
-                    for elem in self.root.iter():
-                        # Check if tag_name is a substring of the element's tag
-                        flag_append = False
-                        if (
-                            ((flag_name == True) and (tag_name.lower() in elem.tag.lower()))
-                            or ((flag_value == True) and (elem.text != None) and (tag_name.lower() in elem.text.lower()) )
-                        ):
-                            flag_append = True
-                        elif (flag_att == True):
-                            for key,value in elem.attrib.items():
-                                if (tag_name.lower() in key.lower()):
-                                    flag_append = True
-                                    break
-                                else:
-                                    try:
-                                        if (tag_name.lower() in value.lower()):
-                                            flag_append = True
-                                            break
-                                    except AttributeError:
-                                        if (tag_name in str(value)):
-                                            flag_append = True
-                                            break
-                        if flag_append:
-                            element_info = self._get_element_details(elem)
-                            results.append(element_info)
-
-                else:
-                    # For exact matching, use the existing behavior
-                    elements = self.root.findall(f".//{tag_name}")
-
-            for elem in elements:
-                element_info = self._get_element_details(elem)
-                results.append(element_info)
+                return self.find_all_elements()
+            
+            cache_key, results, matches = self._search_rows(tag_name, flag_name, flag_att, flag_value,
+                                                            partial_match, is_cancelled, candidates)
+            if results is None:
+                results = array('i', matches)
+                self.cache.put(cache_key, results)
             return (results, "")
         
+        except SearchCancelled:
+            raise
         except Exception as e:
             # Log the error
             error_msg = ERROR_SEARCHING.format(error=str(e))
             print(error_msg)
             return ([], error_msg)
     
+    def _search_rows(self, tag_name, flag_name, flag_att, flag_value, partial_match,
+                     is_cancelled=None, candidates=None):
+        """
+        Resolve a search through the cache and the indexes where possible.
+        
+        Returns:
+            (tuple, sequence, iterator): The cache key, then either the complete
+                results (cached or from the indexes) and None, or None and a lazy
+                iterator over the matching rows. A lazy search is not cached;
+                the caller caches the rows once the iterator is exhausted.
+        """
+        # Flags only matter for partial searches
+        if partial_match:
+            flags = (bool(flag_name), bool(flag_att), bool(flag_value))
+        else:
+            flags = (False, False, False)
+        cache_key = (self.file_identity, tag_name, bool(partial_match)) + flags
+        results = self.cache.get(cache_key)
+        if results is not None:
+            return cache_key, results, None
+        
+        if candidates is not None:
+            matches = self._scan_rows(candidates, tag_name, flag_name, flag_att, flag_value, is_cancelled)
+            return cache_key, None, matches
+        
+        if partial_match:
+            value_rows = self._find_in_values(tag_name) if flag_value else None
+            if (flag_value and value_rows is None) or (flag_att and self.attribute_index is None):
+                # No usable text or attribute index: check every criterion in one pass over the document
+                matches = self._scan_rows(range(len(self.node_table)), tag_name,
+                                          flag_name, flag_att, flag_value, is_cancelled)
+                return cache_key, None, matches
+            
+            # Every criterion resolves through its index
+            row_lists = []
+            if flag_name:
+                row_lists.append(self._rows_with_tag_containing(tag_name))
+            if flag_value:
+                row_lists.append(value_rows)
+            if flag_att:
+                row_lists.append(self.attribute_index.rows_containing(tag_name))
+            results = merge_rows(row_lists)
+        elif is_plain_tag(tag_name) or is_qualified_tag(tag_name):
+            # Exact match on a (namespace-stripped) tag name.
+            # Like findall('.//tag') the root element itself is excluded.
+            results = self.tag_index.exact(strip_namespace(tag_name))
+            if is_qualified_tag(tag_name):
+                # '{uri}tag' matches the tag in that namespace only, '{}tag' the tag in none
+                tag_id = self.node_table.tag_id(tag_name[2:] if tag_name.startswith('{}') else tag_name)
+                tag_ids = self.node_table.tag_ids
+                results = array('i', [row for row in results if tag_ids[row] == tag_id])
+            if len(results) and results[0] == 0:
+                results = results[1:]
+        else:
+            # Path expressions are still evaluated by ElementTree
+            root = self._get_root()
+            row_lookup = self._get_row_lookup()
+            matches = (row_lookup[elem] for elem in root.iterfind(f".//{tag_name}"))
+            return cache_key, None, matches
+        
+        self.cache.put(cache_key, results)
+        return cache_key, results, None
+    
+    def _scan_rows(self, rows, tag_name, flag_name, flag_att, flag_value, is_cancelled=None):
+        """
+        Check rows one by one against a partial search.
+        
+        Args:
+            rows: Node table rows to check, in document order
+            tag_name (str): The search string
+            is_cancelled: Optional callable; the scan stops when it returns True
+        
+        Yields:
+            int: The rows that match
+        
+        Raises:
+            SearchCancelled: If is_cancelled returned True
+        """
+        table = self.node_table
+        query = tag_name.lower()
+        # Tags are few, so match them once rather than per row
+        tag_ids = table.tag_ids
+        matching_tags = {tag_id for tag_id, tag in enumerate(table.tag_names)
+                         if query in tag.lower()} if flag_name else ()
+        texts = table.texts
+        attributes = table.attributes
+        
+        for i, row in enumerate(rows):
+            # Read once: low-memory text columns decode on every access
+            text = texts[row] if flag_value else None
+            if flag_name and tag_ids[row] in matching_tags:
+                yield row
+            elif text is not None and query in text.lower():
+                yield row
+            elif flag_att and attributes[row] and any(query in key.lower() or query in value.lower()
+                                                      for key, value in attributes[row].items()):
+                yield row
+            if is_cancelled is not None and not i % CANCEL_CHECK_INTERVAL and is_cancelled():
+                raise SearchCancelled()
+    
+    def _rows_with_tag_containing(self, tag_name):
+        """
+        Find the rows whose tag, namespace included, contains a case-insensitive substring.
+        
+        The tag index holds namespace-stripped tags. The few distinct tags that
+        match only through their '{namespace}' part (e.g. 'urn' in '{urn:x}item')
+        are found among the tag names, and their rows picked out of the rows of
+        their local name.
+        
+        Returns:
+            array: Rows in document order
+        """
+        rows = self.tag_index.rows_containing(tag_name)
+        query = tag_name.lower()
+        table = self.node_table
+        namespace_matches = {tag_id for tag_id, tag in enumerate(table.tag_names)
+                             if query in tag.lower() and query not in strip_namespace(tag).lower()}
+        if not namespace_matches:
+            return rows
+        tag_ids = table.tag_ids
+        local_names = {strip_namespace(table.tag_names[tag_id]) for tag_id in namespace_matches}
+        row_lists = [rows]
+        row_lists.extend(array('i', [row for row in self.tag_index.exact(name) if tag_ids[row] in namespace_matches])
+                         for name in local_names)
+        return merge_rows(row_lists)
+    
+    def _split_rows(self, results):
+        """Yield complete results in batches, the first one small enough to show at once."""
+        start, limit = 0, SEARCH_FIRST_BATCH_SIZE
+        while start < len(results):
+            yield results[start:start + limit]
+            start += limit
+            limit = SEARCH_BATCH_SIZE
+    
+    def _find_in_values(self, tag_name):
+        """
+        Find the rows whose text contains a case-insensitive substring, using the text index.
+        
+        Returns:
+            array: Rows in document order, or None if the index is not built yet
+                   or the query is too short for it
+        """
+        text_index = self.text_index
+        if text_index is None or text_index.texts is not self.node_table.texts:
+            return None
+        return text_index.rows_containing(tag_name)
+    
     def find_all_elements(self):
         """
         Find all elements in the XML file.
         
         Returns:
-            (list, str): List of element information and error message if any
+            (sequence, str): Node table row indices of every element and error message if any
         """
-        if not self.xml_tree:
+        if self.node_table is None:
             return None, ERROR_NO_XML_LOADED
         
         # Check cache first
-        cache_key = f"{self.xml_file_path}:{SEARCH_ALL_ELEMENTS}"
-        if cache_key in self.cache:
-            return self.cache[cache_key], None
+        cache_key = (self.file_identity, SEARCH_ALL_ELEMENTS)
+        results = self.cache.get(cache_key)
+        if results is not None:
+            return results, None
         
         try:
-            root = self.xml_tree.getroot()
-            results = []
-            
-            # Gather all elements
-            for elem in root.iter():
-                # Get element details
-                element_info = self._get_element_details(elem)
-                results.append(element_info)
+            # Every row of the node table, in document order
+            results = range(len(self.node_table))
             
             # Cache the results
-            self.cache[cache_key] = results
+            self.cache.put(cache_key, results)
             return results, None
         except Exception as e:
             return None, ERROR_SEARCHING.format(error=str(e))
     
-    def _get_element_details(self, element):
-        """Get comprehensive details about an XML element."""
-        # Get element tag name (remove namespace if present)
-        tag = element.tag
-        if '}' in tag:
-            tag = tag.split('}', 1)[1]
-        
-        # Get element text value
-        text = element.text.strip() if element.text else ""
-        
-        # Get full path and XPath
-        path = self._get_element_path(element)
-        xpath = self._get_element_xpath(element)
-        
-        # Get attributes
-        attributes = {k: v for k, v in element.attrib.items()}
-        
-        return {
-            'name': tag,
-            'value': text,
-            'path': path,
-            'xpath': xpath,
-            'attributes': attributes,
-            'element': element  # Keep reference to the element
-        }
-    
-    def _get_element_path(self, element):
-        """Generate a human-readable path to the element."""
-        path_parts = []
-        current = element
-        root = self.xml_tree.getroot()
+    def get_element_record(self, row):
+        """
+        Get a lazy result record for an XML element.
         
-        # Build path by traversing up to root
-        while current is not None:
-            if current.tag:
-                # Remove namespace from tag if present
-                tag = current.tag
-                if '}' in tag:
-                    tag = tag.split('}', 1)[1]
-                
-                # Add attributes to distinguish elements with same tag
-                if current.attrib:
-                    attribs = []
-                    for key, value in current.attrib.items():
-                        # Skip namespace declarations
-                        if not key.startswith('xmlns'):
-                            attribs.append(f'{key}="{value}"')
-                    
-                    if attribs:
-                        tag += f" [{' '.join(attribs)}]"
-                
-                path_parts.append(tag)
-            
-            # Find parent - ElementTree doesn't have direct parent access
-            parent = None
-            for p in root.iter():
-                if current in list(p):
-                    parent = p
-                    break
+        Args:
+            row: Node table row index of the element
             
-            current = parent
-            if current == root:
-                # Add root and break
-                path_parts.append(root.tag)
-                break
-        
-        # Reverse to get root->leaf order and join with '/'
-        path_parts.reverse()
-        return XPATH_DEFAULT_ROOT + '/'.join(path_parts)
+        Returns:
+            ElementRecord: Record exposing name, value, path, XPath and attributes
+        """
+        return ElementRecord(self.node_table, row)
     
-    def _get_element_xpath(self, element):
-        """Generate a standard XPath for the element."""
-        # This is an approximation since ElementTree doesn't provide direct XPath
-        path_parts = []
-        
-        # Track the current element
-        current = element
-        root = self.xml_tree.getroot()
-        
-        # Walk up the tree to build the XPath
-        while current is not None:
-            # Find the parent
-            parent = None
-            for p in root.iter():
-                if current in list(p):
-                    parent = p
-                    break
-            
-            if parent is None:
-                # This is the root element
-                path_parts.append(current.tag)
-                break
-            
-            # Count the position among siblings with the same tag
-            position = 1
-            for sibling in parent:
-                if sibling is current:
-                    break
-                if sibling.tag == current.tag:
-                    position += 1
-            
-            # Get the tag name (with namespace)
-            tag_name = current.tag
-            
-            # Add this element to the path
-            path_parts.append(f"{tag_name}[{position}]")
-            
-            # Move up to the parent
-            current = parent
-        
-        # Reverse and join with '/'
-        path_parts.reverse()
-        return XPATH_DEFAULT_ROOT + '/'.join(path_parts)
-    
\ No newline at end of file
+    def get_element_records(self, rows):
+        """Get lazy result records for a sequence of node table rows."""
+        return ElementRecordList(self.node_table, rows)
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.stream_loader import StreamLoader
+
+# Numeric columns every loader fills in
+NUMERIC_COLUMNS = ('parents', 'depths', 'positions', 'starts', 'ends',
+                   'lines', 'columns', 'end_lines', 'end_columns')
+
+
+def sample_document(groups, newline=b'\n'):
+    """
+    Return the bytes of a document exercising what loaders must get right:
+    a prolog with a DTD and an entity, namespaces, attributes, non-ASCII
+    text, mixed content, comments and empty elements.
+    """
+    lines = [b'<?xml version="1.0" encoding="UTF-8"?>',
+             b'<!DOCTYPE catalog [<!ENTITY co "Caf\xc3\xa9 &amp; Co">]>',
+             b'<catalog xmlns="urn:default" xmlns:x="urn:x" version="2">']
+    for group in range(groups):
+        lines.append(b'  <group id="%d" kind="%s">' % (group, b'ab'[group % 2:group % 2 + 1]))
+        for item in range(3):
+            lines.append(b'    <item sku="%d-%d"><price>%d.99</price>'
+                         b'<x:note x:lang="fr">&co; n\xc2\xb0%d</x:note></item>' % (group, item, item, item))
+        lines.append(b'    <!-- comment --><empty/>')
+        lines.append(b'    <mixed>before<b>bold</b>after' + newline + b'  tail</mixed>')
+        lines.append(b'  </group>')
+    lines.append(b'</catalog>')
+    return newline.join(lines) + newline
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    """Path to a sample document of 50 groups."""
+    path = tmp_path / "sample.xml"
+    path.write_bytes(sample_document(50))
+    return str(path)
+
+
+@pytest.fixture
+def sample_load(sample_file):
+    """The sample document as loaded by StreamLoader."""
+    return StreamLoader(sample_file).load()
+
+
+def table_rows(table):
+    """Return every column of a node table as plain lists, for comparing tables."""
+    columns = {name: list(getattr(table, name)) for name in NUMERIC_COLUMNS}
+    columns['tags'] = [table.tag(row) for row in range(len(table))]
+    columns['texts'] = list(table.texts)
+    columns['attributes'] = [dict(attributes or {}) for attributes in table.attributes]
+    return columns
+
+
+def term_postings(index):
+    """Return a TermIndex as a dict from term to its rows."""
+    postings = {}
+    for term_id, term in enumerate(index.terms):
+        rows = list(index.posting(term_id))
+        if rows:
+            postings[term] = rows
+    return postings
+
+
+def trigram_postings(index):
+    """Return a TrigramIndex as a dict from trigram to its rows."""
+    postings = {}
+    for gram in index.postings:
+        rows = list(index.posting(gram))
+        if rows:
+            postings[gram] = rows
+    return postings
@@ -0,0 +1,57 @@
+import pytest
+
+from conftest import sample_document
+from model.directory_search import DirectorySearch, find_files
+from model.stream_search import SearchCancelled
+
+
+@pytest.fixture
+def directory(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for number in range(12):
+        (tmp_path / f"file{number:02}.xml").write_bytes(sample_document(number + 1))
+    (tmp_path / "sub" / "nested.xml").write_bytes(sample_document(2))
+    (tmp_path / "broken.xml").write_bytes(b'<a><b></a>')
+    (tmp_path / "notes.txt").write_bytes(b'<a/>')
+    return tmp_path
+
+
+def test_find_files(directory):
+    assert len(find_files(str(directory), '*.xml')) == 13
+    assert len(find_files(str(directory), '**/*.xml')) == 14
+
+
+def test_every_file_is_searched(directory):
+    files = find_files(str(directory), '*.xml')
+    search = DirectorySearch(files, 'price', True, False, False, False, workers=2, chunk_size=512)
+    results = {file_path: (records, error) for file_path, records, error in search.results()}
+
+    assert sorted(results) == files
+    assert results[str(directory / "broken.xml")][1]
+    for number in range(12):
+        records, error = results[str(directory / f"file{number:02}.xml")]
+        assert error is None
+        assert len(records) == 3 * (number + 1)
+        assert all(record.file == str(directory / f"file{number:02}.xml") for record in records)
+
+
+def test_large_file_does_not_hold_back_others(tmp_path):
+    (tmp_path / "a_large.xml").write_bytes(sample_document(20000))
+    for number in range(6):
+        (tmp_path / f"small{number}.xml").write_bytes(sample_document(1))
+    files = find_files(str(tmp_path), '*.xml')
+    search = DirectorySearch(files, 'item', True, False, False, False, workers=2)
+    order = [file_path for file_path, _, _ in search.results()]
+    assert sorted(order) == files
+    assert order[-1] == files[0]
+
+
+def test_cancel(directory):
+    files = find_files(str(directory), '*.xml')
+    seen = []
+    search = DirectorySearch(files, 'price', True, False, False, False, workers=2,
+                             is_cancelled=lambda: len(seen) > 0)
+    with pytest.raises(SearchCancelled):
+        for result in search.results():
+            seen.append(result)
+    assert len(seen) < len(files)
@@ -0,0 +1,48 @@
+import pytest
+
+from conftest import table_rows, term_postings, trigram_postings
+from model.index_cache import IndexCache
+from model.search_index import TextIndex
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return IndexCache(str(tmp_path / "cache"), 1 << 30)
+
+
+@pytest.fixture
+def identity(sample_file):
+    return (sample_file, 1, 2)
+
+
+def test_round_trip(cache, identity, sample_load):
+    _, table, tag_index, attribute_index = sample_load
+    text_index = TextIndex.build(table.texts)
+
+    assert cache.store(identity, table, tag_index, attribute_index, text_index)
+    cached_table, cached_tags, cached_attributes, cached_text = cache.load(identity)
+
+    assert table_rows(cached_table) == table_rows(table)
+    assert term_postings(cached_tags) == term_postings(tag_index)
+    assert term_postings(cached_attributes.keys) == term_postings(attribute_index.keys)
+    assert term_postings(cached_attributes.values) == term_postings(attribute_index.values)
+    assert trigram_postings(cached_text.trigrams) == trigram_postings(text_index.trigrams)
+    for query in ('item', 'not', 'x'):
+        assert list(cached_tags.rows_containing(query)) == list(tag_index.rows_containing(query))
+
+
+def test_other_version_misses(cache, identity, sample_load):
+    _, table, tag_index, attribute_index = sample_load
+    cache.store(identity, table, tag_index, attribute_index)
+    assert cache.load(identity[:2] + (3,)) is None
+
+
+def test_damaged_header_is_rejected(cache, identity, sample_load):
+    _, table, tag_index, attribute_index = sample_load
+    cache.store(identity, table, tag_index, attribute_index)
+
+    path = cache._entry_path(identity)
+    with open(path, 'r+b') as f:
+        f.seek(20)
+        f.write(b'\xff' * 8)
+    assert cache.load(identity) is None
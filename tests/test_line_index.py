@@ -0,0 +1,66 @@
+import io
+import random
+
+import pytest
+
+from model.line_index import LineIndex, read_blocks
+
+
+def line_starts(data):
+    """Offsets where every line starts, counting CRLF, CR and LF as one break each."""
+    starts = [0]
+    offset = 0
+    while offset < len(data):
+        if data[offset:offset + 2] == b'\r\n':
+            offset += 2
+        elif data[offset:offset + 1] in (b'\r', b'\n'):
+            offset += 1
+        else:
+            offset += 1
+            continue
+        starts.append(offset)
+    return starts
+
+
+@pytest.fixture(params=[1, 2, 3, 7, 1024], ids=lambda size: f'block{size}')
+def indexed(tmp_path, request):
+    randomizer = random.Random(request.param)
+    data = b''.join(randomizer.choice([b'a', b'bc', b'\r\n', b'\r', b'\n', b'\r\r\n', b'\xc3\xa9'])
+                    for _ in range(400))
+    path = tmp_path / "lines.txt"
+    path.write_bytes(data)
+    index = LineIndex(str(path), block_size=request.param)
+    assert index.build()
+    return data, index
+
+
+def test_read_blocks_keep_crlf_together():
+    data = b'a\r\nb\r\r\nc\r'
+    for block_size in range(1, len(data) + 1):
+        blocks = list(read_blocks(io.BytesIO(data), block_size))
+        assert b''.join(blocks) == data
+        assert not any(block.endswith(b'\r') and following.startswith(b'\n')
+                       for block, following in zip(blocks, blocks[1:]))
+
+
+def test_line_count(indexed):
+    data, index = indexed
+    assert index.line_count == len(line_starts(data))
+
+
+def test_line_offset(indexed):
+    data, index = indexed
+    starts = line_starts(data)
+    for line, start in enumerate(starts, 1):
+        assert index.line_offset(line) == start
+    assert index.line_offset(len(starts) + 5) == starts[-1]
+
+
+def test_line_of_offset(indexed):
+    data, index = indexed
+    starts = line_starts(data)
+    line = 1
+    for offset in range(len(data) + 1):
+        while line < len(starts) and starts[line] <= offset:
+            line += 1
+        assert index.line_of_offset(offset) == line, offset
@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import sample_document, table_rows, term_postings
+from model import xml_model
+from model.mapped_loader import MappedLoader
+from model.result_cache import ResultCache
+
+
+def test_matches_stream_loader(sample_file, sample_load):
+    _, table, tag_index, _ = sample_load
+    tree, mapped_table, mapped_tags, attribute_index = MappedLoader(sample_file).load()
+
+    assert tree is None and attribute_index is None
+    assert table_rows(mapped_table) == table_rows(table)
+    assert term_postings(mapped_tags) == term_postings(tag_index)
+
+
+def test_close_releases_file(tmp_path):
+    path = tmp_path / "plain.xml"
+    path.write_bytes(b'<root><item sku="1">text</item></root>')
+    _, table, _, _ = MappedLoader(str(path)).load()
+    assert table.texts[1] == 'text' and table.attributes[1] == {'sku': '1'}
+
+    table.close()
+    assert table.texts.buffer is None and table.attributes.buffer is None
+    assert table.texts[1] is None and table.attributes[1] is None
+    table.close()
+
+
+@pytest.fixture
+def low_memory_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(xml_model, 'LOW_MEMORY_MIN_MB', 0)
+    monkeypatch.setattr(xml_model, 'INDEX_CACHE_ENABLED', False)
+    model = xml_model.XMLModel()
+    monkeypatch.setattr(model, 'cache', ResultCache(1 << 30))
+    return model
+
+
+def test_model_closes_replaced_table(tmp_path, low_memory_model):
+    paths = []
+    for name in ('first.xml', 'second.xml'):
+        paths.append(tmp_path / name)
+        paths[-1].write_bytes(sample_document(3))
+    assert low_memory_model.load_xml_file(str(paths[0])) == (True, None)
+    table = low_memory_model.node_table
+    assert low_memory_model.is_low_memory() and table.texts.buffer is not None
+
+    assert low_memory_model.load_xml_file(str(paths[1])) == (True, None)
+    assert table.texts.buffer is None
+    assert low_memory_model.node_table.texts.buffer is not None
+
+
+def test_model_closes_table_of_changed_file(tmp_path, low_memory_model):
+    path = tmp_path / "sample.xml"
+    path.write_bytes(sample_document(3))
+    assert low_memory_model.load_xml_file(str(path)) == (True, None)
+    table = low_memory_model.node_table
+
+    path.write_bytes(sample_document(4))
+    assert low_memory_model.is_file_changed()
+    low_memory_model.invalidate_file()
+    assert table.texts.buffer is None
@@ -0,0 +1,96 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from model.stream_loader import StreamLoader
+from DefineConst import XPATH_DEFAULT_ROOT
+
+DOCUMENT = b'''<?xml version="1.0"?>
+<root xmlns="urn:default" xmlns:p="urn:p" version="1">
+  <item id="1"><name>a</name><name lang="en">b</name></item>
+  <item id="2" p:kind="x"><p:name>c</p:name><name/><p:name>d</p:name></item>
+  <p:item><item><item/><item/></item></p:item>
+  <other xmlns="" plain="yes"><item/><item/></other>
+  <item/>
+</root>
+'''
+
+
+def tree_walk_path(root, element):
+    """The path as found by walking the whole tree for each parent, as before the node table."""
+    path_parts = []
+    current = element
+    while current is not None:
+        tag = current.tag
+        if '}' in tag:
+            tag = tag.split('}', 1)[1]
+        if current.attrib:
+            attribs = [f'{key}="{value}"' for key, value in current.attrib.items()
+                       if not key.startswith('xmlns')]
+            if attribs:
+                tag += f" [{' '.join(attribs)}]"
+        path_parts.append(tag)
+
+        parent = None
+        for p in root.iter():
+            if current in list(p):
+                parent = p
+                break
+        current = parent
+        if current == root:
+            path_parts.append(root.tag)
+            break
+    path_parts.reverse()
+    return XPATH_DEFAULT_ROOT + '/'.join(path_parts)
+
+
+def tree_walk_xpath(root, element):
+    """The XPath as found by walking the whole tree for each parent, as before the node table."""
+    path_parts = []
+    current = element
+    while current is not None:
+        parent = None
+        for p in root.iter():
+            if current in list(p):
+                parent = p
+                break
+        if parent is None:
+            path_parts.append(current.tag)
+            break
+        position = 1
+        for sibling in parent:
+            if sibling is current:
+                break
+            if sibling.tag == current.tag:
+                position += 1
+        path_parts.append(f"{current.tag}[{position}]")
+        current = parent
+    path_parts.reverse()
+    return XPATH_DEFAULT_ROOT + '/'.join(path_parts)
+
+
+@pytest.fixture
+def loaded(tmp_path):
+    path = tmp_path / "paths.xml"
+    path.write_bytes(DOCUMENT)
+    tree, table, _, _ = StreamLoader(str(path)).load()
+    return tree.getroot(), table
+
+
+def test_paths_match_tree_walk(loaded):
+    root, table = loaded
+    elements = list(root.iter())
+    assert len(elements) == len(table)
+    for row, element in enumerate(elements):
+        assert table.element_path(row) == tree_walk_path(root, element)
+        assert table.element_xpath(row) == tree_walk_xpath(root, element)
+
+
+def test_xpath_finds_element(loaded):
+    root, table = loaded
+    tree = ET.ElementTree(root)
+    for row, element in enumerate(root.iter()):
+        if row:
+            # ElementPath takes the steps below the root, relative to it
+            steps = table.element_xpath(row).split('/', 2)[2]
+            assert tree.find('./' + steps) is element
@@ -0,0 +1,20 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from conftest import table_rows, term_postings
+from model.parallel_loader import ParallelLoader
+
+
+@pytest.mark.parametrize('chunk_size', [512, 4096, 1024 * 1024])
+def test_matches_stream_loader(sample_file, sample_load, chunk_size):
+    tree, table, tag_index, attribute_index = sample_load
+    parallel_tree, parallel_table, parallel_tags, parallel_attributes = \
+        ParallelLoader(sample_file, 2, chunk_size=chunk_size).load()
+
+    assert table_rows(parallel_table) == table_rows(table)
+    assert ET.tostring(parallel_tree.getroot()) == ET.tostring(tree.getroot())
+    assert list(parallel_tree.getroot().iter()) == list(parallel_table.elements)
+    assert term_postings(parallel_tags) == term_postings(tag_index)
+    assert term_postings(parallel_attributes.keys) == term_postings(attribute_index.keys)
+    assert term_postings(parallel_attributes.values) == term_postings(attribute_index.values)
@@ -0,0 +1,25 @@
+import pytest
+
+from conftest import sample_document
+from model.stream_loader import StreamLoader
+
+
+@pytest.mark.parametrize('newline', [b'\n', b'\r\n'], ids=['lf', 'crlf'])
+def test_positions_locate_elements(tmp_path, newline):
+    data = sample_document(5, newline)
+    path = tmp_path / "sample.xml"
+    path.write_bytes(data)
+    _, table, _, _ = StreamLoader(str(path)).load()
+
+    def location(offset):
+        before = data[:offset].replace(b'\r\n', b'\n').decode('utf-8')
+        return before.count('\n') + 1, len(before) - before.rfind('\n')
+
+    for row in range(len(table)):
+        start, end = table.starts[row], table.ends[row]
+        element = data[start:end]
+        assert element.startswith(b'<') and element.endswith(b'>')
+        name = element[1:].split(b'>', 1)[0].split()[0].rstrip(b'/')
+        assert name.split(b':')[-1] == table.local_name(row).encode()
+        assert (table.lines[row], table.columns[row]) == location(start)
+        assert (table.end_lines[row], table.end_columns[row]) == location(end)
@@ -0,0 +1,33 @@
+import pytest
+
+from model.stream_search import SearchCriteria, StreamSearch
+from DefineConst import ERROR_STREAMING_PATH, SEARCH_ALL_ELEMENTS
+
+
+def search(path, tag_name, partial_match=False, flag_value=False):
+    criteria = SearchCriteria(tag_name, True, False, flag_value, partial_match)
+    return [record for batch in StreamSearch(path, criteria, chunk_size=512).batches() for record in batch]
+
+
+def test_exact_tags(sample_file):
+    assert len(search(sample_file, 'item')) == 150
+    assert len(search(sample_file, '{urn:default}item')) == 150
+    assert len(search(sample_file, '{urn:x}note')) == 150
+    assert search(sample_file, '{}item') == []
+    assert len(search(sample_file, SEARCH_ALL_ELEMENTS)) == 1 + 50 * 13
+
+
+def test_partial_search(sample_file):
+    assert len(search(sample_file, 'ric', partial_match=True)) == 150
+    assert len(search(sample_file, 'café', partial_match=True, flag_value=True)) == 150
+    # The namespace is part of the tag, as in the loaded-file search
+    assert len(search(sample_file, 'urn:x}', partial_match=True)) == 150
+    assert len(search(sample_file, 'urn:', partial_match=True)) == 1 + 50 * 13
+
+
+@pytest.mark.parametrize('tag_name', ['group/item', 'item[@sku]', './/item', 'item[1]'])
+def test_path_expressions_are_rejected(tag_name):
+    assert not SearchCriteria.supports(tag_name, False)
+    with pytest.raises(ValueError, match=ERROR_STREAMING_PATH):
+        SearchCriteria(tag_name, True, False, False, False)
+    assert SearchCriteria.supports(tag_name, True)
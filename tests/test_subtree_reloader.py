@@ -0,0 +1,128 @@
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from conftest import sample_document, table_rows, term_postings, trigram_postings
+from model.index_cache import IndexCache
+from model.search_index import TextIndex
+from model.stream_loader import StreamLoader
+from model.subtree_reloader import SubtreeReloader
+
+
+class EditedFile:
+    """A file edited in place, with its table and indexes kept up to date by SubtreeReloader."""
+
+    def __init__(self, path, data):
+        self.path = str(path)
+        self.data = data
+        path.write_bytes(data)
+        _, self.table, self.tag_index, self.attribute_index = StreamLoader(self.path).load()
+        self.text_index = TextIndex.build(self.table.texts)
+
+    def edit(self, start, stop, replacement):
+        """
+        Replace bytes start..stop and reload the enclosing element.
+
+        Returns:
+            bool: True if the element was spliced, False if a full parse is needed
+        """
+        self.data = self.data[:start] + replacement + self.data[stop:]
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        reloader = SubtreeReloader(self.path, self.table, self.tag_index, self.attribute_index, self.text_index)
+        result = reloader.reload(start, stop, start + len(replacement))
+        if result is None:
+            _, self.table, self.tag_index, self.attribute_index = StreamLoader(self.path).load()
+            self.text_index = TextIndex.build(self.table.texts)
+            return False
+        self.table, self.tag_index, self.attribute_index, self.text_index = result
+        return True
+
+    def assert_matches_full_parse(self):
+        tree, table, tag_index, attribute_index = StreamLoader(self.path).load()
+        assert table_rows(self.table) == table_rows(table)
+        assert term_postings(self.tag_index) == term_postings(tag_index)
+        assert term_postings(self.attribute_index.keys) == term_postings(attribute_index.keys)
+        assert term_postings(self.attribute_index.values) == term_postings(attribute_index.values)
+        assert (trigram_postings(self.text_index.trigrams)
+                == trigram_postings(TextIndex.build(table.texts).trigrams))
+        if len(self.table.elements):
+            root = self.table.elements[0]
+            assert ET.tostring(root) == ET.tostring(tree.getroot())
+            assert list(root.iter()) == list(self.table.elements)
+
+    def content_start(self, row):
+        """Return the offset just past the start tag of a row, or None for an empty element."""
+        start, end = self.table.starts[row], self.table.ends[row]
+        if self.data[start:end].endswith(b'/>'):
+            return None
+        return start + self.data[start:end].index(b'>') + 1
+
+
+@pytest.fixture(params=[b'\n', b'\r\n'], ids=['lf', 'crlf'])
+def edited_file(tmp_path, request):
+    return EditedFile(tmp_path / "sample.xml", sample_document(20, request.param))
+
+
+def rows_of(edited_file, tag):
+    return [row for row in range(len(edited_file.table)) if edited_file.table.local_name(row) == tag]
+
+
+def test_text_edit(edited_file):
+    row = rows_of(edited_file, 'price')[5]
+    position = edited_file.content_start(row)
+    assert edited_file.edit(position, position + 1, b'\xe2\x82\xac12')
+    edited_file.assert_matches_full_parse()
+
+
+def test_insert_children_with_new_lines(edited_file):
+    row = rows_of(edited_file, 'item')[7]
+    position = edited_file.content_start(row)
+    assert edited_file.edit(position, position, b'<new a="b">n\xc3\xa9w</new>\n<x:note/>\n')
+    edited_file.assert_matches_full_parse()
+
+
+def test_delete_element(edited_file):
+    row = rows_of(edited_file, 'item')[10]
+    assert edited_file.edit(edited_file.table.starts[row], edited_file.table.ends[row], b'')
+    edited_file.assert_matches_full_parse()
+
+
+def test_edit_of_root_start_tag_needs_full_parse(edited_file):
+    position = edited_file.table.starts[0] + len(b'<catalog')
+    assert not edited_file.edit(position, position, b' added="1"')
+    edited_file.assert_matches_full_parse()
+
+
+def test_random_edits(tmp_path, edited_file):
+    randomizer = random.Random(1)
+    spliced = 0
+    for step in range(120):
+        if step == 60:
+            # Go on from a table and indexes read back from the index cache
+            cache = IndexCache(str(tmp_path / "cache"), 1 << 30)
+            identity = (edited_file.path, step, len(edited_file.data))
+            cache.store(identity, edited_file.table, edited_file.tag_index,
+                        edited_file.attribute_index, edited_file.text_index)
+            (edited_file.table, edited_file.tag_index,
+             edited_file.attribute_index, edited_file.text_index) = cache.load(identity)
+
+        row = randomizer.randrange(1, len(edited_file.table))
+        start, end = edited_file.table.starts[row], edited_file.table.ends[row]
+        content = edited_file.content_start(row)
+        kind = randomizer.choice(['text', 'child', 'delete', 'tail'])
+        if kind == 'delete':
+            edit = (start, end, b'')
+        elif kind == 'tail':
+            edit = (end, end, b'tail\n')
+        elif content is None:
+            continue
+        elif kind == 'text':
+            edit = (content, content, randomizer.choice([b'X', b'\xe2\x82\xac', b'ab\ncd']))
+        else:
+            edit = (content, content, randomizer.choice([b'<new a="b">n</new>', b'<x:note/>\n',
+                                                         b'<group>\n<item>q</item></group>']))
+        spliced += edited_file.edit(*edit)
+        edited_file.assert_matches_full_parse()
+    assert spliced > 60
@@ -0,0 +1,62 @@
+import random
+import re
+
+import pytest
+
+from model.text_finder import TextMatches, compile_pattern
+
+PATTERNS = [r'a+', r'ab|b', r'a*', r'^b', r'b$', r'\bab', r'(?<=a)b', r'b(?=a)', r'x?', r'[ab]+?']
+
+
+def finditer_spans(pattern, text):
+    return [match.span() for match in pattern.finditer(text) if match.end() > match.start()]
+
+
+@pytest.mark.parametrize('chunk_size, overlap', [(1, 8), (3, 8), (7, 16), (1 << 20, 1 << 16)])
+def test_scan_matches_finditer(chunk_size, overlap):
+    randomizer = random.Random(2)
+    for _ in range(300):
+        text = ''.join(randomizer.choice('aabbc\n ') for _ in range(randomizer.randrange(60)))
+        for source in PATTERNS:
+            pattern = compile_pattern(source, regex=True, case_sensitive=True)
+            matches = TextMatches.scan(pattern, text, chunk_size=chunk_size, overlap=overlap)
+            assert list(zip(matches.starts, matches.ends)) == finditer_spans(pattern, text), (source, text)
+
+
+def test_match_longer_than_overlap():
+    pattern = compile_pattern('a+', regex=True, case_sensitive=True)
+    text = 'b' + 'a' * 50 + 'b'
+    matches = TextMatches.scan(pattern, text, chunk_size=4, overlap=2)
+    assert list(zip(matches.starts, matches.ends)) == [(1, 51)]
+
+
+def test_compile_pattern():
+    assert compile_pattern('A.b').search('xa.By')
+    assert not compile_pattern('A.b').search('xaxb')
+    assert not compile_pattern('A', case_sensitive=True).search('a')
+    with pytest.raises(re.error):
+        compile_pattern('(', regex=True)
+
+
+def test_cancelled_scan():
+    calls = []
+
+    def is_cancelled():
+        calls.append(None)
+        return len(calls) > 2
+
+    pattern = compile_pattern('z')
+    assert TextMatches.scan(pattern, 'a' * 100, is_cancelled, chunk_size=10, overlap=2) is None
+    assert len(calls) == 3
+
+
+def test_navigation():
+    matches = TextMatches.scan(compile_pattern('ab'), 'ab ab xx ab')
+    assert list(matches.starts) == [0, 3, 9]
+    assert matches.after(0) == 1
+    assert matches.after(0, inclusive=True) == 0
+    assert matches.after(9) == 0
+    assert matches.before(3) == 0
+    assert matches.before(0) == 2
+    assert list(matches.overlapping(1, 4)) == [0, 1]
+    assert TextMatches().after(0) is None
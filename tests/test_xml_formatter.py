@@ -0,0 +1,57 @@
+import xml.dom.minidom as minidom
+from xml.parsers import expat
+
+import pytest
+
+from conftest import sample_document
+from model.xml_formatter import format_xml_text
+
+DOCUMENTS = [
+    '<a/>',
+    '<a>x</a>',
+    '<a>\n\n  </a>',
+    '<a>t<b/>u</a>',
+    '<a><![CDATA[x<y]]></a>',
+    '<a><![CDATA[x]]>t</a>',
+    '<a><![CDATA[x]]><b/><![CDATA[y]]>z<c/></a>',
+    '<a><!--c--><?pi data?><?pi?></a>',
+    '<!--top--><?top x?><a/><!--after-->',
+    '<a x="1&amp;2" y="&quot;&lt;&gt;">&amp;&lt;&gt;"\'</a>',
+    '<a xmlns="urn:d" b="1" xmlns:p="urn:p" p:c="2"><p:b xmlns=""><c/></p:b></a>',
+    '<!DOCTYPE a [<!ENTITY e "hello"><!-- sub -->\r\n<!ELEMENT a ANY>]><a>&e; &#13;x</a>',
+    '<!DOCTYPE a PUBLIC "-//x//y" "a.dtd"><a/>',
+    '<!DOCTYPE a [<!ENTITY m "<b>x</b>y">]><a>&m;</a>',
+    '<a>line1\n\n   \nline2　\n\x85\n</a>',
+    '<a>\r\n x \r y</a>',
+    '<a>\U0001F600<b>é</b></a>',
+    '<a><b>x</b><b>y<c/></b>\n  text\n<d></d></a>',
+    sample_document(3).decode('utf-8'),
+]
+
+
+def minidom_format(text, indent="  "):
+    """What the editor produced before, with minidom."""
+    pretty = minidom.parseString(text).toprettyxml(indent=indent)
+    return '\n'.join(line for line in pretty.split('\n') if line.strip())
+
+
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_matches_minidom(text):
+    assert format_xml_text(text) == minidom_format(text)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7])
+def test_chunking_does_not_change_output(chunk_size):
+    for text in DOCUMENTS:
+        assert format_xml_text(text, chunk_size=chunk_size) == minidom_format(text)
+
+
+def test_indent():
+    text = '<a><b><c/></b></a>'
+    assert format_xml_text(text, indent="\t") == minidom_format(text, indent="\t")
+
+
+@pytest.mark.parametrize('text', ['<a>', '<a></b>', '<a p:x="1"/>'])
+def test_malformed_document(text):
+    with pytest.raises(expat.ExpatError):
+        format_xml_text(text)
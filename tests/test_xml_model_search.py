@@ -0,0 +1,126 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from conftest import sample_document
+from model.index_cache import IndexCache
+from model.node_table import strip_namespace
+from model.result_cache import ResultCache
+from model.xml_model import XMLModel
+from DefineConst import SEARCH_ALL_ELEMENTS
+
+EXACT_QUERIES = ['item', 'price', 'note', 'catalog', 'missing', '{urn:x}note', '{urn:default}item',
+                 '{urn:other}item', '{}item', 'group/item', 'item[@sku="3-1"]', 'mixed/b']
+PARTIAL_QUERIES = ['i', 'it', 'item', 'ITE', 'e', 'note', 'urn', 'urn:x}', '{urn:x}note', 'x}n',
+                   'caf', 'café', '&', '9', '3-1', 'fr', 'lang', 'kind', 'b', 'zzz']
+FLAG_SETS = [(True, False, False), (False, True, False), (False, False, True), (True, True, True)]
+
+
+def tree_scan(root, tag_name, flag_name, flag_att, flag_value, partial_match):
+    """Search by walking the element tree, as before the indexes."""
+    if not partial_match:
+        if tag_name.startswith('{') or '/' in tag_name or '[' in tag_name:
+            return root.findall(f".//{tag_name}")
+        # A bare tag matches in any namespace
+        return [elem for elem in root.iter() if elem is not root and strip_namespace(elem.tag) == tag_name]
+    query = tag_name.lower()
+    return [elem for elem in root.iter()
+            if (flag_name and query in elem.tag.lower())
+            or (flag_value and elem.text is not None and query in elem.text.lower())
+            or (flag_att and any(query in key.lower() or query in value.lower()
+                                 for key, value in elem.attrib.items()))]
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    path = tmp_path / "sample.xml"
+    path.write_bytes(sample_document(30))
+    model = XMLModel()
+    monkeypatch.setattr(model, 'cache', ResultCache(1 << 30))
+    monkeypatch.setattr(model, 'index_cache', IndexCache(str(tmp_path / "cache"), 1 << 30))
+    success, error = model.load_xml_file(str(path))
+    assert success, error
+    model.wait_for_text_index()
+    return model
+
+
+def found(model, tag_name, flag_name, flag_att, flag_value, partial_match):
+    rows, error = model.find_elements_by_tag(tag_name, flag_name, flag_att, flag_value, partial_match)
+    assert not error
+    return list(rows)
+
+
+def expected(model, *search):
+    root = ET.parse(model.xml_file_path).getroot()
+    rows = {elem: row for row, elem in enumerate(root.iter())}
+    return [rows[elem] for elem in tree_scan(root, *search)]
+
+
+@pytest.mark.parametrize('tag_name', EXACT_QUERIES)
+def test_exact_search(model, tag_name):
+    search = (tag_name, True, False, False, False)
+    assert found(model, *search) == expected(model, *search)
+
+
+@pytest.mark.parametrize('flags', FLAG_SETS, ids=['name', 'attribute', 'value', 'all'])
+@pytest.mark.parametrize('tag_name', PARTIAL_QUERIES)
+def test_partial_search(model, tag_name, flags):
+    search = (tag_name,) + flags + (True,)
+    assert found(model, *search) == expected(model, *search)
+
+
+@pytest.mark.parametrize('tag_name', ['caf', 'n°', 'bold', '99'])
+def test_value_search_without_text_index(model, monkeypatch, tag_name):
+    monkeypatch.setattr(model, 'text_index', None)
+    search = (tag_name, False, False, True, True)
+    assert found(model, *search) == expected(model, *search)
+
+
+def test_search_all(model):
+    rows, error = model.find_all_elements()
+    assert not error
+    assert list(rows) == list(range(len(model.node_table)))
+    assert found(model, SEARCH_ALL_ELEMENTS, True, False, False, True) == list(rows)
+
+
+def test_repeated_search_is_cached(model):
+    search = ('item', True, True, True, True)
+    first = found(model, *search)
+    hits = model.cache.hits
+    assert found(model, *search) == first
+    assert model.cache.hits == hits + 1
+
+
+@pytest.mark.parametrize('queries', [['i', 'it', 'ite', 'item'], ['n', 'no', 'NOTE'], ['u', 'urn', 'urn:x}n']])
+def test_narrowing_matches_full_search(model, queries):
+    flags = (True, True, True)
+    rows = found(model, queries[0], *flags, True)
+    for tag_name in queries[1:]:
+        narrowed, error = model.narrow_elements_by_tag(rows, tag_name, *flags)
+        assert not error
+        rows = list(narrowed)
+        assert rows == expected(model, tag_name, *flags, True)
+
+
+def test_edit_invalidates_results(model):
+    searches = [('fresh', True, True, True, True), ('item', True, False, False, False),
+                ('caf', False, False, True, True)]
+    before = [found(model, *search) for search in searches]
+    assert before[0] == []
+
+    path = model.xml_file_path
+    with open(path, 'rb') as f:
+        data = f.read()
+    row = found(model, 'price', True, False, False, False)[4]
+    start = model.node_table.starts[row]
+    insert = b'<item fresh="1">caf\xc3\xa9</item>'
+    with open(path, 'wb') as f:
+        f.write(data[:start] + insert + data[start:])
+    success, error = model.apply_edit(path, (model.file_stamp, start, start, start + len(insert)))
+    assert success, error
+    model.wait_for_text_index()
+
+    for search, old in zip(searches, before):
+        rows = found(model, *search)
+        assert rows == expected(model, *search)
+        assert rows != old
@@ -1,74 +1,240 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QPlainTextEdit, 
-                             QHBoxLayout, QLabel, 
+                             QHBoxLayout, QLabel, QLineEdit, QCheckBox, QPushButton,
                              QFileDialog, QInputDialog, QMessageBox,
-                             QAction, QToolBar)
+                             QAction, QToolBar, QTextEdit, QShortcut)
 from PyQt5.QtGui import (QFont, QTextCursor, QColor, QTextCharFormat,
-                         QSyntaxHighlighter)
-from PyQt5.QtCore import Qt, QRegExp, pyqtSignal
+                         QSyntaxHighlighter, QKeySequence)
+from PyQt5.QtCore import Qt, QEvent, QRegularExpression, QTimer, pyqtSignal
+from array import array
+from bisect import bisect_left
 import os
-import xml.dom.minidom as minidom
+import re
+import threading
+from model.text_finder import TextMatches, compile_pattern
+from model.xml_formatter import format_xml_text
+from view.paged_file_view import PagedFileView
 from DefineConst import *
 
+def _utf16_length(text):
+    """Length of a string in UTF-16 code units, the unit of Qt text positions."""
+    return len(text.encode('utf-16-le')) // 2
+
+# A character outside the Basic Multilingual Plane, two UTF-16 code units long
+_ASTRAL = re.compile('[\U00010000-\U0010FFFF]')
+
+def _utf16_offsets(text, offsets):
+    """Convert offsets in a string to Qt text positions, which count UTF-16 code units."""
+    astral = [match.start() for match in _ASTRAL.finditer(text)]
+    if not astral:
+        return offsets
+    return array('q', [offset + bisect_left(astral, offset) for offset in offsets])
+
+def _file_stamp(file_path):
+    """Return (modification time, size) of a file, or None if it cannot be read."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _encode_text(text):
+    """Encode editor text the way save_file writes it."""
+    return text.replace('\n', os.linesep).encode('utf-8')
+
+def _changed_range(old, new):
+    """
+    Find the bytes that differ between two versions of a file.
+    
+    Returns:
+        (int, int, int): Offset of the first differing byte, and the offsets
+            just past the last differing byte in old and in new
+    """
+    # Halving searches compare each byte at most once, at memcmp speed
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[low:middle] == new[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    start = low
+    
+    low, high = 0, min(len(old), len(new)) - start
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[len(old) - middle:len(old) - low] == new[len(new) - middle:len(new) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return start, len(old) - low, len(new) - low
+
 class XMLSyntaxHighlighter(QSyntaxHighlighter):
-    """Syntax highlighter for XML content."""
+    """
+    Syntax highlighter for XML content.
+    
+    Each block is tokenized in a single pass with precompiled patterns.
+    Comments, CDATA sections, processing instructions and tags may span
+    several lines; the construct still open at the end of a block is kept as
+    the block state, so the next block continues it.
+    """
+    
+    # Block states: the construct still open at the end of the block
+    STATE_NONE = -1  # Qt's state for blocks that were never highlighted
+    STATE_COMMENT = 1
+    STATE_CDATA = 2
+    STATE_DECLARATION = 3
+    STATE_TAG = 4
+    
+    # Start of the next markup construct; the group that matched is the
+    # construct's block state, or 4 for a tag
+    MARKUP = re.compile(r'<(?:(!--)|(!\[CDATA\[)|([?!])|(/?[A-Za-z_:][-\w.:]*))')
+    
+    # Inside a tag: attribute name, quoted value or the end of the tag
+    TAG_PART = re.compile(r'''([^\s=/>"'<]+)(?=\s*=)|("[^"]*"|'[^']*')|(/?>)''')
+    ATTRIBUTE, VALUE, TAG_END = 1, 2, 3
+    
+    # Construct state -> end marker
+    END_MARKERS = {STATE_COMMENT: '-->', STATE_CDATA: ']]>', STATE_DECLARATION: '>'}
     
     def __init__(self, document):
         super().__init__(document)
         
-        self.highlighting_rules = []
-        
         # XML tags
-        tag_format = QTextCharFormat()
-        tag_format.setForeground(QColor("#0000FF"))  # Blue
-        tag_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp("<[/]?[a-zA-Z0-9_:]+[^>]*>"), tag_format))
+        self.tag_format = QTextCharFormat()
+        self.tag_format.setForeground(QColor("#0000FF"))  # Blue
+        self.tag_format.setFontWeight(QFont.Bold)
         
         # XML attributes
-        attribute_format = QTextCharFormat()
-        attribute_format.setForeground(QColor("#FF00FF"))  # Purple
-        self.highlighting_rules.append((QRegExp("\\b[a-zA-Z0-9_:]+(?==)"), attribute_format))
+        self.attribute_format = QTextCharFormat()
+        self.attribute_format.setForeground(QColor("#FF00FF"))  # Purple
         
         # XML attribute values
-        value_format = QTextCharFormat()
-        value_format.setForeground(QColor("#008000"))  # Green
-        self.highlighting_rules.append((QRegExp("\"[^\"]*\"|'[^']*'"), value_format))
-        
-        # XML comments
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#808080"))  # Gray
-        comment_format.setFontItalic(True)
-        self.highlighting_rules.append((QRegExp("<!--[^-]*-->"), comment_format))
-        
-        # XML declarations
-        declaration_format = QTextCharFormat()
-        declaration_format.setForeground(QColor("#800000"))  # Maroon
-        declaration_format.setFontWeight(QFont.Bold)
-        self.highlighting_rules.append((QRegExp("<\\?[^?]*\\?>"), declaration_format))
+        self.value_format = QTextCharFormat()
+        self.value_format.setForeground(QColor("#008000"))  # Green
+        
+        # XML comments and CDATA sections
+        self.comment_format = QTextCharFormat()
+        self.comment_format.setForeground(QColor("#808080"))  # Gray
+        self.comment_format.setFontItalic(True)
+        self.cdata_format = QTextCharFormat()
+        self.cdata_format.setForeground(QColor("#808080"))  # Gray
+        
+        # XML declarations, processing instructions and DTD declarations
+        self.declaration_format = QTextCharFormat()
+        self.declaration_format.setForeground(QColor("#800000"))  # Maroon
+        self.declaration_format.setFontWeight(QFont.Bold)
+        
+        self.construct_formats = {
+            self.STATE_COMMENT: self.comment_format,
+            self.STATE_CDATA: self.cdata_format,
+            self.STATE_DECLARATION: self.declaration_format,
+        }
+        self._wide = None  # Offsets of characters outside the BMP in the current block
     
     def highlightBlock(self, text):
         """Apply syntax highlighting to the given block of text."""
-        for pattern, format in self.highlighting_rules:
-            expression = QRegExp(pattern)
-            index = expression.indexIn(text)
-            while index >= 0:
-                length = expression.matchedLength()
-                self.setFormat(index, length, format)
-                index = expression.indexIn(text, index + length)
+        # Qt offsets count UTF-16 code units, string offsets count characters
+        self._wide = None
+        if not text.isascii() and max(text) > '\uffff':
+            self._wide = [i for i, c in enumerate(text) if c > '\uffff']
+        
+        state = self.previousBlockState()
+        position = 0
+        tag_start = None  # Start of the open tag
+        if state == self.STATE_TAG:
+            tag_start = 0
+        elif state in self.END_MARKERS:
+            position = self._highlight_construct(text, 0, state)
+        
+        length = len(text)
+        markup = self.MARKUP.search
+        tag_part = self.TAG_PART.search
+        parts = []  # Attribute names and values of the open tag
+        while position < length:
+            if tag_start is None:
+                match = markup(text, position)
+                if match is None:
+                    break
+                kind = match.lastindex
+                if kind == self.STATE_TAG:
+                    tag_start = match.start()
+                    position = match.end()
+                else:
+                    position = self._highlight_construct(text, match.start(), kind)
+            else:
+                match = tag_part(text, position)
+                if match is None:
+                    break
+                kind = match.lastindex
+                if kind == self.TAG_END:
+                    position = match.end()
+                    self._highlight_tag(tag_start, position, parts)
+                    tag_start = None
+                    parts = []
+                else:
+                    parts.append(match.span() + (kind,))
+                    position = match.end()
+        
+        if tag_start is not None:
+            self._highlight_tag(tag_start, length, parts)
+            self.setCurrentBlockState(self.STATE_TAG)
+        elif position <= length:
+            self.setCurrentBlockState(self.STATE_NONE)
+    
+    def _highlight_construct(self, text, start, state):
+        """
+        Highlight a comment, CDATA section or declaration starting at start.
+        
+        Returns:
+            int: Offset just past its end, or past the block if it continues
+                 on the next block
+        """
+        end = text.find(self.END_MARKERS[state], start + 1)
+        if end < 0:
+            self._format(start, len(text), self.construct_formats[state])
+            self.setCurrentBlockState(state)
+            return len(text) + 1
+        end += len(self.END_MARKERS[state])
+        self._format(start, end, self.construct_formats[state])
+        return end
+    
+    def _highlight_tag(self, start, end, parts):
+        """Highlight a tag, with its attribute names and values drawn over the tag format."""
+        self._format(start, end, self.tag_format)
+        for part_start, part_end, kind in parts:
+            self._format(part_start, part_end,
+                         self.attribute_format if kind == self.ATTRIBUTE else self.value_format)
+    
+    def _format(self, start, end, format):
+        """Set the format of the characters from start to end."""
+        if self._wide:
+            start += bisect_left(self._wide, start)
+            end += bisect_left(self._wide, end)
+        self.setFormat(start, end - start, format)
 
 
 class XMLEditorWidget(QWidget):
     """Widget for editing XML content."""
     
     # Define signals
-    fileSaved = pyqtSignal(str)  # Signal emitted when file is saved
+    fileSaved = pyqtSignal(str, object)  # Signal emitted when file is saved: file path, edit (see _saved_edit)
+    _findScanned = pyqtSignal(int, object)  # Scan number, TextMatches or None if it failed; emitted from the scan thread
     
     def __init__(self, parent=None):
         super().__init__(parent)
         
         self.current_file = None
         self.is_modified = False
-        self.search_text = ""
-        self.last_search_position = 0
+        self._file_stamp = None  # (modification time, size) of the file as loaded or saved
+        self._edit_tracked = False  # The file holds the text as _encode_text encodes it, so edits map to bytes
+        self._edited = None  # (start, end) of the text changed since the file was loaded or saved
+        self._revision = 0  # Document revision of the last text change
+        self.paged = False  # The file is shown read-only through the paged view
+        self._matches = None  # TextMatches of the find text in Qt positions, None until scanned
+        self._match_index = None  # Index of the match selected last
+        self._find_scan = 0  # Number of the latest find scan; results of older ones are dropped
+        self._find_step = 0  # Direction to move in once the running scan is done (1, -1 or 0)
+        self._find_running = False  # A scan for the current find text has not reported yet
         
         self._setup_ui()
     
@@ -112,6 +278,12 @@ class XMLEditorWidget(QWidget):
         self.find_next_action.triggered.connect(self.find_next)
         toolbar.addAction(self.find_next_action)
         
+        # Find Previous action
+        self.find_previous_action = QAction("Find Previous", self)
+        self.find_previous_action.setShortcut(SHORTCUT_FIND_PREVIOUS)
+        self.find_previous_action.triggered.connect(self.find_previous)
+        toolbar.addAction(self.find_previous_action)
+        
         # Go to Line action
         self.goto_action = QAction("Go to Line", self)
         self.goto_action.setShortcut(SHORTCUT_GO_TO_LINE)
@@ -136,10 +308,62 @@ class XMLEditorWidget(QWidget):
         self.editor.setLineWrapMode(QPlainTextEdit.NoWrap)
         self.editor.textChanged.connect(self._text_changed)
         self.editor.cursorPositionChanged.connect(self._cursor_position_changed)
+        # Connected before the highlighter, so edits are recorded before it reacts to them
+        self.editor.document().contentsChange.connect(self._contents_changed)
+        # Matches are highlighted where the editor shows text
+        self.editor.verticalScrollBar().valueChanged.connect(self._update_find_highlights)
+        self.editor.horizontalScrollBar().valueChanged.connect(self._update_find_highlights)
+        self.editor.viewport().installEventFilter(self)
         layout.addWidget(self.editor)
         
         # Apply syntax highlighting
         self.highlighter = XMLSyntaxHighlighter(self.editor.document())
+        
+        # Read-only view for files too large to edit
+        self.paged_view = PagedFileView(XMLSyntaxHighlighter)
+        self.paged_view.text.cursorPositionChanged.connect(self._cursor_position_changed)
+        self.paged_view.lineIndexBuilt.connect(self._line_index_built)
+        self.paged_view.hide()
+        layout.addWidget(self.paged_view)
+        
+        # Find bar
+        self.find_bar = QWidget()
+        find_layout = QHBoxLayout(self.find_bar)
+        find_layout.setContentsMargins(0, 0, 0, 0)
+        self.find_edit = QLineEdit()
+        self.find_edit.setPlaceholderText("Find")
+        self.find_edit.textChanged.connect(self._find_options_changed)
+        self.find_edit.returnPressed.connect(self.find_next)
+        find_layout.addWidget(self.find_edit)
+        self.find_case_checkbox = QCheckBox("Match case")
+        self.find_case_checkbox.toggled.connect(self._find_options_changed)
+        find_layout.addWidget(self.find_case_checkbox)
+        self.find_regex_checkbox = QCheckBox("Regex")
+        self.find_regex_checkbox.toggled.connect(self._find_options_changed)
+        find_layout.addWidget(self.find_regex_checkbox)
+        previous_button = QPushButton("Previous")
+        previous_button.clicked.connect(self.find_previous)
+        find_layout.addWidget(previous_button)
+        next_button = QPushButton("Next")
+        next_button.clicked.connect(self.find_next)
+        find_layout.addWidget(next_button)
+        self.find_count_label = QLabel("")
+        find_layout.addWidget(self.find_count_label)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.hide_find_bar)
+        find_layout.addWidget(close_button)
+        close_shortcut = QShortcut(QKeySequence(Qt.Key_Escape), self.find_bar)
+        close_shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+        close_shortcut.activated.connect(self.hide_find_bar)
+        self.find_bar.hide()
+        layout.addWidget(self.find_bar)
+        
+        # The document is scanned again once typing pauses
+        self._find_timer = QTimer(self)
+        self._find_timer.setSingleShot(True)
+        self._find_timer.setInterval(EDITOR_FIND_DEBOUNCE_MS)
+        self._find_timer.timeout.connect(self._start_find_scan)
+        self._findScanned.connect(self._find_scanned)
     
     def load_file(self, file_path):
         """Load XML content from file."""
@@ -147,11 +371,26 @@ class XMLEditorWidget(QWidget):
             return False
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
+            if os.path.getsize(file_path) >= EDITOR_PAGED_MIN_MB * 1024 * 1024:
+                return self._load_paged(file_path)
             
+            with open(file_path, 'rb') as file:
+                data = file.read()
+            # Line breaks are read as in text mode
+            content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            
+            # Highlighting would dominate the load time of large documents
+            highlighted = len(content) <= EDITOR_HIGHLIGHT_MAX_MB * 1024 * 1024
+            if highlighted != (self.highlighter.document() is not None):
+                self.highlighter.setDocument(self.editor.document() if highlighted else None)
+            
+            self._set_paged(False)
             self.editor.setPlainText(content)
             self.current_file = file_path
+            self._file_stamp = _file_stamp(file_path)
+            # Edits can be reported as byte ranges only if saving the text unchanged gives the file back
+            self._edit_tracked = _encode_text(self.editor.toPlainText()) == data
+            self._edited = None
             self.file_label.setText(os.path.basename(file_path))
             self.is_modified = False
             self._update_window_title()
@@ -160,11 +399,135 @@ class XMLEditorWidget(QWidget):
             QMessageBox.critical(self, "Error", f"Error loading file: {str(e)}")
             return False
     
+    def _load_paged(self, file_path):
+        """Show a large file read-only, reading only the part on screen."""
+        if not self.paged_view.open(file_path):
+            return False
+        self._set_paged(True)
+        
+        # Release the text of a file loaded before
+        self.editor.clear()
+        self.current_file = file_path
+        self._file_stamp = _file_stamp(file_path)
+        self._edit_tracked = False
+        self._edited = None
+        self.is_modified = False
+        self._update_window_title()
+        self._cursor_position_changed()
+        return True
+    
+    def _set_paged(self, paged):
+        """Switch between the editor and the read-only paged view."""
+        if not paged:
+            self.paged_view.close()
+        self.paged = paged
+        self.editor.setVisible(not paged)
+        self.paged_view.setVisible(paged)
+        for action in (self.save_action, self.save_as_action, self.format_action,
+                       self.find_action, self.find_next_action, self.find_previous_action):
+            action.setEnabled(not paged)
+        if paged:
+            self.hide_find_bar()
+        self._update_goto_action()
+    
+    def _update_goto_action(self):
+        """Offer Go to Line once the line numbers of the shown file are known."""
+        ready = not self.paged or self.paged_view.line_index.is_ready()
+        self.goto_action.setEnabled(ready)
+        self.goto_action.setText("Go to Line" if ready else EDITOR_GOTO_INDEXING)
+    
+    def _line_index_built(self):
+        """Show line numbers and enable Go to Line once the paged file's lines are indexed."""
+        if self.paged:
+            self._update_goto_action()
+            self._cursor_position_changed()
+    
+    def is_showing(self, file_path):
+        """
+        Check whether the editor already shows a file, unedited and unchanged on disk.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            bool: True if the file does not need to be loaded again
+        """
+        if not self.current_file or self.is_modified:
+            return False
+        if os.path.normcase(os.path.abspath(file_path)) != os.path.normcase(os.path.abspath(self.current_file)):
+            return False
+        return self._file_stamp is not None and self._file_stamp == _file_stamp(file_path)
+    
     def navigate_to_element(self, element_info):
         """Navigate to a specific element in the XML document."""
         if not self.current_file:
             return False
-
+        
+        # The paged view reads the element straight from its byte offsets
+        if self.paged:
+            if element_info['offset'] is None:
+                return False
+            self.paged_view.select_range(element_info['offset'],
+                                         element_info['end_offset'] or element_info['offset'])
+            return True
+        
+        # Results carry the location of the element in the file, which is
+        # only trusted while the editor text still matches the file
+        if element_info['line'] is not None and not self.is_modified:
+            cursor = self._element_cursor(element_info)
+            if cursor is not None:
+                self.editor.setTextCursor(cursor)
+                self.editor.centerCursor()
+                return True
+        
+        return self._find_element_tag(element_info)
+    
+    def _element_cursor(self, element_info):
+        """
+        Select an element from its recorded source location.
+        
+        Both ends are found through the document's block structure, so the
+        cost does not depend on the size of the document or the element.
+        
+        Args:
+            element_info: Result record with line, column, end_line and end_column
+            
+        Returns:
+            QTextCursor: Cursor selecting the element, or None if the text at
+                the location is not the element
+        """
+        document = self.editor.document()
+        start_block = document.findBlockByNumber(element_info['line'] - 1)
+        if not start_block.isValid():
+            return None
+        
+        # Columns count characters; document positions count UTF-16 code units
+        text = start_block.text()
+        column = element_info['column'] - 1
+        tag = re.compile(r'<(?:[^\s<>/:]+:)?' + re.escape(element_info['name']) + r'(?=[\s/>]|$)')
+        match = tag.match(text, column)
+        if match is None:
+            return None
+        start = start_block.position() + _utf16_length(text[:column])
+        
+        # Without an end location only the tag name is selected
+        end = start + _utf16_length(match.group())
+        if element_info['end_line']:
+            end_block = document.findBlockByNumber(element_info['end_line'] - 1)
+            end_column = element_info['end_column'] - 1
+            if end_block.isValid():
+                if element_info['end_line'] != element_info['line']:
+                    text = end_block.text()
+                if text[end_column - 1:end_column] == '>':
+                    end = end_block.position() + _utf16_length(text[:end_column])
+        
+        cursor = QTextCursor(document)
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        return cursor
+    
+    def _find_element_tag(self, element_info):
+        """Find an element by searching for its opening tag, for results without a source position."""
         # Find the element in the text by its XPath
         if 'xpath' in element_info:
             # Simple implementation - search for the element's opening tag
@@ -185,36 +548,11 @@ class XMLEditorWidget(QWidget):
             if found:
                 # Select the entire element if possible
                 cursor = self.editor.textCursor()
-                pos = cursor.position()
-                
-                # Try to find the matching closing tag or end of self-closing tag
-                text = self.editor.toPlainText()
-                
-                # Simple heuristic - not perfect but works for most cases
-                # This would ideally use actual XML parsing for precision
-                open_tags = 1
-                start_pos = pos
-                i = pos
-                
-                # Look for matching end tag or self-closing tag
-                while i < len(text) and open_tags > 0:
-                    if text[i:i+2] == "/>":  # Self-closing tag
-                        i += 2
-                        open_tags = 0
-                        break
-                    elif text[i:i+2] == "</":  # Closing tag
-                        open_tags -= 1
-                        i += 2
-                    elif text[i:i+1] == "<" and text[i:i+2] != "</":  # Opening tag
-                        open_tags += 1
-                        i += 1
-                    else:
-                        i += 1
-                
-                if open_tags == 0:
-                    # Found the entire element
-                    cursor.setPosition(start_pos)
-                    cursor.setPosition(i, QTextCursor.KeepAnchor)
+                start = cursor.selectionStart()
+                end = self._element_end(cursor)
+                if end is not None:
+                    cursor.setPosition(start)
+                    cursor.setPosition(end, QTextCursor.KeepAnchor)
                     self.editor.setTextCursor(cursor)
                 
                 # Center the view on the found text
@@ -223,23 +561,139 @@ class XMLEditorWidget(QWidget):
         
         return False
     
+    def _element_end(self, cursor):
+        """
+        Find the end of the element whose start tag a cursor has selected.
+        
+        Tags are counted forward from the cursor with document searches, so
+        only the text up to the end of the element is read. A simple
+        heuristic - not perfect but works for most cases.
+        
+        Returns:
+            int: Document position just past the element, or None if it was not found
+        """
+        document = self.editor.document()
+        markup = QRegularExpression('</|/>|<')
+        open_tags = 1
+        found = cursor
+        while True:
+            found = document.find(markup, found.selectionEnd())
+            if found.isNull():
+                return None
+            token = found.selectedText()
+            if token == '/>':
+                # Self-closing tag
+                open_tags -= 1
+                if open_tags == 0:
+                    return found.selectionEnd()
+            elif token == '</':
+                open_tags -= 1
+                if open_tags == 0:
+                    # Up to the '>' of the end tag
+                    found = document.find('>', found.selectionEnd())
+                    return None if found.isNull() else found.selectionEnd()
+            else:
+                open_tags += 1
+    
     def save_file(self):
         """Save the current file."""
+        if self.paged:
+            return False
         if not self.current_file:
             return self.save_file_as()
         
         try:
-            with open(self.current_file, 'w', encoding='utf-8') as file:
-                file.write(self.editor.toPlainText())
+            text = self.editor.toPlainText()
+            data = _encode_text(text)
+            edit = self._saved_edit(text, len(data))
+            with open(self.current_file, 'wb') as file:
+                file.write(data)
             
+            self._file_stamp = _file_stamp(self.current_file)
+            self._edit_tracked = True
+            self._edited = None
             self.is_modified = False
             self._update_window_title()
-            self.fileSaved.emit(self.current_file)
+            self.fileSaved.emit(self.current_file, edit)
             return True
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error saving file: {str(e)}")
             return False
     
+    def _saved_edit(self, text, size):
+        """
+        Describe what a save changes in the file, so only that is parsed again.
+        
+        Args:
+            text: Text being saved
+            size: Size in bytes of the encoded text
+            
+        Returns:
+            tuple: (base stamp, start, old end, new end): the (modification
+                time, size) of the file as loaded or last saved, and the byte
+                offsets of the changed bytes before and after the save.
+                None if changes to the file are not tracked.
+        """
+        if not self._edit_tracked or self._file_stamp is None:
+            return None
+        if self._edited is None:
+            return self._file_stamp, 0, 0, 0
+        
+        # Positions count UTF-16 code units; bytes are counted from the text around the change
+        units = text.encode('utf-16-le')
+        end = min(self._edited[1], len(units) // 2)
+        start = min(self._edited[0], end)
+        head = len(_encode_text(units[:start * 2].decode('utf-16-le')))
+        tail = len(_encode_text(units[end * 2:].decode('utf-16-le')))
+        old_end = self._file_stamp[1] - tail
+        if old_end < head:
+            return None
+        return self._file_stamp, head, old_end, size - tail
+    
+    def disk_edit(self, file_path):
+        """
+        Describe how a file changed on disk differs from the text shown, so
+        only that is parsed again.
+        
+        Args:
+            file_path: Path to the changed file
+            
+        Returns:
+            tuple: (base stamp, start, old end, new end) like the edit sent
+                with fileSaved, or None if the editor does not show the
+                file's previous version unedited
+        """
+        if (self.paged or not self._edit_tracked or self._file_stamp is None
+                or not self.current_file or self.is_modified):
+            return None
+        if os.path.normcase(os.path.abspath(file_path)) != os.path.normcase(os.path.abspath(self.current_file)):
+            return None
+        try:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        old = _encode_text(self.editor.toPlainText())
+        if len(old) != self._file_stamp[1]:
+            return None
+        return (self._file_stamp,) + _changed_range(old, data)
+    
+    def reload_file(self):
+        """Load the current file again after it changed on disk, keeping the cursor and scroll position."""
+        if not self.current_file:
+            return False
+        if self.paged:
+            return self.load_file(self.current_file)
+        position = self.editor.textCursor().position()
+        scroll = self.editor.verticalScrollBar().value()
+        if not self.load_file(self.current_file):
+            return False
+        cursor = self.editor.textCursor()
+        cursor.setPosition(min(position, self.editor.document().characterCount() - 1))
+        self.editor.setTextCursor(cursor)
+        self.editor.verticalScrollBar().setValue(scroll)
+        return True
+    
     def save_file_as(self):
         """Save the current file with a new name."""
         file_path, _ = QFileDialog.getSaveFileName(
@@ -258,16 +712,14 @@ class XMLEditorWidget(QWidget):
     
     def format_xml(self):
         """Format the XML content with proper indentation."""
+        if self.paged:
+            return
         try:
             # Get the current text
             xml_text = self.editor.toPlainText()
             
-            # Parse and format the XML
-            dom = minidom.parseString(xml_text)
-            pretty_xml = dom.toprettyxml(indent="  ")
-            
-            # Remove extra blank lines (common issue with minidom)
-            pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
+            # Indent the XML from parser events, without building a DOM
+            pretty_xml = format_xml_text(xml_text, indent=EDITOR_FORMAT_INDENT)
             
             # Set the formatted text
             cursor_position = self.editor.textCursor().position()
@@ -282,62 +734,193 @@ class XMLEditorWidget(QWidget):
             QMessageBox.warning(self, "Format Error", f"Could not format XML: {str(e)}")
     
     def show_find_dialog(self):
-        """Show dialog to find text in the document."""
-        text, ok = QInputDialog.getText(
-            self, 
-            "Find Text", 
-            "Enter text to find:",
-            text=self.search_text
-        )
-        
-        if ok and text:
-            self.search_text = text
-            self.last_search_position = 0  # Reset search position
-            self.find_next()
+        """Show the find bar, starting from the selected text if any."""
+        if self.paged:
+            return
+        selected = self.editor.textCursor().selectedText()
+        # A selection spanning lines holds paragraph separators, not a find text
+        if selected and '\u2029' not in selected:
+            self.find_edit.setText(selected)
+        self.find_bar.show()
+        self.find_edit.setFocus()
+        self.find_edit.selectAll()
+    
+    def hide_find_bar(self):
+        """Hide the find bar and its highlights."""
+        self.find_bar.hide()
+        self._find_timer.stop()
+        self._find_scan += 1
+        self._find_running = False
+        self._matches = None
+        self._find_step = 0
+        self.editor.setExtraSelections([])
+        if not self.paged:
+            self.editor.setFocus()
     
     def find_next(self):
-        """Find the next occurrence of the search text."""
-        if not self.search_text:
+        """Select the next match of the find text, wrapping to the first."""
+        self._find(1)
+    
+    def find_previous(self):
+        """Select the previous match of the find text, wrapping to the last."""
+        self._find(-1)
+    
+    def _find(self, direction):
+        """Move to a match, once the document has been scanned for the find text."""
+        if self.paged:
+            return
+        if not self.find_edit.text():
             self.show_find_dialog()
             return
+        if self._matches is not None:
+            self._select_match(direction)
+            return
+        # Move once the scan is done
+        self._find_step = direction
+        if self._find_running and not self._find_timer.isActive():
+            return
+        # No scan is due, e.g. after an invalid pattern: scan now, which reports the pattern again
+        self._find_timer.stop()
+        self._start_find_scan()
+    
+    def _find_options_changed(self):
+        """Scan for the find text again once the user pauses."""
+        self._matches = None
+        self._find_timer.start()
+    
+    def _start_find_scan(self):
+        """Scan the document for every match of the find text on a background thread."""
+        self._find_scan += 1
+        scan = self._find_scan
+        self._find_running = False
+        self._matches = None
+        self.find_bar.show()
+        
+        text = self.find_edit.text()
+        if not text:
+            self._find_step = 0
+            self.find_count_label.setText("")
+            self.editor.setExtraSelections([])
+            return
+        try:
+            pattern = compile_pattern(text, regex=self.find_regex_checkbox.isChecked(),
+                                      case_sensitive=self.find_case_checkbox.isChecked())
+        except re.error:
+            self._find_step = 0
+            self.find_count_label.setText(EDITOR_FIND_INVALID)
+            self.editor.setExtraSelections([])
+            return
         
-        # Start from current position or last search position
+        document_text = self.editor.toPlainText()
+        self.find_count_label.setText(EDITOR_FIND_SEARCHING)
+        self._find_running = True
+        
+        def task():
+            try:
+                matches = TextMatches.scan(pattern, document_text, is_cancelled=lambda: scan != self._find_scan)
+                if matches is None:
+                    return
+                matches.starts = _utf16_offsets(document_text, matches.starts)
+                matches.ends = _utf16_offsets(document_text, matches.ends)
+            except Exception:
+                matches = None
+            self._findScanned.emit(scan, matches)
+        
+        threading.Thread(target=task, daemon=True).start()
+    
+    def _find_scanned(self, scan, matches):
+        """Take the matches of a finished scan, unless a newer one was started."""
+        if scan != self._find_scan:
+            return
+        self._find_running = False
+        if matches is None:
+            # The scan failed; the next Find Next scans again
+            self._find_step = 0
+            self.find_count_label.setText(EDITOR_FIND_FAILED)
+            return
+        self._matches = matches
+        self._match_index = None
+        count = len(matches)
+        plural = "matches" if count != 1 else "match"
+        self.find_count_label.setText(EDITOR_FIND_COUNT.format(count=count, plural=plural) if count
+                                      else EDITOR_FIND_NONE)
+        self._update_find_highlights()
+        if self._find_step:
+            direction, self._find_step = self._find_step, 0
+            self._select_match(direction)
+    
+    def _select_match(self, direction):
+        """Select the match after (direction 1) or before (direction -1) the cursor."""
         cursor = self.editor.textCursor()
-        current_pos = cursor.position()
-        
-        # If we're at the same position as last time, move forward to avoid finding the same text
-        if current_pos == self.last_search_position and current_pos < len(self.editor.toPlainText()):
-            cursor.setPosition(current_pos + 1)
-            self.editor.setTextCursor(cursor)
+        if direction > 0:
+            if cursor.hasSelection():
+                index = self._matches.after(cursor.selectionStart())
+            else:
+                index = self._matches.after(cursor.position(), inclusive=True)
+        else:
+            index = self._matches.before(cursor.selectionStart())
+        if index is None:
+            self.find_count_label.setText(EDITOR_FIND_NONE)
+            return
         
-        # Search for the text
-        found = self.editor.find(self.search_text)
+        cursor.setPosition(self._matches.starts[index])
+        cursor.setPosition(self._matches.ends[index], QTextCursor.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        self.editor.centerCursor()
+        self._match_index = index
+        self.find_count_label.setText(EDITOR_FIND_POSITION.format(index=index + 1, count=len(self._matches)))
+    
+    def _update_find_highlights(self):
+        """Highlight the matches in the part of the document on screen."""
+        if self._matches is None or self.paged or not self.find_bar.isVisible():
+            self.editor.setExtraSelections([])
+            return
         
-        if found:
-            self.last_search_position = self.editor.textCursor().position()
-            self.editor.centerCursor()
-        else:
-            # If not found, wrap around to the beginning
-            cursor.setPosition(0)
-            self.editor.setTextCursor(cursor)
-            
-            found = self.editor.find(self.search_text)
-            if found:
-                self.last_search_position = self.editor.textCursor().position()
-                self.editor.centerCursor()
-                QMessageBox.information(self, "Find", "Search wrapped to beginning of document.")
-            else:
-                QMessageBox.information(self, "Find", f"Text '{self.search_text}' not found.")
+        # Positions of the visible blocks
+        block = self.editor.firstVisibleBlock()
+        start = block.position()
+        end = start
+        offset = self.editor.contentOffset()
+        height = self.editor.viewport().height()
+        while block.isValid() and self.editor.blockBoundingGeometry(block).translated(offset).top() <= height:
+            end = block.position() + block.length()
+            block = block.next()
+        
+        highlight = QTextCharFormat()
+        highlight.setBackground(QColor("#FFFF66"))  # Yellow
+        selections = []
+        indexes = self._matches.overlapping(start, end)
+        for index in indexes[:EDITOR_FIND_MAX_HIGHLIGHTS]:
+            selection = QTextEdit.ExtraSelection()
+            selection.cursor = QTextCursor(self.editor.document())
+            selection.cursor.setPosition(self._matches.starts[index])
+            selection.cursor.setPosition(self._matches.ends[index], QTextCursor.KeepAnchor)
+            selection.format = highlight
+            selections.append(selection)
+        self.editor.setExtraSelections(selections)
+    
+    def eventFilter(self, watched, event):
+        # More of the document is on screen after the editor grows
+        if watched is self.editor.viewport() and event.type() == QEvent.Resize:
+            self._update_find_highlights()
+        return super().eventFilter(watched, event)
     
     def show_goto_dialog(self):
         """Show dialog to go to a specific line."""
+        if self.paged:
+            # Line numbers are not known until the line index is built, see _line_index_built
+            if not self.paged_view.line_index.is_ready():
+                return
+            line_count = self.paged_view.line_index.line_count
+        else:
+            line_count = self.editor.document().blockCount()
         line, ok = QInputDialog.getInt(
             self,
             "Go to Line",
             "Enter line number:",
             1,
             1,
-            self.editor.document().blockCount()
+            line_count
         )
         
         if ok:
@@ -345,6 +928,10 @@ class XMLEditorWidget(QWidget):
     
     def _goto_line(self, line_number):
         """Go to the specified line number."""
+        if self.paged:
+            self.paged_view.goto_line(line_number)
+            return
+        
         # Ensure line number is within bounds
         line_number = max(1, min(line_number, self.editor.document().blockCount()))
         
@@ -359,8 +946,35 @@ class XMLEditorWidget(QWidget):
             self.is_modified = True
             self._update_window_title()
     
+    def _contents_changed(self, position, removed, added):
+        """Widen the span of changed text to cover a change to the document."""
+        revision = self.editor.document().revision()
+        if removed == added and revision == self._revision:
+            # Only formatting changed
+            return
+        self._revision = revision
+        if self.find_bar.isVisible() and self.find_edit.text():
+            # The matches are out of date until the text is scanned again
+            self._find_options_changed()
+        end = position + added
+        if self._edited is None:
+            self._edited = (position, end)
+            return
+        start, edited_end = self._edited
+        # The end of the span moves with the text after the change
+        if edited_end > position + removed:
+            edited_end += added - removed
+        elif edited_end > position:
+            edited_end = end
+        self._edited = (min(start, position), max(edited_end, end))
+    
     def _cursor_position_changed(self):
         """Update line and column information when cursor position changes."""
+        if self.paged:
+            # Line numbers are known once the file's line index is built
+            line, column = self.paged_view.cursor_location()
+            self.line_col_label.setText(f"Line: {line or '?'}, Col: {column}")
+            return
         cursor = self.editor.textCursor()
         line = cursor.blockNumber() + 1
         column = cursor.columnNumber() + 1
@@ -371,7 +985,8 @@ class XMLEditorWidget(QWidget):
         if self.current_file:
             filename = os.path.basename(self.current_file)
             modified_indicator = EDITOR_MODIFIED_INDICATOR if self.is_modified else ""
-            self.file_label.setText(f"{filename}{modified_indicator}")
+            read_only_indicator = EDITOR_READ_ONLY_INDICATOR if self.paged else ""
+            self.file_label.setText(f"{filename}{modified_indicator}{read_only_indicator}")
     
     def close_editor(self):
         """Handle editor closing with unsaved changes."""
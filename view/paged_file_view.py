@@ -0,0 +1,299 @@
+import os
+from bisect import bisect_right
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QFont, QTextCursor
+from PyQt5.QtWidgets import QHBoxLayout, QPlainTextEdit, QScrollBar, QWidget
+
+from model.line_index import LINE_BREAK, LineIndex
+from DefineConst import *
+
+
+class PagedFileView(QWidget):
+    """
+    Read-only view of a file too large to load into an editor.
+
+    Only a window of the file around what is shown is read and decoded;
+    scrolling near either end of the window moves it. The scroll bar spans
+    the whole file by byte offset, and a sparse line index built in the
+    background provides line numbers.
+    """
+
+    lineIndexBuilt = pyqtSignal()  # Emitted from the index thread once line numbers are known
+
+    def __init__(self, highlighter_class=None, parent=None):
+        """
+        Args:
+            highlighter_class: Optional QSyntaxHighlighter subclass applied to the window
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.file_path = None
+        self.file_size = 0
+        self.line_index = None
+        self.window_bytes = EDITOR_PAGE_KB * 1024
+        self._file_number = 0       # Counts opened files; the line index of an earlier one stops building
+
+        self._shift = 0             # Scroll bar value = byte offset >> shift, to fit an int
+        self._window_start = 0      # Byte offset of the window in the file
+        self._window_data = b''     # Bytes of the window
+        self._line_starts = [0]     # Block -> offset of its line in the window
+        self._window_line = None    # Line number of the window's first line, once known
+        self._updating = False
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        self.text = QPlainTextEdit()
+        self.text.setFont(QFont("Courier New", 10))
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text.setReadOnly(True)
+        self.text.setTextInteractionFlags(Qt.TextSelectableByMouse | Qt.TextSelectableByKeyboard)
+        self.text.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.text.verticalScrollBar().valueChanged.connect(self._window_scrolled)
+        layout.addWidget(self.text)
+
+        self.scroll_bar = QScrollBar(Qt.Vertical)
+        self.scroll_bar.valueChanged.connect(self._file_scrolled)
+        layout.addWidget(self.scroll_bar)
+
+        self.highlighter = highlighter_class(self.text.document()) if highlighter_class else None
+
+    def open(self, file_path):
+        """
+        Show a file from its start.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            bool: True if the file could be read
+        """
+        try:
+            self.file_size = os.path.getsize(file_path)
+        except OSError:
+            return False
+        self.file_path = file_path
+        self._file_number += 1
+        file_number = self._file_number
+        self.line_index = LineIndex(file_path)
+        self.line_index.build_in_background(is_cancelled=lambda: self._file_number != file_number,
+                                            built=self.lineIndexBuilt.emit)
+
+        self._shift = max(self.file_size.bit_length() - 30, 0)
+        self._updating = True
+        self.scroll_bar.setRange(0, self.file_size >> self._shift)
+        self.scroll_bar.setPageStep(max((self.window_bytes // 8) >> self._shift, 1))
+        self.scroll_bar.setValue(0)
+        self._updating = False
+        self._load_window(0, 0)
+        return True
+
+    def close(self):
+        """Release the shown file."""
+        self._file_number += 1
+        self.file_path = None
+        self.file_size = 0
+        self.line_index = None
+        self._window_data = b''
+        self._line_starts = [0]
+        self.text.clear()
+
+    def goto_line(self, line):
+        """
+        Show a line at the top of the view and put the cursor on it.
+
+        Returns:
+            bool: False if no file is shown or its line index is not built yet
+        """
+        if self.file_path is None or not self.line_index.is_ready():
+            return False
+        offset = self.line_index.line_offset(line)
+        self.select_range(offset, offset)
+        return True
+
+    def select_range(self, start, end):
+        """
+        Show and select the bytes from start to end, e.g. an element.
+
+        A range longer than the window is selected up to the window's end.
+
+        Args:
+            start: Byte offset of the first selected byte
+            end: Byte offset just past the last selected byte
+        """
+        if self.file_path is None:
+            return
+        if not self._holds(start, min(end, start + self.window_bytes // 2)):
+            self._load_window(start, self.window_bytes // 4)
+
+        cursor = QTextCursor(self.text.document())
+        cursor.setPosition(self._position(start))
+        cursor.setPosition(self._position(end), QTextCursor.KeepAnchor)
+        self._updating = True
+        self.text.setTextCursor(cursor)
+        self.text.centerCursor()
+        self._updating = False
+        self._sync_scroll_bar()
+
+    def cursor_location(self):
+        """
+        Return where the cursor is.
+
+        Returns:
+            (int, int): 1-based line (None until the line index is built) and column
+        """
+        cursor = self.text.textCursor()
+        line = None
+        if self.line_index is not None and self.line_index.is_ready():
+            if self._window_line is None:
+                self._window_line = self.line_index.line_of_offset(self._window_start)
+            line = self._window_line + cursor.blockNumber()
+        return line, cursor.positionInBlock() + 1
+
+    def _load_window(self, offset, before):
+        """
+        Read the window that holds offset, starting about before bytes ahead of it.
+
+        The window is cut at line breaks where a line break is near, so its
+        blocks are whole lines of the file.
+        """
+        start = max(offset - before, 0)
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(self.window_bytes)
+
+        # Start at the first line in the window, unless that skips the offset
+        if start > 0:
+            match = LINE_BREAK.search(data, 0, max(offset - start, 0))
+            if match is not None:
+                data = data[match.end():]
+                start += match.end()
+            else:
+                skip = _char_start(data)
+                data = data[skip:]
+                start += skip
+        # End after the last whole line, unless that cuts the offset off
+        if start + len(data) < self.file_size:
+            # A CR at the very end may be the first half of a CRLF
+            body = data[:-1] if data.endswith(b'\r') else data
+            cut = max(body.rfind(b'\n'), body.rfind(b'\r')) + 1
+            if cut > offset - start:
+                data = data[:cut]
+            else:
+                data = data[:_char_end(body)]
+
+        self._window_start = start
+        self._window_data = data
+        self._window_line = None
+        self._line_starts = [0] + [match.end() for match in LINE_BREAK.finditer(data)]
+        lines = [data[line_start:line_end].decode('utf-8', 'replace')
+                 for line_start, line_end in zip(self._line_starts, self._line_starts[1:] + [len(data)])]
+        # Line breaks themselves are not shown
+        lines = [line.rstrip('\r\n') for line in lines]
+        self._updating = True
+        self.text.setPlainText('\n'.join(lines))
+        self._updating = False
+
+    def _holds(self, start, end):
+        """Check if the window holds start to end, away from its ends that are not the file's."""
+        margin = self.window_bytes // 8
+        window_end = self._window_start + len(self._window_data)
+        low = self._window_start + (margin if self._window_start > 0 else 0)
+        high = window_end - (margin if window_end < self.file_size else 0)
+        return low <= start and end <= high
+
+    def _position(self, offset):
+        """Convert a byte offset in the window to a document position."""
+        relative = min(max(offset - self._window_start, 0), len(self._window_data))
+        block_number = bisect_right(self._line_starts, relative) - 1
+        line_start = self._line_starts[block_number]
+        prefix = self._window_data[line_start:relative].decode('utf-8', 'replace').rstrip('\r\n')
+        block = self.text.document().findBlockByNumber(block_number)
+        return block.position() + min(len(prefix.encode('utf-16-le')) // 2, block.length() - 1)
+
+    def _top_offset(self):
+        """Byte offset in the file of the first visible line."""
+        return self._window_start + self._line_starts[self.text.firstVisibleBlock().blockNumber()]
+
+    def _scroll_to(self, offset):
+        """Scroll the window so the line holding offset is the first visible one."""
+        relative = offset - self._window_start
+        self._updating = True
+        self.text.verticalScrollBar().setValue(bisect_right(self._line_starts, relative) - 1)
+        self._updating = False
+
+    def _sync_scroll_bar(self):
+        self._updating = True
+        self.scroll_bar.setValue(self._top_offset() >> self._shift)
+        self._updating = False
+
+    def _window_scrolled(self, value):
+        """Move the window when the view comes near one of its ends."""
+        if self._updating or self.file_path is None:
+            return
+        top = self.text.firstVisibleBlock().blockNumber()
+        visible = self.text.viewport().height() // max(self.text.fontMetrics().lineSpacing(), 1)
+        bottom = min(top + visible, len(self._line_starts) - 1)
+        margin = self.window_bytes // 8
+        window_end = self._window_start + len(self._window_data)
+        near_start = self._window_start > 0 and self._line_starts[top] < margin
+        near_end = (window_end < self.file_size
+                    and len(self._window_data) - self._line_starts[bottom] < margin)
+        if near_start or near_end:
+            top_offset = self._top_offset()
+            cursor = self.text.textCursor()
+            anchor = self._offset(cursor.anchor())
+            position = self._offset(cursor.position())
+            self._load_window(top_offset, self.window_bytes // 2)
+            self._restore_cursor(anchor, position)
+            self._scroll_to(top_offset)
+        self._sync_scroll_bar()
+
+    def _file_scrolled(self, value):
+        """Show the part of the file the scroll bar was moved to."""
+        if self._updating or self.file_path is None:
+            return
+        offset = min(value << self._shift, self.file_size)
+        if not self._holds(offset, min(offset + self.window_bytes // 4, self.file_size)):
+            self._load_window(offset, self.window_bytes // 2)
+        self._scroll_to(offset)
+
+    def _offset(self, position):
+        """Convert a document position to a byte offset in the file."""
+        block = self.text.document().findBlock(position)
+        units = position - block.position()
+        prefix = block.text().encode('utf-16-le')[:units * 2].decode('utf-16-le', 'replace')
+        return self._window_start + self._line_starts[block.blockNumber()] + len(prefix.encode('utf-8'))
+
+    def _restore_cursor(self, anchor, position):
+        """Put the cursor back at byte offsets, where they are in the new window."""
+        window_end = self._window_start + len(self._window_data)
+        if not self._window_start <= position <= window_end:
+            return
+        cursor = QTextCursor(self.text.document())
+        cursor.setPosition(self._position(min(max(anchor, self._window_start), window_end)))
+        cursor.setPosition(self._position(position), QTextCursor.KeepAnchor)
+        self._updating = True
+        self.text.setTextCursor(cursor)
+        self._updating = False
+
+
+def _char_start(data):
+    """Number of UTF-8 continuation bytes at the start of data, which belong to an earlier character."""
+    skip = 0
+    while skip < len(data) and skip < 3 and 0x80 <= data[skip] < 0xC0:
+        skip += 1
+    return skip
+
+
+def _char_end(data):
+    """Length of data without a UTF-8 character cut off at its end."""
+    lead = len(data) - 1
+    while lead >= 0 and lead > len(data) - 4 and 0x80 <= data[lead] < 0xC0:
+        lead -= 1
+    if lead < 0 or data[lead] < 0xC0:
+        return len(data)
+    size = 2 if data[lead] < 0xE0 else 3 if data[lead] < 0xF0 else 4
+    return lead if len(data) - lead < size else len(data)
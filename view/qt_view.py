@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QFileDialog, QTabWidget,
-                             QTableWidget, QTableWidgetItem, QHeaderView,
+                             QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
                              QStatusBar, QMessageBox, QMenu, QAction, QApplication,
                              QAbstractItemView, QSplitter, QMainWindow, QCheckBox)
 from PyQt5.QtCore import Qt, QSettings
@@ -10,6 +10,7 @@ from DefineConst import *
 from controller.xml_controller import XMLController
 from model.history_model import HistoryModel
 from view.editor_widget import XMLEditorWidget
+from view.results_table_model import ResultsTableModel
 
 class XMLExplorerView(QMainWindow):
     """Main view class for the XML Explorer application."""
@@ -19,8 +20,21 @@ class XMLExplorerView(QMainWindow):
         self.controller = XMLController(controller)
         self.history_model = HistoryModel()
         self.controller.set_view(self)
-        self.results_data = {}  # Store references to result elements
         self.history_data = {}  # Store references to history items
+        self._pending_load = None  # (file path, callback run once it has loaded)
+        self._current_search_id = None  # Only results of the latest search are shown
+        self._shown_search_id = None  # Search whose results are in the table
+        self._search_ignore_errors = False
+        self._directory_search = None  # (search id, directory) of the latest folder search
+        
+        # Loading and searching run on the controller's worker thread
+        self.controller.loadProgress.connect(self.update_load_progress)
+        self.controller.loadFinished.connect(self._on_load_finished)
+        self.controller.searchBatch.connect(self._on_search_batch)
+        self.controller.searchFinished.connect(self._on_search_finished)
+        self.controller.directoryProgress.connect(self._on_directory_progress)
+        self.controller.directorySummary.connect(self._on_directory_summary)
+        self.controller.fileChanged.connect(self._handle_file_changed)
         self._setup_ui()
     
     def _setup_ui(self):
@@ -44,6 +58,16 @@ class XMLExplorerView(QMainWindow):
         self.browse_button = QPushButton(BUTTON_BROWSE)
         self.browse_button.clicked.connect(self._browse_file)
         file_layout.addWidget(self.browse_button)
+        
+        # Folder search: the same criteria over every matching file of a folder
+        file_layout.addWidget(QLabel(LABEL_FILE_PATTERN))
+        self.file_pattern_edit = QLineEdit(DIRECTORY_SEARCH_DEFAULT_GLOB)
+        self.file_pattern_edit.setToolTip("Files searched by 'Search Folder'; use '**/*.xml' to include subfolders")
+        self.file_pattern_edit.setMaximumWidth(120)
+        file_layout.addWidget(self.file_pattern_edit)
+        self.search_folder_button = QPushButton(BUTTON_SEARCH_FOLDER)
+        self.search_folder_button.clicked.connect(self._search_directory)
+        file_layout.addWidget(self.search_folder_button)
         main_layout.addLayout(file_layout)
         
         # Search
@@ -102,13 +126,12 @@ class XMLExplorerView(QMainWindow):
         self._results_widget = QWidget()
         results_layout = QVBoxLayout(self._results_widget)
         
-        self.results_table = QTableWidget()
+        # Cell text is produced by the model on demand, only for visible rows
+        self.results_model = ResultsTableModel(self)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
         self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.results_table.setColumnCount(len(RESULTS_COLUMNS))
-        self.results_table.setHorizontalHeaderLabels(RESULTS_COLUMNS)
-        self.results_table.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.results_table.customContextMenuRequested.connect(self._show_results_context_menu)
-        self.results_table.itemDoubleClicked.connect(self._handle_result_double_click)
+        self.results_table.doubleClicked.connect(self._handle_result_double_click)
 
         # Set column stretching
         header = self.results_table.horizontalHeader()
@@ -157,6 +180,21 @@ class XMLExplorerView(QMainWindow):
 
         self.tab_widget.addTab(self._history_widget, TAB_HISTORY)
         
+        # Files tab: match count per file of the last folder search
+        self._files_widget = QWidget()
+        files_layout = QVBoxLayout(self._files_widget)
+        self.files_table = QTableWidget()
+        self.files_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.files_table.setColumnCount(len(FILES_COLUMNS))
+        self.files_table.setHorizontalHeaderLabels(FILES_COLUMNS)
+        self.files_table.setSortingEnabled(True)
+        header = self.files_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)             # File
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)    # Matches
+        header.setSectionResizeMode(2, QHeaderView.Interactive)         # Error
+        files_layout.addWidget(self.files_table)
+        self.tab_widget.addTab(self._files_widget, TAB_FILES)
+        
         # Set column stretching
         header = self.history_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)    # Date & Time
@@ -202,6 +240,12 @@ class XMLExplorerView(QMainWindow):
         main_layout.addWidget(self.status_bar)
         self.status_bar.showMessage(STATUS_READY)
         
+        # Cancel button shown while a file is loading
+        self.cancel_load_button = QPushButton(BUTTON_CANCEL_LOAD)
+        self.cancel_load_button.clicked.connect(self.controller.cancel_load)
+        self.cancel_load_button.hide()
+        self.status_bar.addPermanentWidget(self.cancel_load_button)
+        
         # View menu for layout options
         self.view_menu = self.menuBar().addMenu("View Menu")
         
@@ -229,7 +273,7 @@ class XMLExplorerView(QMainWindow):
             'name_flag': 1 if self.validation_checkbox[0].isChecked() else 0,
             'att_flag': 1 if self.validation_checkbox[1].isChecked() else 0,
             'value_flag': 1 if self.validation_checkbox[2].isChecked() else 0,
-            'result_count': self.results_table.rowCount()
+            'result_count': self.results_model.rowCount()
         }
         self.history_model.add_entry(entry)
     def _on_key_pressed(self):
@@ -288,23 +332,26 @@ class XMLExplorerView(QMainWindow):
                 if reply == QMessageBox.No:
                     return
                     
-            success, error = self.controller.load_xml_file(current_file)
-            if success:
+            def on_loaded():
                 self.file_path_label.setText(os.path.basename(current_file))
                 self.status_bar.showMessage(STATUS_FILE_LOADED.format(file=os.path.basename(current_file)))
                 
-                # Also load the file in the editor
-                if self.editor_widget.load_file(current_file):
-                    self.status_bar.showMessage("Editor content refreshed.")
-                else:
+                # Also load the file in the editor; large files open read-only
+                if not self.editor_widget.load_file(current_file):
                     self.show_error("Failed to refresh editor content.")
+                elif self.controller.is_streaming():
+                    self.status_bar.showMessage(STATUS_STREAM_MODE.format(file=os.path.basename(current_file)))
+                elif self.controller.is_low_memory():
+                    self.status_bar.showMessage(STATUS_LOW_MEMORY_MODE.format(file=os.path.basename(current_file)))
+                else:
+                    self.status_bar.showMessage("Editor content refreshed.")
 
                 self.tag_edit.setFocus()
 
                 # Show all tag
                 self._search_tag()
-            else:
-                self.show_error(error)
+            
+            self._load_file(current_file, on_loaded)
         else:
             self.status_bar.showMessage("No file is currently loaded.")
 
@@ -329,16 +376,6 @@ class XMLExplorerView(QMainWindow):
         self.view_menu.setTitle(SPLIT_OPTION_RESULT + f" ({2*width//3}/{width//3})")
         self.status_bar.showMessage("Expanded results panel.")
 
-    def _handle_file_saved(self, file_path):
-        """Handle file saved event from the editor."""
-        # Reload the XML file in the model if it's the currently loaded file
-        if file_path == self.controller.get_current_file_path():
-            success, error = self.controller.reload_xml_file()
-            if success:
-                self.status_bar.showMessage("XML file saved and reloaded successfully.")
-            else:
-                self.show_error(f"Error reloading XML file: {error}")
-
     def save_state(self):
         """Save application state to settings."""
         # Save the splitter sizes
@@ -387,21 +424,51 @@ class XMLExplorerView(QMainWindow):
                 event.ignore()  # Cancel closing
                 return
         
+        # Stop any work still running on the worker thread
+        self.controller.cancel_load()
+        self.controller.cancel_search()
+        
          # Save application state
         self.save_state()
 
         # Proceed with normal closing
         event.accept()
 
-    def _handle_file_saved(self, file_path):
+    def _handle_file_saved(self, file_path, edit):
         """Handle file saved event from the editor."""
-        # Reload the XML file in the model if it's the currently loaded file
+        # Update the model if it's the currently loaded file; only the edited element is parsed again
         if file_path == self.controller.get_current_file_path():
-            success, error = self.controller.reload_xml_file()
-            if success:
+            def on_updated():
                 self.status_bar.showMessage(EDITOR_STATUS_SAVED)
+                # Rows and locations of the shown results may have moved
+                self._search_tag(flag_ignore_error=True)
+            
+            self._pending_load = (file_path, on_updated)
+            self.controller.start_update(file_path, edit)
+
+    def _handle_file_changed(self, file_path):
+        """Load the current file again in the background after another program changed it."""
+        file_name = os.path.basename(file_path)
+        if not os.path.exists(file_path):
+            self.status_bar.showMessage(STATUS_FILE_REMOVED.format(file=file_name))
+            return
+        
+        # While the editor shows the previous version unedited, only what changed is parsed again
+        edit = self.editor_widget.disk_edit(file_path)
+        
+        def on_reloaded():
+            if self.editor_widget.current_file != file_path:
+                self.status_bar.showMessage(STATUS_FILE_CHANGED.format(file=file_name))
+            elif self.editor_widget.is_modified:
+                self.status_bar.showMessage(STATUS_FILE_CHANGED_UNSAVED.format(file=file_name))
             else:
-                self.show_error(f"{EDITOR_STATUS_ERROR.format(message=error)}")
+                self.editor_widget.reload_file()
+                self.status_bar.showMessage(STATUS_FILE_CHANGED.format(file=file_name))
+            # Shown results may belong to the previous version
+            self._search_tag(flag_ignore_error=True)
+        
+        self._pending_load = (file_path, on_reloaded)
+        self.controller.start_update(file_path, edit)
 
     def _browse_file(self):
         """Open file dialog to select an XML file."""
@@ -425,30 +492,65 @@ class XMLExplorerView(QMainWindow):
                 if reply == QMessageBox.No:
                     return
             self.file_path_edit.setText(file_path)
-            success, error = self.controller.load_xml_file(file_path)
             
-            if success:
+            def on_loaded():
                 self.file_path_label.setText(os.path.basename(file_path))
                 self.status_bar.showMessage(STATUS_FILE_LOADED.format(file=os.path.basename(file_path)))
                 
-                # Also load the file in the editor
-                self.editor_widget.load_file(file_path)
-                self.editor_widget.format_xml()
-                self.editor_widget.save_file()
+                if self.controller.is_streaming():
+                    # Searches stream through the file; the editor shows it read-only
+                    self.status_bar.showMessage(STATUS_STREAM_MODE.format(file=os.path.basename(file_path)))
+                    self.editor_widget.load_file(file_path)
+                elif self.controller.is_low_memory():
+                    # Values are read from the file; the editor shows it read-only
+                    self.status_bar.showMessage(STATUS_LOW_MEMORY_MODE.format(file=os.path.basename(file_path)))
+                    self.editor_widget.load_file(file_path)
+                else:
+                    # Also load the file in the editor
+                    self.editor_widget.load_file(file_path)
+                    if (EDITOR_FORMAT_ON_OPEN
+                            and os.path.getsize(file_path) <= EDITOR_FORMAT_ON_OPEN_MAX_MB * 1024 * 1024):
+                        # Only the editor's copy is formatted; saving it is up to the user
+                        self.editor_widget.format_xml()
 
                 self.tag_edit.setFocus()
 
                 # Show all tag
                 self._search_tag()
-            else:
-                self.show_error(error)
+            
+            self._load_file(file_path, on_loaded)
+    
+    def _load_file(self, file_path, on_loaded):
+        """
+        Load an XML file on the worker thread.
+        
+        Args:
+            file_path: Path to the XML file
+            on_loaded: Callable run on the GUI thread once the file has loaded
+        """
+        self._pending_load = (file_path, on_loaded)
+        self.controller.start_load(file_path)
+    
+    def _on_load_finished(self, file_path, success, error):
+        """Handle the end of a file load started by _load_file."""
+        self.end_load_progress()
+        if self._pending_load is None or self._pending_load[0] != file_path:
+            return
+        _, on_loaded = self._pending_load
+        self._pending_load = None
+        
+        if success:
+            on_loaded()
+        elif error == ERROR_LOAD_CANCELLED:
+            self.status_bar.showMessage(error)
+        else:
+            self.show_error(error)
     
     def _text_changed(self):
-        """"""
-        print(self.tag_edit.text())
-        self._search_tag()
+        """Search as the user types."""
+        self._search_tag(type_ahead=True)
 
-    def _search_tag(self, flag_ignore_error=False):
+    def _search_tag(self, flag_ignore_error=False, type_ahead=False):
         """Search for elements with the specified tag name or all elements if empty."""
         # self.tag_edit.setText(self.search_layout.item(0, 0).text())
         tag_name = self.tag_edit.text().strip()
@@ -464,24 +566,116 @@ class XMLExplorerView(QMainWindow):
         name_tag_checkbox = self.validation_checkbox[0].isChecked()
         att_tag_checkbox = self.validation_checkbox[1].isChecked()
         value_tag_checkbox = self.validation_checkbox[2].isChecked()
-        success, results, error = self.controller.search_tag(tag_name,
-                                                             flag_name = name_tag_checkbox,
-                                                             flag_att = att_tag_checkbox,
-                                                             flag_value = value_tag_checkbox,
-                                                             partial_flag = partial_match)
-        
-        if not success and not flag_ignore_error:
-            self.show_error(error)
-            return
         
-        if (results != None):
-            if not tag_name and SEARCH_EMPTY_SHOWS_ALL:
-                self.status_bar.showMessage("Showing all XML elements...")
-            self.display_results(results)
+        self._search_ignore_errors = flag_ignore_error
+        self._current_search_id = self.controller.start_search(tag_name,
+                                                               flag_name = name_tag_checkbox,
+                                                               flag_att = att_tag_checkbox,
+                                                               flag_value = value_tag_checkbox,
+                                                               partial_flag = partial_match,
+                                                               type_ahead = type_ahead)
         
         # Refresh history
         self._load_history()
     
+    def _search_directory(self):
+        """Search every matching file of a folder with the current criteria."""
+        start_dir = os.path.dirname(self.file_path_edit.text()) or os.getcwd()
+        directory = QFileDialog.getExistingDirectory(self, BUTTON_SEARCH_FOLDER.rstrip('.'), start_dir)
+        if not directory:
+            return
+        
+        tag_name = self.tag_edit.text().strip() or SEARCH_ALL_ELEMENTS
+        pattern = self.file_pattern_edit.text().strip() or DIRECTORY_SEARCH_DEFAULT_GLOB
+        self._search_ignore_errors = False
+        self._current_search_id = self.controller.start_directory_search(
+            directory, pattern, tag_name,
+            flag_name = self.validation_checkbox[0].isChecked(),
+            flag_att = self.validation_checkbox[1].isChecked(),
+            flag_value = self.validation_checkbox[2].isChecked(),
+            partial_flag = self.partial_match_checkbox.isChecked())
+        self._directory_search = (self._current_search_id, directory)
+        self.files_table.setRowCount(0)
+    
+    def _is_directory_search(self, search_id):
+        """Check if a search id belongs to a folder search."""
+        return self._directory_search is not None and self._directory_search[0] == search_id
+    
+    def _on_directory_progress(self, search_id, files_done, files_total):
+        """Show how far a folder search has got."""
+        if search_id != self._current_search_id:
+            return
+        count = self.results_model.rowCount() if self._shown_search_id == search_id else 0
+        plural = "elements" if count != 1 else "element"
+        self.status_bar.showMessage(STATUS_DIRECTORY_SEARCHING.format(
+            directory=os.path.basename(self._directory_search[1]),
+            done=files_done, total=files_total, count=count, plural=plural))
+    
+    def _on_directory_summary(self, search_id, summary):
+        """Fill the files tab with the match count of every file searched."""
+        if search_id != self._current_search_id:
+            return
+        self.files_table.setSortingEnabled(False)
+        self.files_table.setRowCount(len(summary))
+        for row, (file_path, count, error) in enumerate(summary):
+            self.files_table.setItem(row, 0, QTableWidgetItem(file_path))
+            count_item = QTableWidgetItem()
+            count_item.setData(Qt.DisplayRole, count)  # Sorts numerically
+            self.files_table.setItem(row, 1, count_item)
+            self.files_table.setItem(row, 2, QTableWidgetItem(error or ""))
+        self.files_table.setSortingEnabled(True)
+        
+        count = sum(count for _, count, _ in summary)
+        matched = sum(1 for _, count, _ in summary if count)
+        plural = "elements" if count != 1 else "element"
+        self.status_bar.showMessage(STATUS_DIRECTORY_RESULTS.format(
+            count=count, plural=plural, matched=matched, total=len(summary)))
+    
+    def _on_search_batch(self, search_id, results):
+        """Append a batch of results, if they belong to the latest search."""
+        if search_id != self._current_search_id:
+            return
+        if self._shown_search_id != search_id:
+            # The first batch replaces the previous results
+            self.clear_results()
+            self.results_model.set_file_column(self._is_directory_search(search_id))
+            self._shown_search_id = search_id
+        self.append_results(results)
+        if self._is_directory_search(search_id):
+            return  # Progress is reported per file
+        
+        # Live count until the search finishes
+        count = self.results_model.rowCount()
+        plural = "elements" if count != 1 else "element"
+        status = STATUS_STREAM_SEARCHING if self.controller.is_streaming() else STATUS_SEARCH_PROGRESS
+        self.status_bar.showMessage(status.format(count=count, plural=plural))
+    
+    def _on_search_finished(self, search_id, success, results, error):
+        """Show the results of a search, if it is still the latest one."""
+        if search_id != self._current_search_id:
+            return
+        
+        if not success:
+            if not self._search_ignore_errors:
+                self.show_error(error)
+            return
+        
+        if results is not None:
+            self.results_model.set_file_column(False)
+            self.display_results(results)
+        else:
+            # Results were already appended batch by batch
+            if self._shown_search_id != search_id:
+                self.clear_results()
+                self.results_model.set_file_column(self._is_directory_search(search_id))
+            if self._is_directory_search(search_id):
+                self._shown_search_id = search_id
+                return  # The summary has already been shown
+            count = self.results_model.rowCount()
+            plural = "elements" if count != 1 else "element"
+            self.status_bar.showMessage(STATUS_RESULTS_FOUND.format(count=count, plural=plural))
+        self._shown_search_id = search_id
+    
     def display_results(self, results):
         """
         Display search results in the table.
@@ -489,34 +683,24 @@ class XMLExplorerView(QMainWindow):
         Args:
             results: List of element information dictionaries
         """
-        # Clear previous results
-        self.results_table.setRowCount(0)
-        self.results_data = {}
-        
-        # Add rows
-        for i, element in enumerate(results):
-            row_position = self.results_table.rowCount()
-            self.results_table.insertRow(row_position)
-            
-            # Store reference to the element data
-            self.results_data[row_position] = element
-            
-            # Set data
-            self.results_table.setItem(row_position, 0, QTableWidgetItem(element['name']))
-            # Format attributes as 'att1=value1;att2=value2;...'
-            attributes = element.get('attributes', {})
-            if attributes:
-                attr_text = ";".join([f"{k}={v}" for k, v in attributes.items()])
-            else:
-                attr_text = ""
-            
-            self.results_table.setItem(row_position, 1, QTableWidgetItem(attr_text))
-            self.results_table.setItem(row_position, 2, QTableWidgetItem(element['value']))
-            self.results_table.setItem(row_position, 3, QTableWidgetItem(element['xpath']))
+        self.results_model.set_results(results)
         
         # Update status
         plural = "elements" if len(results) != 1 else "element"
         self.status_bar.showMessage(STATUS_RESULTS_FOUND.format(count=len(results), plural=plural))
+    
+    def clear_results(self):
+        """Remove all rows from the results table."""
+        self.results_model.clear()
+    
+    def append_results(self, results):
+        """
+        Append search results to the table.
+        
+        Args:
+            results: List of element information dictionaries
+        """
+        self.results_model.append_results(results)
 
     def _load_history(self):
         """Load and display search history."""
@@ -594,7 +778,7 @@ class XMLExplorerView(QMainWindow):
         copy_element_action.triggered.connect(lambda: self._copy_column_value(0))   # Element is column 1
         copy_attr_action.triggered.connect(lambda: self._copy_column_value(1))      # Attributes is column 2
         copy_value_action.triggered.connect(lambda: self._copy_column_value(2))     # Value is column 3
-        copy_xpath_action.triggered.connect(lambda: self._copy_column_value(7))     # XPath is column 4
+        copy_xpath_action.triggered.connect(lambda: self._copy_column_value(3))     # XPath is column 4
         open_in_xml_action.triggered.connect(self._open_in_xml)
         
         # Show menu
@@ -624,57 +808,51 @@ class XMLExplorerView(QMainWindow):
         Args:
             column_index: Index of the column
         """
-        
+        row = self._selected_result_row()
+        if row >= 0:
+            text = self.results_model.data(self.results_model.index(row, column_index))
+            clipboard = QApplication.clipboard()
+            clipboard.setText(text)
+            
+            # Update status
+            column_name = self.results_model.headerData(column_index, Qt.Horizontal)
+            self.status_bar.showMessage(STATUS_COPIED.format(text=f"{column_name}: {text}"))
+    
+    def _selected_result_row(self):
+        """Return the selected results row, or the current one if none is selected (-1 if neither)."""
         selected_rows = self.results_table.selectionModel().selectedRows()
-        if not selected_rows:
-            # If no rows are selected, use the current item
-            current_row = self.results_table.currentRow()
-            if current_row >= 0:
-                selected_rows = [self.results_table.model().index(current_row, 0)]
-        
         if selected_rows:
-            row = selected_rows[0].row()
-            item = self.results_table.item(row, column_index)
-            if item:
-                clipboard = QApplication.clipboard()
-                clipboard.setText(item.text())
-                
-                # Update status
-                column_name = self.results_table.horizontalHeaderItem(column_index).text()
-                self.status_bar.showMessage(STATUS_COPIED.format(text=f"{column_name}: {item.text()}"))
+            return selected_rows[0].row()
+        # If no rows are selected, use the current item
+        return self.results_table.currentIndex().row()
     
     def _open_in_xml(self):
         """Open the XML file at the selected element's position."""
         self._right_widget.setFocus()
         
-        selected_rows = self.results_table.selectionModel().selectedRows()
-        if not selected_rows:
-            # If no rows are selected, use the current item
-            current_row = self.results_table.currentRow()
-            if current_row >= 0:
-                selected_rows = [self.results_table.model().index(current_row, 0)]
-        
-        if selected_rows:
-            row = selected_rows[0].row()
-            if row in self.results_data:
-                element_info = self.results_data[row]
-                
-                # Get the current file path
-                file_path = self.controller.get_current_file_path()
-                
-                # Check if we need to prompt to save changes in the editor
-                if self.editor_widget.is_modified:
-                    if not self.editor_widget.close_editor():
-                        return  # User cancelled
-                
-                # Load the file in the editor
-                if self.editor_widget.load_file(file_path):
-                    # Navigate to the element
-                    self.editor_widget.navigate_to_element(element_info)
-                    self.editor_widget.setFocus()
-                    self.status_bar.showMessage(EDITOR_STATUS_LOADED)
-                else:
-                    self.show_error(f"{EDITOR_STATUS_ERROR.format(message='Failed to open file in editor')}")
+        row = self._selected_result_row()
+        if row >= 0:
+            element_info = self.results_model.record(row)
+            
+            # Results of a folder search carry their own file
+            file_path = element_info['file'] or self.controller.get_current_file_path()
+            
+            # Check if we need to prompt to save changes in the editor
+            if self.editor_widget.is_modified:
+                if not self.editor_widget.close_editor():
+                    return  # User cancelled
+            
+            # Load the file in the editor, unless it already shows it
+            if self.editor_widget.is_showing(file_path):
+                self.editor_widget.navigate_to_element(element_info)
+                self.editor_widget.setFocus()
+            elif self.editor_widget.load_file(file_path):
+                # Navigate to the element
+                self.editor_widget.navigate_to_element(element_info)
+                self.editor_widget.setFocus()
+                self.status_bar.showMessage(EDITOR_STATUS_LOADED)
+            else:
+                self.show_error(f"{EDITOR_STATUS_ERROR.format(message='Failed to open file in editor')}")
     
     def _load_history_search(self):
         """Load a search from history."""
@@ -692,22 +870,20 @@ class XMLExplorerView(QMainWindow):
                 
                 # Set file path and load XML
                 self.file_path_edit.setText(item['file_path'])
-                success, error = self.controller.load_xml_file(item['file_path'])
-                
-                if not success:
-                    self.show_error(error)
-                    return
                 
-                # Set tag and search
-                self.tag_edit.setText(item['tag_name'])
-                self._search_tag()
+                def on_loaded():
+                    # Set tag and search
+                    self.tag_edit.setText(item['tag_name'])
+                    self._search_tag()
+                    
+                    # Switch to results tab
+                    self.tab_widget.setCurrentIndex(0)
+                    self.partial_match_checkbox.setChecked(item['partial_flag'])
+                    self.validation_checkbox[0].setChecked(item['name_flag'])
+                    self.validation_checkbox[1].setChecked(item['att_flag'])
+                    self.validation_checkbox[2].setChecked(item['value_flag'])
                 
-                # Switch to results tab
-                self.tab_widget.setCurrentIndex(0)
-                self.partial_match_checkbox.setChecked(item['partial_flag'])
-                self.validation_checkbox[0].setChecked(item['name_flag'])
-                self.validation_checkbox[1].setChecked(item['att_flag'])
-                self.validation_checkbox[2].setChecked(item['value_flag'])
+                self._load_file(item['file_path'], on_loaded)
     
     def _remove_history_entry(self):
         """Remove the selected history entry."""
@@ -742,7 +918,7 @@ class XMLExplorerView(QMainWindow):
                     if success:
                         self._load_history()
     
-    def _handle_result_double_click(self, item):
+    def _handle_result_double_click(self, index):
         """Handle double-click on results table item."""
         # Open the file in the integrated editor
         self._open_in_xml()
@@ -761,23 +937,21 @@ class XMLExplorerView(QMainWindow):
             
             # Set file path and load XML
             self.file_path_edit.setText(item['file_path'])
-            success, error = self.controller.load_xml_file(item['file_path'])
             
-            if not success:
-                self.show_error(error)
-                return
-            
-            # Set tag and search
-            self.tag_edit.setText(item['tag_name'])
-            self._search_tag()
-
-            self.partial_match_checkbox.setChecked(True if item['partial_flag']=='1' else False)
-            self.validation_checkbox[0].setChecked(True if item['name_flag']=='1' else False)
-            self.validation_checkbox[1].setChecked(True if item['att_flag']=='1' else False)
-            self.validation_checkbox[2].setChecked(True if item['value_flag']=='1' else False)
+            def on_loaded():
+                # Set tag and search
+                self.tag_edit.setText(item['tag_name'])
+                self._search_tag()
+
+                self.partial_match_checkbox.setChecked(True if item['partial_flag']=='1' else False)
+                self.validation_checkbox[0].setChecked(True if item['name_flag']=='1' else False)
+                self.validation_checkbox[1].setChecked(True if item['att_flag']=='1' else False)
+                self.validation_checkbox[2].setChecked(True if item['value_flag']=='1' else False)
+                
+                # Switch to results tab
+                self.tab_widget.setCurrentIndex(0)
             
-            # Switch to results tab
-            self.tab_widget.setCurrentIndex(0)
+            self._load_file(item['file_path'], on_loaded)
     
     def update_status(self, message):
         """
@@ -788,6 +962,29 @@ class XMLExplorerView(QMainWindow):
         """
         self.status_bar.showMessage(message)
     
+    def update_load_progress(self, file_path, bytes_read, total_bytes, elements):
+        """
+        Show file loading progress in the status bar.
+        
+        Args:
+            file_path: Path of the file being loaded
+            bytes_read: Number of bytes parsed so far
+            total_bytes: Size of the file in bytes
+            elements: Number of elements parsed so far
+        """
+        percent = bytes_read * 100 // total_bytes if total_bytes else 100
+        self.status_bar.showMessage(STATUS_LOADING_PROGRESS.format(
+            file=os.path.basename(file_path),
+            read=f"{bytes_read / (1024 * 1024):.1f}",
+            total=f"{total_bytes / (1024 * 1024):.1f}",
+            percent=percent,
+            elements=elements))
+        self.cancel_load_button.show()
+    
+    def end_load_progress(self):
+        """Hide the loading controls once a load has finished."""
+        self.cancel_load_button.hide()
+    
     def show_error(self, message):
         """
         Display an error message dialog.
@@ -0,0 +1,98 @@
+from bisect import bisect_right
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from DefineConst import *
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Table model over a list of search result records.
+
+    Cell text is read from the record in data(), so only the rows the view
+    actually paints are ever formatted. Results that arrive in batches are
+    kept as the batches themselves, not copied into one list.
+    """
+
+    # Record field shown in each of the RESULTS_COLUMNS
+    COLUMN_FIELDS = ('name', 'attributes_text', 'value', 'xpath')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columns = RESULTS_COLUMNS
+        self._fields = self.COLUMN_FIELDS
+        self._batches = []  # Sequences of result records
+        self._starts = []   # Row of the first record of each batch
+        self._count = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+            record = self.record(index.row())
+            return record[self._fields[index.column()]]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self._columns[section]
+        return super().headerData(section, orientation, role)
+
+    def set_file_column(self, shown):
+        """Show or hide the file column, used for results from several files."""
+        if shown == (len(self._columns) > len(RESULTS_COLUMNS)):
+            return
+        self.beginResetModel()
+        if shown:
+            self._columns = RESULTS_COLUMNS + [COLUMN_FILE]
+            self._fields = self.COLUMN_FIELDS + ('file',)
+        else:
+            self._columns = RESULTS_COLUMNS
+            self._fields = self.COLUMN_FIELDS
+        self.endResetModel()
+
+    def record(self, row):
+        """Return the result record shown in a row."""
+        batch = bisect_right(self._starts, row) - 1
+        return self._batches[batch][row - self._starts[batch]]
+
+    def set_results(self, results):
+        """
+        Replace the displayed results.
+
+        Args:
+            results: Sequence of result records
+        """
+        self.beginResetModel()
+        self._batches = [results] if len(results) else []
+        self._starts = [0] if len(results) else []
+        self._count = len(results)
+        self.endResetModel()
+
+    def append_results(self, results):
+        """
+        Append results after the ones already displayed.
+
+        Args:
+            results: Sequence of result records
+        """
+        if not len(results):
+            return
+        first = self._count
+        self.beginInsertRows(QModelIndex(), first, first + len(results) - 1)
+        self._batches.append(results)
+        self._starts.append(first)
+        self._count += len(results)
+        self.endInsertRows()
+
+    def clear(self):
+        """Remove all results."""
+        self.set_results([])